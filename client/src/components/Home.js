@@ -34,7 +34,7 @@ const Home = (props) => {
                     <Typography component="h2" variant="h4" gutterBottom>Popular Projects</Typography>
                 </CardContent>
             </Card>
-            <ProjectsList addHeading={false} apiEndpoint="api/projects?order=popularity&limit=6"/>
+            <ProjectsList addHeading={false} singlePage={true} apiEndpoint="api/projects?order=popularity&limit=6"/>
         </>
     );
 };
@@ -3,7 +3,7 @@ import { useHistory, useLocation } from 'react-router-dom';
 /** my components */
 import ProjectRequestCard from './ProjectRequestCard';
 /** my utilities */
-import { axiosInstance } from '../../utilities/axios';
+import { axiosInstance, getAllPages, getFreshAccessToken, getReconnectDelay } from '../../utilities/axios';
 /** Material UI Imports */
 import { makeStyles } from '@material-ui/core/styles';
 import Backdrop from '@material-ui/core/Backdrop';
@@ -39,8 +39,7 @@ const ProjectRequestsList = (props) => {
     useEffect(() => {
         setIsLoading(true);
 
-        axiosInstance
-            .get(`api/requests/`)
+        getAllPages(`api/requests/`)
             .then( response => {
                 setIsLoading(false);
                 setRequests(response.data);
@@ -51,6 +50,78 @@ const ProjectRequestsList = (props) => {
             });
     }, []);
 
+    /**
+     * Keeps the list up to date with the changes to the student's requests, as they're streamed by the server.
+     * The stream ends when the access token expires, so it's reopened with a refreshed token,
+     * and is sent any changes it missed in the meantime.
+     */
+    useEffect(() => {
+        let events = null;
+        let reconnectTimeout = null;
+        let lastEventId = null;
+        let attempt = 0;
+        let isClosed = false;
+
+        /** Adds or replaces a request that is still active, otherwise removes it. */
+        const handleRequestEvent = event => {
+            lastEventId = event.lastEventId;
+            const changedRequest = JSON.parse(event.data).request;
+
+            setRequests(requests => {
+                const otherRequests = requests.filter(request => request.id !== changedRequest.id);
+
+                return changedRequest.is_active ? [...otherRequests, changedRequest] : otherRequests;
+            });
+        };
+
+        /** Opens the stream with a fresh access token, resuming after the last event received. */
+        const connect = async () => {
+            const token = await getFreshAccessToken();
+
+            // no valid refresh token, the student has to log in again
+            if (isClosed || !token) {
+                return;
+            }
+
+            const params = new URLSearchParams({ token });
+            if (lastEventId) {
+                params.set('last_event_id', lastEventId);
+            }
+
+            events = new EventSource(`${axiosInstance.defaults.baseURL}api/requests/events/?${params}`);
+
+            events.onopen = () => {
+                attempt = 0;
+            };
+
+            ['request.created', 'request.accepted', 'request.declined', 'request.cancelled'].forEach(eventType => {
+                events.addEventListener(eventType, handleRequestEvent);
+            });
+
+            events.addEventListener('token.expired', () => {
+                events.close();
+                connect();
+            });
+
+            // the browser's own reconnect would reuse the same (possibly expired) token, so reconnect here instead
+            events.onerror = () => {
+                events.close();
+                reconnectTimeout = setTimeout(connect, getReconnectDelay(attempt++));
+            };
+        };
+
+        connect();
+
+        return () => {
+            isClosed = true;
+            clearTimeout(reconnectTimeout);
+
+            if (events) {
+                events.close();
+            }
+        };
+    }, []);
+
     /** Sets a new list of requests excluding the request with the given ID. */
     const removeRequest = (requestId) => {
         const new_requests_list = [];
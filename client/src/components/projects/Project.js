@@ -44,13 +44,13 @@ const Project = (props) => {
     const authContext = useContext(AuthContext);
 
     /**
-     * Fetch and store project information.
+     * Fetch and store project information, along with the authenticated student's relations to the project.
      * Redirects to a 404 page if the project doesn't exist.
      */
     useEffect(() => {
         setIsLoading(true);
         axiosInstance
-            .get(`api/projects/${id}/`)
+            .get(`api/projects/${id}/?include=viewer`)
             .then(response => {
                 setIsLoading(false);
                 setProject(response.data);
@@ -63,16 +63,18 @@ const Project = (props) => {
                 // store team members separately
                 setMembers(members_list);
 
+                const viewer = response.data.viewer;
+
                 // the authenticated student is the owner of this project
-                if (response.data.owner === authContext.studentId) {
-                    setIsOwner(true);
-                }
+                setIsOwner(viewer.is_owner);
+                setIsMember(viewer.membership_id !== null);
+                setHasActiveJoinRequest(viewer.active_request_id !== null);
 
-                response.data.team_members.map(team_member => {
-                    if (team_member.user === authContext.studentId) {
-                        setIsMember(true);
-                    }
-                });
+                // the authenticated student is following this project
+                if (viewer.follow_id !== null) {
+                    setFollowId(viewer.follow_id);
+                    setIsFollower(true);
+                }
             })
             .catch(error => {
                 setIsLoading(false);
@@ -84,50 +86,6 @@ const Project = (props) => {
             });
     }, []);
 
-    /**
-     * Fetch the authenticated student's active requests and update HasActiveJoinRequest
-     * if a request for this project exists
-     */
-     useEffect(() => {
-        setIsLoading(true);
-        axiosInstance
-            .get(`api/requests/`)
-            .then(response => {
-                setIsLoading(false);
-
-                response.data.map(request => {
-                    if (request.project == id) {
-                        setHasActiveJoinRequest(true);
-                    }
-                });
-            })
-            .catch(error => {
-                setIsLoading(false);
-                console.log(error);
-            });
-    }, []);
-
-    /** Gets the authenticated student's follows and stores the follow id associated with this project */
-     useEffect(() => {
-        setIsLoading(true);
-        axiosInstance
-            .get(`api/follows/`)
-            .then(response => {
-                setIsLoading(false);
-                // check if the authenticated student is following this project
-                response.data.map(follow => {
-                    if (follow.project == id) {
-                        setFollowId(follow.id);
-                        setIsFollower(true);
-                    }
-                });
-            })
-            .catch(error => {
-                setIsLoading(false);
-                console.log(error);
-            });
-    }, []);
-
     /** Sets editing state for this project */
     const handleEditProject = () => {
         setIsEditing(true);
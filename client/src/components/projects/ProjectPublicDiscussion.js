@@ -5,7 +5,10 @@ import { useHistory, useLocation } from 'react-router-dom';
 import ProjectMessageList from './ProjectMessageList';
 import ProjectMessageForm from './ProjectMessageForm';
 /** my utilities */
-import { axiosInstance } from '../../utilities/axios';
+import { axiosInstance, getAllPages } from '../../utilities/axios';
+import { openDiscussionSocket } from '../../utilities/discussionSocket';
+/** Material UI Imports */
+import Typography from '@material-ui/core/Typography';
 
 
 /** Discussion form validation schema. */
@@ -19,19 +22,36 @@ const discussionFormValidationSchema = Yup.object().shape({
 const ProjectPublicDiscussion = (props) => {
     const [messages, setMessages] = useState([]);
     const [refreshMessages, setRefreshMessages] = useState(false);
+    const [isLive, setIsLive] = useState(true);
 
     const location = useLocation();
     const history = useHistory();
 
+    /**
+     * Adds new messages to the list, skipping any that are already shown.
+     * Messages pushed over the socket may arrive before fetched ones, so the list is kept in posting order.
+     */
+    const appendMessages = (newMessages) => {
+        setMessages(messages => {
+            const shownIds = new Set(messages.map(message => message.id));
+
+            return [...messages, ...newMessages.filter(message => !shownIds.has(message.id))]
+                .sort((a, b) => new Date(a.date_created) - new Date(b.date_created) || a.id - b.id);
+        });
+    };
+
     /**
      * Fetch and store the public messages for the given project id
+     * Only the messages posted after the last one already shown are fetched on refresh.
      * Redirects to a 404 page if the project doesn't exist.
      */
      useEffect(() => {
-        axiosInstance
-            .get(`api/projects/${props.projectId}/public-messages/`)
+        const lastMessage = messages[messages.length - 1];
+        const params = lastMessage ? { after_id: lastMessage.id } : {};
+
+        getAllPages(`api/projects/${props.projectId}/public-messages/`, { params })
             .then(response => {
-                setMessages(response.data);
+                appendMessages(response.data);
             })
             .catch(error => {
                 console.log(error);
@@ -42,6 +62,20 @@ const ProjectPublicDiscussion = (props) => {
             });
     }, [refreshMessages]);
 
+    /**
+     * Receive messages as soon as they're posted, instead of waiting for the next refresh.
+     * The messages missed while reconnecting are fetched once the socket is open again.
+     */
+    useEffect(() => {
+        setIsLive(true);
+
+        return openDiscussionSocket(props.projectId, 'public-messages', {
+            handleMessage: message => appendMessages([message]),
+            handleReconnect: () => setRefreshMessages(refreshMessages => !refreshMessages),
+            handleStop: () => setIsLive(false),
+        });
+    }, [props.projectId]);
+
     /** Activates flag for refreshing messages */
     const handleRefreshMessages = () => {
         setRefreshMessages(!refreshMessages);
@@ -72,6 +106,12 @@ const ProjectPublicDiscussion = (props) => {
     return (
         <>
             <ProjectMessageList messages={messages} />
+            {
+                !isLive &&
+                <Typography variant="body2" color="textSecondary" gutterBottom>
+                    New messages are no longer shown as they're posted. Refresh the page to see them.
+                </Typography>
+            }
             <ProjectMessageForm
                 discussionFormValidationSchema={discussionFormValidationSchema}
                 handleMessageFormSubmit={handleMessageFormSubmit}
@@ -3,7 +3,7 @@ import React, { useState, useEffect } from 'react';
 /** my components */
 import ProjectCard from './ProjectCard';
 /** my utilities */
-import { axiosInstance } from '../../utilities/axios';
+import { axiosInstance, getAllPages } from '../../utilities/axios';
 /** Material UI Imports */
 import { makeStyles } from '@material-ui/core/styles';
 import Grid from '@material-ui/core/Grid';
@@ -44,8 +44,10 @@ const ProjectsList = (props) => {
         // filter according to query params if provided
         const url = searchQuery ? `api/projects${searchQuery}` : props.apiEndpoint;
 
-        axiosInstance
-            .get(`${url}`)
+        // every page is fetched, unless only the first few projects are shown (e.g. with the limit query param)
+        const request = props.singlePage ? axiosInstance.get(`${url}`) : getAllPages(`${url}`);
+
+        request
             .then( response => {
                 setIsLoading(false);
                 setProjects(response.data);
@@ -54,7 +56,7 @@ const ProjectsList = (props) => {
                 setIsLoading(false);
                 console.log(error.response);
             });
-    }, [props.apiEndpoint, searchQuery]);
+    }, [props.apiEndpoint, props.singlePage, searchQuery]);
 
     /** redirects to the project page for the given project ID. */
     const handleCardClick = (projectId) => history.push(`/projects/${projectId}`);
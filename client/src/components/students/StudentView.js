@@ -5,7 +5,7 @@ import * as Yup from 'yup';
 /** my components */
 import { AuthContext } from '../context/AuthContextProvider';
 /** my utilities */
-import { axiosInstance } from '../../utilities/axios';
+import { axiosInstance, getAllPages } from '../../utilities/axios';
 /** Images */
 import defaultProfileImage from '../../assets/images/default-profile-image.png';
 /** Material UI Imports */
@@ -115,8 +115,7 @@ const StudentView = (props) => {
         setProjectInvitationDialogIsOpen(true);
 
         // get the authenticated student's owned projects
-        axiosInstance
-            .get('api/projects?relation=owned')
+        getAllPages('api/projects?relation=owned')
             .then(response => {
                 setAuthStudentProjects(response.data);
             })
@@ -3,7 +3,7 @@ import { useHistory, useLocation } from 'react-router-dom';
 /** my components */
 import StudentCard from './StudentCard';
 /** my utilities */
-import { axiosInstance } from '../../utilities/axios';
+import { getAllPages } from '../../utilities/axios';
 /** Material UI Imports */
 import { makeStyles } from '@material-ui/core/styles';
 import Backdrop from '@material-ui/core/Backdrop';
@@ -45,8 +45,7 @@ const StudentsList = (props) => {
         // filter according to query params if provided
         const url = searchQuery ? `api/accounts${searchQuery}` : 'api/accounts/';
 
-        axiosInstance
-            .get(url)
+        getAllPages(url)
             .then( response => {
                 setIsLoading(false);
                 setStudents(response.data);
@@ -39,6 +39,84 @@ export const axiosInstance = axios.create({
     },
 });
 
+/** Returns the time the given access token expires at, in milliseconds; otherwise 0. */
+export const getTokenExpiry = (token) => {
+    try {
+        const [,payload,] = token.split('.');
+
+        return JSON.parse(window.atob(payload))['exp'] * 1000;
+    } catch (error) {
+        return 0;
+    }
+}
+
+
+/**
+ * Returns the stored access token, refreshing it first with the refresh token if it has expired or is about to.
+ * Used by the live connections (event streams and WebSockets), which send the token in their URL.
+ * Resolves to null if there is no valid refresh token.
+ */
+export const getFreshAccessToken = async () => {
+    const accessToken = localStorage.getItem('access_token');
+
+    if (accessToken && getTokenExpiry(accessToken) > Date.now() + 10000) {
+        return accessToken;
+    }
+
+    const refreshToken = localStorage.getItem('refresh_token');
+
+    if (!refreshToken) {
+        return null;
+    }
+
+    try {
+        const response = await axiosInstance.post('auth/token/refresh/', { refresh: refreshToken });
+        const newAccessToken = response.data.access;
+
+        localStorage.setItem('access_token', newAccessToken);
+        axiosInstance.defaults.headers['Authorization'] = `Bearer ${newAccessToken}`;
+
+        return newAccessToken;
+    } catch (error) {
+        return null;
+    }
+}
+
+
+/** Returns how long to wait before the given reconnection attempt of a live connection, backing off up to 30 seconds. */
+export const getReconnectDelay = (attempt) => Math.min(1000 * 2 ** attempt, 30000);
+
+
+/** Returns the url with the given relation (e.g. "next") from the Link header of a response; otherwise null. */
+export const getLinkURL = (response, rel) => {
+    const links = response.headers.link || '';
+    const match = links.match(new RegExp(`<([^>]+)>; rel="${rel}"`));
+
+    return match ? match[1] : null;
+}
+
+
+/**
+ * Fetches every page of a paginated list endpoint by following the "next" links in the Link header.
+ * Resolves to the last response with the results of all of the pages as its data.
+ */
+export const getAllPages = async (url, config) => {
+    let response = await axiosInstance.get(url, config);
+    const results = [...response.data];
+
+    // the next links are absolute and already carry the query params of the first request
+    let nextURL = getLinkURL(response, 'next');
+
+    while (nextURL) {
+        response = await axiosInstance.get(nextURL);
+        results.push(...response.data);
+        nextURL = getLinkURL(response, 'next');
+    }
+
+    return { ...response, data: results };
+}
+
+
 /**
  * Intercept each response from the server to check if the access token has expired.
  * On expiry, it attempts to fetch a new access token if a valid refresh token exists; otherwise, redirects to login page.
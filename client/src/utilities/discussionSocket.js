@@ -0,0 +1,97 @@
+import { axiosInstance, getFreshAccessToken, getReconnectDelay, getTokenExpiry } from './axios';
+
+
+/** Close codes sent by the server when a connection is refused or ended. */
+const CLOSE_UNAUTHENTICATED = 4401;
+const CLOSE_FORBIDDEN = 4403;
+const CLOSE_NOT_FOUND = 4404;
+
+
+/**
+ * Opens a WebSocket to a project discussion ('public-messages' or 'private-messages') and keeps it open.
+ *
+ * The server closes the socket when the access token expires, so it's reopened with a refreshed token,
+ * and after any other drop it's reopened with a growing delay. handleReconnect is called on each reopening,
+ * so the messages missed in the meantime can be fetched.
+ * Reconnecting stops when the student no longer has access to the discussion, which calls handleStop.
+ *
+ * Returns a function that closes the socket for good.
+ */
+export const openDiscussionSocket = (projectId, discussion, { handleMessage, handleReconnect, handleStop }) => {
+    const socketURL = axiosInstance.defaults.baseURL.replace(/^http/, 'ws');
+    let socket = null;
+    let reconnectTimeout = null;
+    let attempt = 0;
+    let hasConnected = false;
+    let isClosed = false;
+
+    const stop = () => {
+        isClosed = true;
+        handleStop();
+    };
+
+    const connect = async () => {
+        const token = await getFreshAccessToken();
+
+        if (isClosed) {
+            return;
+        }
+        // no valid refresh token, the student has to log in again
+        if (!token) {
+            stop();
+            return;
+        }
+
+        socket = new WebSocket(`${socketURL}ws/projects/${projectId}/${discussion}/?token=${token}`);
+
+        socket.onopen = () => {
+            if (hasConnected) {
+                handleReconnect();
+            }
+
+            hasConnected = true;
+            attempt = 0;
+        };
+
+        socket.onmessage = event => {
+            const data = JSON.parse(event.data);
+
+            if (data.type === 'message.created') {
+                handleMessage(data.message);
+            }
+        };
+
+        socket.onclose = event => {
+            if (isClosed) {
+                return;
+            }
+
+            const tokenHasExpired = getTokenExpiry(token) <= Date.now();
+
+            if (event.code === CLOSE_UNAUTHENTICATED || event.code === CLOSE_FORBIDDEN) {
+                // closed because the token expired, reopen straight away with a refreshed one
+                if (tokenHasExpired) {
+                    connect();
+                } else {
+                    // the student was removed from the team or the token isn't valid
+                    stop();
+                }
+            } else if (event.code === CLOSE_NOT_FOUND) {
+                stop();
+            } else {
+                reconnectTimeout = setTimeout(connect, getReconnectDelay(attempt++));
+            }
+        };
+    };
+
+    connect();
+
+    return () => {
+        isClosed = true;
+        clearTimeout(reconnectTimeout);
+
+        if (socket) {
+            socket.close();
+        }
+    };
+}
@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import Profile, Project, Follow, Membership, Request, PrivateMessage, PublicMessage
+from .models import Profile, Project, Follow, Membership, Request, PrivateMessage, PublicMessage, Role
 
 
 @admin.register(Profile)
@@ -28,6 +28,37 @@ class ProfileAdmin(admin.ModelAdmin):
     )
 
 
+@admin.register(Role)
+class RoleAdmin(admin.ModelAdmin):
+    """
+    Add the Role model to the admin panel
+    """
+
+    search_fields = ('name', 'key')
+    list_display = ('id', 'name', 'aliases')
+    readonly_fields = ('id', 'key')
+
+    def get_readonly_fields(self, request, obj=None):
+        # renaming a role would leave its old name wherever it's used, so other spellings are added as aliases instead
+        return (*self.readonly_fields, 'name') if obj is not None else self.readonly_fields
+
+    fieldsets = (
+        (None, {
+            'fields': (
+                'id', 'name', 'key', 'aliases'
+            ),
+        }),
+    )
+
+    add_fieldsets = (
+        (None, {
+            'fields': (
+                'name', 'aliases'
+            ),
+        }),
+    )
+
+
 @admin.register(Membership)
 class TeamMemberAdmin(admin.ModelAdmin):
     """
@@ -3,3 +3,13 @@ from django.apps import AppConfig
 
 class ApiConfig(AppConfig):
     name = 'api'
+
+    def ready(self):
+        # connect the signal receivers that keep the role index up to date
+        from . import roles  # noqa: F401
+        # connect the signal receivers that keep the student and project recommendation indexes up to date
+        from . import recommendations  # noqa: F401
+        # connect the signal receivers that invalidate cached responses
+        from . import cache  # noqa: F401
+        # connect the signal receiver that streams request events
+        from . import events  # noqa: F401
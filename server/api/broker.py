@@ -0,0 +1,210 @@
+import asyncio
+import json
+import logging
+import threading
+from urllib.parse import urlparse
+
+from django.conf import settings
+
+from .cache_backends import RedisConnection, RedisProtocolError
+
+logger = logging.getLogger(__name__)
+
+
+class InProcessBroker:
+    """
+    Fans messages out to the subscribers of a channel within this process.
+
+    Messages are published from the (synchronous) views and received by the WebSocket and event stream
+    connections running in the ASGI event loop. Only subscribers in the same process receive the messages,
+    so deployments with more than one worker should use RedisBroker instead.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscriptions = {}
+
+    def publish(self, channel, message):
+        """
+        Sends a JSON serializable message to every subscriber of a channel.
+        """
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(channel, ()))
+
+        for subscription in subscriptions:
+            subscription.deliver(message)
+
+    async def subscribe(self, channel):
+        """
+        Returns a new subscription to a channel, which must be closed when done.
+        """
+        subscription = _InProcessSubscription(self, channel)
+
+        with self._lock:
+            self._subscriptions.setdefault(channel, set()).add(subscription)
+
+        return subscription
+
+    def _unsubscribe(self, subscription):
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.channel, set())
+            subscriptions.discard(subscription)
+
+            if not subscriptions:
+                self._subscriptions.pop(subscription.channel, None)
+
+
+class _InProcessSubscription:
+    """
+    A subscription to a channel of an InProcessBroker, read from an asyncio event loop.
+    """
+
+    def __init__(self, broker, channel):
+        self.channel = channel
+        self._broker = broker
+        self._loop = asyncio.get_event_loop()
+        self._queue = asyncio.Queue()
+
+    def deliver(self, message):
+        """
+        Queues a message for the subscriber. Safe to call from any thread.
+        """
+        try:
+            self._loop.call_soon_threadsafe(self._queue.put_nowait, message)
+        except RuntimeError:
+            # the subscriber's event loop has been closed
+            pass
+
+    async def get(self):
+        """
+        Waits for and returns the next message.
+        """
+        return await self._queue.get()
+
+    async def close(self):
+        self._broker._unsubscribe(self)
+
+
+async def _read_reply(reader):
+    """
+    Reads a reply of the Redis serialization protocol from an asyncio stream.
+    """
+    line = await reader.readline()
+    if not line:
+        raise ConnectionError('Connection closed by the server')
+
+    prefix, rest = line[:1], line[1:-2]
+
+    if prefix == b'+':
+        return rest.decode()
+    if prefix == b'-':
+        raise RedisProtocolError(rest.decode())
+    if prefix == b':':
+        return int(rest)
+    if prefix == b'$':
+        length = int(rest)
+        if length == -1:
+            return None
+        return (await reader.readexactly(length + 2))[:-2]
+    if prefix == b'*':
+        return [await _read_reply(reader) for _ in range(int(rest))]
+
+    raise RedisProtocolError(f'Unexpected reply: {line!r}')
+
+
+class _RedisSubscription:
+    """
+    A subscription to a channel of a RedisBroker, using its own connection.
+    """
+
+    def __init__(self, channel, reader, writer):
+        self.channel = channel
+        self._reader = reader
+        self._writer = writer
+
+    async def get(self):
+        while True:
+            reply = await _read_reply(self._reader)
+
+            # skip anything other than published messages, e.g. the subscribe confirmation
+            if isinstance(reply, list) and reply[0] == b'message':
+                return json.loads(reply[2])
+
+    async def close(self):
+        self._writer.close()
+
+
+class RedisBroker:
+    """
+    Fans messages out to the subscribers of a channel in every process, through the publish/subscribe
+    commands of a server speaking the Redis protocol. REALTIME_BROKER_URL is of the form redis://host:port.
+
+    Each subscription uses its own connection.
+    """
+
+    def __init__(self, url):
+        url = urlparse(url)
+        self._host = url.hostname or 'localhost'
+        self._port = url.port or 6379
+        self._local = threading.local()
+
+    def publish(self, channel, message):
+        """
+        Sends a JSON serializable message to every subscriber of a channel.
+        """
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = RedisConnection(self._host, self._port)
+            self._local.connection = connection
+
+        try:
+            connection.execute('PUBLISH', channel, json.dumps(message))
+        except (ConnectionError, OSError):
+            # reconnect on the next publish
+            connection.close()
+            self._local.connection = None
+            raise
+
+    async def subscribe(self, channel):
+        """
+        Returns a new subscription to a channel, which must be closed when done.
+        """
+        reader, writer = await asyncio.open_connection(self._host, self._port)
+
+        writer.write(b'*2\r\n$9\r\nSUBSCRIBE\r\n$%d\r\n%s\r\n' % (len(channel.encode()), channel.encode()))
+        await writer.drain()
+        # wait for the confirmation, so nothing published after this returns is missed
+        await _read_reply(reader)
+
+        return _RedisSubscription(channel, reader, writer)
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    """
+    Returns the broker set up by REALTIME_BROKER_URL, or an in-process broker if it isn't set.
+    """
+    global _broker
+
+    with _broker_lock:
+        if _broker is None:
+            url = getattr(settings, 'REALTIME_BROKER_URL', None)
+            _broker = RedisBroker(url) if url else InProcessBroker()
+
+    return _broker
+
+
+def publish_best_effort(channel, message):
+    """
+    Publishes a message with the broker, logging the error instead of raising it if the broker can't be reached.
+
+    Live delivery is best effort (clients catch up through the list endpoints), so a broker outage
+    mustn't turn a request whose changes were already committed into an error.
+    """
+    try:
+        get_broker().publish(channel, message)
+    except (ConnectionError, OSError, RedisProtocolError):
+        logger.exception('Could not publish a message to the %s channel', channel)
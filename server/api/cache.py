@@ -0,0 +1,158 @@
+import hashlib
+import threading
+from collections import namedtuple
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.response import Response
+
+from .models import Follow, Membership, Project, PublicMessage
+from .replicas import read_from_primary
+
+CacheKey = namedtuple('CacheKey', ['resource', 'key'])
+
+
+class ResponseCache:
+    """
+    Cache for the responses of read-heavy GET endpoints.
+
+    Each cached response belongs to one or more namespaces (e.g. 'projects' or 'project:5').
+    Every namespace has a version number which is part of the cache keys of its responses,
+    so invalidating a namespace is just a matter of bumping its version.
+    Old responses are never read again and expire on their own.
+
+    Responses are stored in the 'api' cache (locmem by default, or the Redis protocol backend in
+    api.cache_backends when API_CACHE_URL is set). Hits and misses are counted per resource.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics = {}
+
+    @property
+    def cache(self):
+        return caches['api']
+
+    def _namespace_key(self, namespace):
+        return f'api:ns:{namespace}'
+
+    def _count(self, resource, outcome):
+        with self._lock:
+            counts = self._metrics.setdefault(resource, {'hits': 0, 'misses': 0})
+            counts[outcome] += 1
+
+    def make_key(self, resource, namespaces, *parts):
+        """
+        Returns the key of a response for a resource, made from the current versions of its namespaces
+        and any other parts that the response depends on (e.g. the query string).
+        """
+        namespace_keys = [self._namespace_key(namespace) for namespace in namespaces]
+        versions = self.cache.get_many(namespace_keys)
+        version = '.'.join(str(versions.get(key, 0)) for key in namespace_keys)
+
+        digest = hashlib.sha1('|'.join(str(part) for part in parts).encode()).hexdigest()
+
+        return CacheKey(resource, f'api:response:{resource}:{version}:{digest}')
+
+    def get(self, cache_key):
+        """
+        Returns the cached response for a key, or None.
+
+        On a miss the response is built and cached by the caller, so the rest of the request reads from the primary,
+        and a stale replica read is never cached.
+        """
+        cached = self.cache.get(cache_key.key)
+
+        if cached is None:
+            self._count(cache_key.resource, 'misses')
+            read_from_primary()
+            return None
+
+        self._count(cache_key.resource, 'hits')
+        data, status, headers = cached
+
+        return Response(data, status=status, headers=headers)
+
+    def set(self, cache_key, response):
+        """
+        Caches a response. Only successful responses are cached.
+        """
+        if response.status_code != 200:
+            return
+
+        headers = {header: value for header, value in response.items() if header != 'Content-Type'}
+        timeout = getattr(settings, 'API_CACHE_TIMEOUT', 300)
+
+        self.cache.set(cache_key.key, (response.data, response.status_code, headers), timeout)
+
+    def invalidate(self, *namespaces):
+        """
+        Bumps the versions of the given namespaces, so their cached responses are no longer used.
+
+        The versions are bumped straight away, and again once the current transaction commits,
+        so a response cached from data read before the commit isn't used either.
+        """
+        self._bump(namespaces)
+        transaction.on_commit(lambda: self._bump(namespaces))
+
+    def _bump(self, namespaces):
+        for namespace in namespaces:
+            key = self._namespace_key(namespace)
+
+            # namespace versions never expire, otherwise an old version could be reused
+            self.cache.add(key, 0, timeout=None)
+            try:
+                self.cache.incr(key)
+            except ValueError:
+                # the version was evicted in the meantime
+                self.cache.set(key, 1, timeout=None)
+
+    def metrics(self):
+        """
+        Returns the number of hits and misses of each resource in this process.
+        """
+        with self._lock:
+            return {resource: dict(counts) for resource, counts in self._metrics.items()}
+
+    def reset_metrics(self):
+        with self._lock:
+            self._metrics = {}
+
+
+response_cache = ResponseCache()
+
+
+@receiver(post_save, sender=get_user_model())
+@receiver(post_delete, sender=get_user_model())
+def invalidate_account_responses(sender, instance, **kwargs):
+    """
+    Names of owners, members, and message authors are part of the cached responses.
+    """
+    response_cache.invalidate('accounts')
+
+
+@receiver(post_save, sender=Project)
+@receiver(post_delete, sender=Project)
+def invalidate_project_responses(sender, instance, **kwargs):
+    response_cache.invalidate('projects', f'project:{instance.pk}')
+
+
+@receiver(post_save, sender=Membership)
+@receiver(post_delete, sender=Membership)
+@receiver(post_save, sender=Follow)
+@receiver(post_delete, sender=Follow)
+def invalidate_project_relation_responses(sender, instance, **kwargs):
+    """
+    Team members and follower counts are part of the cached project responses.
+    """
+    response_cache.invalidate('projects', f'project:{instance.project_id}')
+
+
+@receiver(post_save, sender=PublicMessage)
+@receiver(post_delete, sender=PublicMessage)
+def invalidate_public_message_responses(sender, instance, **kwargs):
+    response_cache.invalidate(f'public-messages:{instance.project_id}')
@@ -0,0 +1,201 @@
+import pickle
+import socket
+import threading
+from urllib.parse import urlparse
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+
+class RedisProtocolError(Exception):
+    pass
+
+
+class RedisConnection:
+    """
+    Minimal client for the Redis serialization protocol (RESP),
+    supporting just the commands needed by RedisCache.
+    """
+
+    def __init__(self, host, port, db=0, timeout=None):
+        self._socket = socket.create_connection((host, port), timeout=timeout)
+        self._reader = self._socket.makefile('rb')
+
+        if db:
+            self.execute('SELECT', db)
+
+    def close(self):
+        self._reader.close()
+        self._socket.close()
+
+    def execute(self, *args):
+        """
+        Sends a command and returns its reply.
+        """
+        parts = [b'*%d\r\n' % len(args)]
+        for arg in args:
+            if not isinstance(arg, bytes):
+                arg = str(arg).encode()
+            parts.append(b'$%d\r\n%s\r\n' % (len(arg), arg))
+
+        self._socket.sendall(b''.join(parts))
+
+        return self._read_reply()
+
+    def _read_reply(self):
+        line = self._reader.readline()
+        if not line:
+            raise ConnectionError('Connection closed by the server')
+
+        prefix, rest = line[:1], line[1:-2]
+
+        if prefix == b'+':
+            return rest.decode()
+        if prefix == b'-':
+            raise RedisProtocolError(rest.decode())
+        if prefix == b':':
+            return int(rest)
+        if prefix == b'$':
+            length = int(rest)
+            if length == -1:
+                return None
+            return self._reader.read(length + 2)[:-2]
+        if prefix == b'*':
+            length = int(rest)
+            if length == -1:
+                return None
+            return [self._read_reply() for _ in range(length)]
+
+        raise RedisProtocolError(f'Unexpected reply: {line!r}')
+
+
+class RedisCache(BaseCache):
+    """
+    Cache backend for any server speaking the Redis protocol.
+    LOCATION is a URL of the form redis://host:port/db.
+
+    Integers are stored as they are, so they can be incremented by the server. Everything else is pickled.
+    Each thread uses its own connection.
+    """
+
+    def __init__(self, server, params):
+        super().__init__(params)
+
+        url = urlparse(server)
+        self._host = url.hostname or 'localhost'
+        self._port = url.port or 6379
+        self._db = int(url.path.lstrip('/') or 0)
+        self._socket_timeout = params.get('OPTIONS', {}).get('SOCKET_TIMEOUT')
+        self._local = threading.local()
+
+    def get_backend_timeout(self, timeout=DEFAULT_TIMEOUT):
+        """
+        Returns the timeout in seconds from now, or None to never expire.
+        """
+        if timeout is DEFAULT_TIMEOUT:
+            timeout = self.default_timeout
+        return timeout
+
+    def _execute(self, *args):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = RedisConnection(self._host, self._port, self._db, self._socket_timeout)
+            self._local.connection = connection
+
+        try:
+            return connection.execute(*args)
+        except (ConnectionError, OSError):
+            # reconnect on the next command
+            connection.close()
+            self._local.connection = None
+            raise
+
+    def _encode(self, value):
+        if isinstance(value, int) and not isinstance(value, bool):
+            return str(value).encode()
+        return pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+
+    def _decode(self, value):
+        try:
+            return int(value)
+        except ValueError:
+            return pickle.loads(value)
+
+    def _set(self, key, value, timeout, *flags):
+        args = ['SET', key, self._encode(value), *flags]
+
+        if timeout is not None:
+            if timeout <= 0:
+                # expires straight away, like the other backends
+                if not flags:
+                    self._execute('DEL', key)
+                return False
+            args += ['PX', int(timeout * 1000)]
+
+        return self._execute(*args) is not None
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        return self._set(key, value, self.get_backend_timeout(timeout), 'NX')
+
+    def get(self, key, default=None, version=None):
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        value = self._execute('GET', key)
+        return default if value is None else self._decode(value)
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        self._set(key, value, self.get_backend_timeout(timeout))
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        timeout = self.get_backend_timeout(timeout)
+
+        if timeout is None:
+            return bool(self._execute('PERSIST', key)) or self.has_key(key, version=version)
+        return bool(self._execute('PEXPIRE', key, int(timeout * 1000)))
+
+    def delete(self, key, version=None):
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        return bool(self._execute('DEL', key))
+
+    def has_key(self, key, version=None):
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        return bool(self._execute('EXISTS', key))
+
+    def get_many(self, keys, version=None):
+        if not keys:
+            return {}
+
+        cache_keys = {self.make_key(key, version=version): key for key in keys}
+        for cache_key in cache_keys:
+            self.validate_key(cache_key)
+
+        values = self._execute('MGET', *cache_keys)
+
+        return {
+            cache_keys[cache_key]: self._decode(value)
+            for cache_key, value in zip(cache_keys, values)
+            if value is not None
+        }
+
+    def incr(self, key, delta=1, version=None):
+        cache_key = self.make_key(key, version=version)
+        self.validate_key(cache_key)
+
+        if not self._execute('EXISTS', cache_key):
+            raise ValueError(f"Key '{key}' not found")
+
+        return self._execute('INCRBY', cache_key, delta)
+
+    def clear(self):
+        self._execute('FLUSHDB')
+
+    def close(self, **kwargs):
+        # connections are kept open between requests
+        pass
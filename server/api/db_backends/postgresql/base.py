@@ -0,0 +1,60 @@
+"""
+PostgreSQL database backend that takes its connections from an application-side pool (see pool.py).
+
+Configured with the POOL entry of a database's settings:
+
+    'POOL': {
+        'MAX_SIZE': 10,        # connections kept open, pooling is off when 0
+        'MAX_OVERFLOW': 10,    # extra connections opened when all of them are in use
+        'TIMEOUT': 30,         # seconds to wait for a connection when the overflow is in use too
+        'RECYCLE': 3600,       # seconds after which a connection is replaced
+        'PRE_PING': True,      # whether idle connections are checked before they're handed out
+    }
+
+Closing a connection (e.g. at the end of each request when CONN_MAX_AGE is 0) returns it to the pool
+instead of closing it, so requests no longer pay for a new connection and authentication handshake.
+"""
+
+from django.db.backends.postgresql import base
+
+from .creation import DatabaseCreation
+from .pool import get_pool
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    creation_class = DatabaseCreation
+
+    @property
+    def pool_options(self):
+        return self.settings_dict.get('POOL') or {}
+
+    @property
+    def is_pooled(self):
+        return self.pool_options.get('MAX_SIZE', 0) > 0
+
+    def get_new_connection(self, conn_params):
+        if not self.is_pooled:
+            return super().get_new_connection(conn_params)
+
+        self._pool = get_pool(self.alias, conn_params, self.pool_options)
+        connection = self._pool.acquire()
+
+        # the same as the base backend does for new connections
+        options = self.settings_dict['OPTIONS']
+        try:
+            self.isolation_level = options['isolation_level']
+        except KeyError:
+            self.isolation_level = connection.isolation_level
+        else:
+            if self.isolation_level != connection.isolation_level:
+                connection.set_session(isolation_level=self.isolation_level)
+        base.psycopg2.extras.register_default_jsonb(conn_or_curs=connection, loads=lambda x: x)
+
+        return connection
+
+    def _close(self):
+        if self.connection is not None and self.is_pooled:
+            with self.wrap_database_errors:
+                return self._pool.release(self.connection)
+
+        return super()._close()
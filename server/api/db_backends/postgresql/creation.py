@@ -0,0 +1,10 @@
+from django.db.backends.postgresql import creation
+
+from .pool import close_pools
+
+
+class DatabaseCreation(creation.DatabaseCreation):
+    def _destroy_test_db(self, test_database_name, verbosity):
+        # a database can't be dropped while the pools hold connections to it
+        close_pools(database=test_database_name)
+        super()._destroy_test_db(test_database_name, verbosity)
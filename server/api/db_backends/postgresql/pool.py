@@ -0,0 +1,233 @@
+import threading
+import time
+
+import psycopg2
+from psycopg2 import extensions
+
+
+class ConnectionPool:
+    """
+    Thread-safe pool of psycopg2 connections to one database.
+
+    Up to max_size connections are kept open once created. When they're all checked out, up to max_overflow
+    more are opened, and closed as soon as they're returned. When those are checked out too, callers wait
+    up to `timeout` seconds for a connection to be returned before an OperationalError is raised.
+
+    Connections older than `recycle` seconds are replaced, and each idle connection is checked with
+    a `SELECT 1` before it's handed out when pre_ping is on, so connections dropped by the server
+    (e.g. after a restart or an idle timeout) are replaced instead of failing the request.
+    """
+
+    def __init__(self, connect, max_size, max_overflow=0, timeout=30, recycle=None, pre_ping=True, database=None):
+        self._connect = connect
+        self.database = database
+        self.max_size = max_size
+        self.max_overflow = max_overflow
+        self.timeout = timeout
+        self.recycle = recycle
+        self.pre_ping = pre_ping
+
+        self._condition = threading.Condition()
+        # idle connections, the most recently returned last so the warmest connections are reused first
+        self._idle = []
+        # when each open connection was opened, by id
+        self._opened_at = {}
+        self._checked_out = 0
+        self._counts = {'checkouts': 0, 'waits': 0, 'timeouts': 0, 'connections_opened': 0, 'connections_discarded': 0}
+
+    @property
+    def size(self):
+        """
+        Number of open connections, idle or checked out.
+        """
+        return len(self._idle) + self._checked_out
+
+    def _is_healthy(self, connection, opened_at):
+        """
+        Returns whether an idle connection can be handed out.
+        """
+        if connection.closed:
+            return False
+
+        if self.recycle is not None and time.monotonic() - opened_at >= self.recycle:
+            return False
+
+        if self.pre_ping:
+            try:
+                with connection.cursor() as cursor:
+                    cursor.execute('SELECT 1')
+                # the ping starts a transaction when autocommit is off
+                connection.rollback()
+            except psycopg2.Error:
+                return False
+
+        return True
+
+    def _discard(self, connection):
+        """
+        Closes a connection that's no longer part of the pool. Must be called while holding the lock.
+        """
+        self._opened_at.pop(id(connection), None)
+        self._counts['connections_discarded'] += 1
+        self._condition.notify()
+
+        try:
+            connection.close()
+        except psycopg2.Error:
+            pass
+
+    def acquire(self):
+        """
+        Returns a connection from the pool, which must be given back with release().
+        """
+        deadline = time.monotonic() + self.timeout
+
+        with self._condition:
+            self._counts['checkouts'] += 1
+
+            while True:
+                if self._idle:
+                    connection = self._idle.pop()
+                    self._checked_out += 1
+
+                    # checked outside of the lock, as the ping is a round trip to the server
+                    self._condition.release()
+                    try:
+                        healthy = self._is_healthy(connection, self._opened_at[id(connection)])
+                    finally:
+                        self._condition.acquire()
+
+                    if healthy:
+                        return connection
+
+                    self._checked_out -= 1
+                    self._discard(connection)
+                    continue
+
+                if self.size < self.max_size + self.max_overflow:
+                    self._checked_out += 1
+
+                    self._condition.release()
+                    try:
+                        connection = self._connect()
+                    except BaseException:
+                        self._condition.acquire()
+                        self._checked_out -= 1
+                        self._condition.notify()
+                        raise
+                    self._condition.acquire()
+
+                    self._opened_at[id(connection)] = time.monotonic()
+                    self._counts['connections_opened'] += 1
+                    return connection
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._counts['timeouts'] += 1
+                    raise psycopg2.OperationalError(
+                        f'No database connection was available within {self.timeout} seconds '
+                        f'(pool size {self.max_size}, overflow {self.max_overflow})'
+                    )
+
+                self._counts['waits'] += 1
+                self._condition.wait(remaining)
+
+    def release(self, connection):
+        """
+        Gives a connection back to the pool, rolling back any transaction left open.
+        Overflow connections and connections in an unknown state are closed.
+        """
+        reusable = not connection.closed
+
+        if reusable:
+            try:
+                status = connection.get_transaction_status()
+                if status == extensions.TRANSACTION_STATUS_UNKNOWN:
+                    reusable = False
+                elif status != extensions.TRANSACTION_STATUS_IDLE:
+                    connection.rollback()
+            except psycopg2.Error:
+                reusable = False
+
+        with self._condition:
+            self._checked_out -= 1
+
+            if reusable and self.size < self.max_size:
+                self._idle.append(connection)
+                self._condition.notify()
+            else:
+                self._discard(connection)
+
+    def close(self):
+        """
+        Closes the idle connections. Checked out connections are closed when they're returned.
+        """
+        with self._condition:
+            while self._idle:
+                self._discard(self._idle.pop())
+
+    def metrics(self):
+        """
+        Returns the current utilization of the pool and the counts of its events since it was created.
+        """
+        with self._condition:
+            return {
+                'max_size': self.max_size,
+                'max_overflow': self.max_overflow,
+                'size': self.size,
+                'idle': len(self._idle),
+                'checked_out': self._checked_out,
+                'overflow': max(self.size - self.max_size, 0),
+                'utilization': self._checked_out / self.max_size,
+                **self._counts,
+            }
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(alias, conn_params, options):
+    """
+    Returns the pool of connections made with the given parameters, creating it on first use.
+
+    The test runner and migrations connect the same alias to other databases (e.g. 'postgres' to create
+    the test database), so there's a pool for each set of parameters rather than one for each alias.
+    """
+    key = (alias, tuple(sorted((name, str(value)) for name, value in conn_params.items())))
+
+    with _pools_lock:
+        if key not in _pools:
+            _pools[key] = ConnectionPool(
+                lambda: psycopg2.connect(**conn_params),
+                max_size=options['MAX_SIZE'],
+                max_overflow=options.get('MAX_OVERFLOW', 0),
+                timeout=options.get('TIMEOUT', 30),
+                recycle=options.get('RECYCLE'),
+                pre_ping=options.get('PRE_PING', True),
+                database=conn_params.get('database'),
+            )
+
+        return _pools[key]
+
+
+def close_pools(database=None):
+    """
+    Closes the idle connections of every pool, or only of the pools of the named database.
+    """
+    with _pools_lock:
+        pools = list(_pools.values())
+
+    for pool in pools:
+        if database is None or pool.database == database:
+            pool.close()
+
+
+def pool_metrics():
+    """
+    Returns the metrics of every pool, keyed by the alias and database name of the pool.
+    """
+    with _pools_lock:
+        pools = list(_pools.items())
+
+    return {f'{alias}:{pool.database}': pool.metrics() for (alias, _), pool in pools}
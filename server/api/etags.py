@@ -0,0 +1,105 @@
+"""
+ETag functions for conditional GET requests, used with django.views.decorators.http.condition.
+
+Each ETag is built from the update dates of the rows a response is made from, fetched with a single
+query and without serializing anything, so an unchanged resource can be answered with a 304 straight away.
+A function returns None when there's nothing to compare (e.g. the resource doesn't exist),
+in which case the view handles the request as usual.
+"""
+
+import hashlib
+
+from django.db.models import Count, Exists, Max, OuterRef
+
+from .models import Membership, Profile, Project
+
+
+def _make_etag(*parts):
+    """
+    Returns a strong ETag made from the given parts.
+    """
+    return '"%s"' % hashlib.sha1('|'.join(str(part) for part in parts).encode()).hexdigest()
+
+
+def account_etag(request, pk, **kwargs):
+    """
+    ETag of a student account, which changes when its profile or name changes.
+    """
+    date_updated = Profile.objects.filter(account_id=pk).values_list('date_updated', flat=True).first()
+
+    if date_updated is None:
+        return None
+
+    return _make_etag('account', pk, date_updated)
+
+
+def project_etag(request, project_pk, **kwargs):
+    """
+    ETag of a project, which changes when the project, its follower count, its team,
+    or the names of its owner and team members change.
+    When the viewer block is included, the ETag also changes with the requesting user's relations to the project.
+    """
+    include_viewer = 'viewer' in request.query_params.get('include', '').split(',')
+
+    projects = Project.objects.filter(pk=project_pk)
+
+    if include_viewer:
+        projects = projects.with_viewer(request.user)
+
+    fields = ['id', 'date_updated', 'follower_count', 'owner__profile__date_updated']
+    if include_viewer:
+        fields += ['viewer_membership_id', 'viewer_follow_id', 'viewer_request_id']
+
+    project = projects.values(*fields).annotate(
+        team_updated=Max('team_members__user__profile__date_updated')
+    ).first()
+
+    if project is None:
+        return None
+
+    return _make_etag('project', request.user.pk if include_viewer else None, *project.values())
+
+
+def _get_message_list_versions(project_pk, messages, **annotations):
+    """
+    Helper function for fetching what a page of a project's private or public messages is made from:
+    the project title, the messages, and the names of their authors.
+    Returns dict or None.
+    """
+    return Project.objects.filter(pk=project_pk).values('id', 'owner', 'date_updated').annotate(
+        message_count=Count(messages, distinct=True),
+        messages_updated=Max(f'{messages}__date_updated'),
+        authors_updated=Max(f'{messages}__user__profile__date_updated'),
+        **annotations,
+    ).first()
+
+
+def private_message_list_etag(request, project_pk, **kwargs):
+    """
+    ETag of a page of a project's private messages.
+    None if the requesting user isn't the owner or a member of the project, so they still get a 403.
+    """
+    versions = _get_message_list_versions(
+        project_pk,
+        'private_messages',
+        is_member=Exists(Membership.objects.filter(project=OuterRef('pk'), user=request.user)),
+    )
+
+    if versions is None or not (versions['owner'] == request.user.pk or versions['is_member']):
+        return None
+
+    # each page has its own ETag
+    return _make_etag('private_messages', request.get_full_path(), *versions.values())
+
+
+def public_message_list_etag(request, project_pk, **kwargs):
+    """
+    ETag of a page of a project's public messages.
+    """
+    versions = _get_message_list_versions(project_pk, 'public_messages')
+
+    if versions is None:
+        return None
+
+    # each page has its own ETag
+    return _make_etag('public_messages', request.get_full_path(), *versions.values())
@@ -0,0 +1,231 @@
+"""
+Server-Sent Events stream of the changes to the authenticated user's project requests,
+served by the ASGI entry point at /api/requests/events/.
+
+Clients authenticate with their SimpleJWT access token, either in the `Authorization: Bearer <token>` header
+or in the `token` query param (EventSource can't set headers). Each event is sent as:
+
+    id: 42
+    event: request.accepted
+    data: {"request": {...}}
+
+where the request is in the same format as the request list endpoint. Events are sent when a request
+the user sent or received is created, accepted, declined, or cancelled.
+A client reconnecting with the `Last-Event-ID` header (or `last_event_id` query param) is first sent
+every event it missed.
+
+The stream ends when the access token expires, after a `token.expired` event,
+so the client should reconnect with a refreshed token.
+"""
+
+import asyncio
+import json
+import time
+from urllib.parse import parse_qs
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import Q
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from .broker import get_broker, publish_best_effort
+from .models import RequestEvent
+from .realtime import authenticate_token
+from .serializers import RequestSerializer
+
+REQUEST_EVENTS_PATH = '/api/requests/events/'
+
+# a comment is sent this often (in seconds) when there are no events, so idle connections aren't dropped
+_KEEPALIVE_INTERVAL = 15
+
+
+def request_event_channel(user_pk):
+    """
+    Returns the broker channel of the events of a user's project requests.
+    """
+    return f'user.{user_pk}.requests'
+
+
+def _event_data(event):
+    """
+    Returns the data sent for a request event.
+    """
+    return {
+        'id': event.id,
+        'type': f'request.{event.event_type}',
+        'request': RequestSerializer(event.request).data,
+    }
+
+
+@receiver(post_save, sender=RequestEvent)
+def publish_request_event(sender, instance, created, **kwargs):
+    """
+    Each time a request event is created, it's sent to the requester and requestee once committed.
+    Broker errors are only logged, as the request change was already committed.
+    """
+    if not created:
+        return
+
+    data = _event_data(instance)
+    request = instance.request
+
+    def publish():
+        for user_pk in (request.requester_id, request.requestee_id):
+            publish_best_effort(request_event_channel(user_pk), data)
+
+    transaction.on_commit(publish)
+
+
+def _encode_event(data):
+    """
+    Returns an event in the text/event-stream format.
+    """
+    body = json.dumps({'request': data['request']})
+
+    return f'id: {data["id"]}\nevent: {data["type"]}\ndata: {body}\n\n'.encode()
+
+
+def _get_user(headers, query_params):
+    """
+    Returns the user of the access token in the Authorization header or the query params along with
+    the time the token expires at, or (None, None).
+    """
+    close_old_connections()
+
+    try:
+        token = query_params.get('token', [None])[0]
+
+        authorization = headers.get(b'authorization', b'').decode()
+        if authorization.startswith('Bearer '):
+            token = authorization[len('Bearer '):]
+
+        return authenticate_token(token)
+    finally:
+        close_old_connections()
+
+
+def _get_missed_events(user, last_event_id):
+    """
+    Returns the data of the user's request events after the given event id, oldest first.
+    """
+    close_old_connections()
+
+    try:
+        events = (
+            RequestEvent.objects
+            .filter(Q(request__requester=user) | Q(request__requestee=user), id__gt=last_event_id)
+            .select_related('request__requester', 'request__requestee', 'request__project')
+            .order_by('id')
+        )
+
+        return [_event_data(event) for event in events]
+    finally:
+        close_old_connections()
+
+
+def _get_last_event_id(headers, query_params):
+    """
+    Returns the id of the last event the client received before reconnecting, or None.
+    """
+    value = headers.get(b'last-event-id', b'').decode() or query_params.get('last_event_id', [''])[0]
+
+    try:
+        return int(value)
+    except ValueError:
+        return None
+
+
+def _cors_headers(headers):
+    """
+    Returns the CORS headers for the stream, as it doesn't go through the CORS middleware.
+    """
+    origin = headers.get(b'origin', b'').decode()
+
+    if origin in getattr(settings, 'CORS_ALLOWED_ORIGINS', []):
+        return [(b'access-control-allow-origin', origin.encode()), (b'vary', b'Origin')]
+
+    return []
+
+
+async def request_event_application(scope, receive, send):
+    """
+    ASGI application for the request event stream.
+    """
+    headers = dict(scope['headers'])
+    query_params = parse_qs(scope.get('query_string', b'').decode())
+
+    user, expires_at = await sync_to_async(_get_user)(headers, query_params)
+
+    if user is None:
+        await send({
+            'type': 'http.response.start',
+            'status': 401,
+            'headers': [(b'content-type', b'application/json'), *_cors_headers(headers)],
+        })
+        await send({
+            'type': 'http.response.body',
+            'body': json.dumps({'detail': 'Authentication credentials were not provided or are invalid.'}).encode(),
+        })
+        return
+
+    # subscribe before looking up missed events, so nothing sent in between is lost
+    subscription = await get_broker().subscribe(request_event_channel(user.pk))
+
+    try:
+        await send({
+            'type': 'http.response.start',
+            'status': 200,
+            'headers': [
+                (b'content-type', b'text/event-stream'),
+                (b'cache-control', b'no-cache'),
+                # stop proxies from buffering the stream
+                (b'x-accel-buffering', b'no'),
+                *_cors_headers(headers),
+            ],
+        })
+
+        last_event_id = _get_last_event_id(headers, query_params)
+
+        if last_event_id is not None:
+            for data in await sync_to_async(_get_missed_events)(user, last_event_id):
+                await send({'type': 'http.response.body', 'body': _encode_event(data), 'more_body': True})
+                last_event_id = data['id']
+
+        disconnected = asyncio.ensure_future(receive())
+        getting = asyncio.ensure_future(subscription.get())
+
+        try:
+            while True:
+                # wake up for the next keep-alive or when the token expires, whichever comes first
+                timeout = max(0, min(_KEEPALIVE_INTERVAL, expires_at - time.time()))
+                done, _ = await asyncio.wait({disconnected, getting}, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+
+                if disconnected in done:
+                    if disconnected.result()['type'] == 'http.disconnect':
+                        break
+                    # the (empty) request body, the disconnect comes later
+                    disconnected = asyncio.ensure_future(receive())
+
+                # nothing is sent with an expired token, the client reconnects with a refreshed one
+                if time.time() >= expires_at:
+                    await send({'type': 'http.response.body', 'body': b'event: token.expired\ndata: {}\n\n', 'more_body': False})
+                    break
+
+                if getting in done:
+                    data = getting.result()
+                    getting = asyncio.ensure_future(subscription.get())
+
+                    # skip events already sent as missed events
+                    if last_event_id is not None and data['id'] <= last_event_id:
+                        continue
+
+                    await send({'type': 'http.response.body', 'body': _encode_event(data), 'more_body': True})
+                elif not done:
+                    await send({'type': 'http.response.body', 'body': b': keep-alive\n\n', 'more_body': True})
+        finally:
+            disconnected.cancel()
+            getting.cancel()
+    finally:
+        await subscription.close()
@@ -0,0 +1,28 @@
+from django.db.models import CharField, FloatField, Func, TextField, Value
+from django.db.models.lookups import PostgresOperatorLookup
+
+
+@CharField.register_lookup
+@TextField.register_lookup
+class TrigramWordSimilar(PostgresOperatorLookup):
+    """
+    Matches text containing a word (or run of words) similar to the given string,
+    using the pg_trgm word similarity operator so a trigram index can be used.
+
+    e.g. Profile.objects.filter(search_text__trigram_word_similar='enginer')
+    """
+    lookup_name = 'trigram_word_similar'
+    postgres_operator = '%%>'
+
+
+class TrigramWordSimilarity(Func):
+    """
+    The pg_trgm word similarity between a string and the words in an expression, from 0 to 1.
+    """
+    function = 'WORD_SIMILARITY'
+    output_field = FloatField()
+
+    def __init__(self, string, expression, **extra):
+        if not hasattr(string, 'resolve_expression'):
+            string = Value(string)
+        super().__init__(string, expression, **extra)
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from ...cache import response_cache
+from ...models import Follow, Project
+
+
+class Command(BaseCommand):
+    """
+    Recounts the followers of every project and fixes any follower counts that have drifted,
+    e.g. because follows were changed with bulk queryset operations that don't send signals.
+    """
+
+    help = 'Fixes project follower counts that no longer match the number of follows'
+
+    def handle(self, *args, **options):
+        follower_counts = (
+            Follow.objects.filter(project=OuterRef('pk'))
+            .order_by()
+            .values('project')
+            .annotate(count=Count('pk'))
+            .values('count')
+        )
+        actual_count = Coalesce(Subquery(follower_counts), 0)
+
+        # only projects whose count has drifted are updated
+        drifted = list(Project.objects.exclude(follower_count=actual_count).values_list('pk', flat=True))
+        updated = Project.objects.filter(pk__in=drifted).update(follower_count=actual_count)
+
+        # bulk updates don't send signals, so the cached responses of the projects are invalidated here
+        if drifted:
+            response_cache.invalidate('projects', *(f'project:{pk}' for pk in drifted))
+
+        self.stdout.write(self.style.SUCCESS(f'Fixed the follower count of {updated} project(s)'))
@@ -0,0 +1,41 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from ...stats import refresh_stats
+
+
+class Command(BaseCommand):
+    """
+    Refreshes the materialized views of the staff statistics served by /api/stats/, once or on a schedule.
+
+    Either run it periodically (e.g. from cron), or keep it running as a scheduler process with --schedule,
+    which refreshes the views every STATS_REFRESH_INTERVAL seconds (or --interval seconds).
+    """
+
+    help = 'Refreshes the role statistics served by /api/stats/, once or on a schedule'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--schedule', action='store_true', help='Keep running and refresh the statistics every interval')
+        parser.add_argument(
+            '--interval', type=int, default=settings.STATS_REFRESH_INTERVAL,
+            help='Seconds between the starts of the refreshes when scheduled (defaults to STATS_REFRESH_INTERVAL)',
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            start = time.monotonic()
+
+            if refresh_stats():
+                self.stdout.write(self.style.SUCCESS(f'Refreshed the statistics in {time.monotonic() - start:.2f}s'))
+            else:
+                self.stdout.write(self.style.WARNING('The statistics are already being refreshed by another process'))
+
+            if not options['schedule']:
+                return
+
+            # the connection isn't held open while waiting for the next refresh
+            connections.close_all()
+            time.sleep(max(0, options['interval'] - (time.monotonic() - start)))
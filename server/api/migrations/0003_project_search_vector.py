@@ -0,0 +1,43 @@
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations, models
+
+
+def populate_search_vectors(apps, schema_editor):
+    """
+    Builds the full-text search document of every existing project.
+    Matches api.models.project_search_vector.
+    """
+    Project = apps.get_model('api', 'Project')
+    roles = models.Func(models.F('desired_roles'), models.Value(' '), function='array_to_string')
+
+    Project.objects.update(search_vector=(
+        SearchVector('title', weight='A', config='english') +
+        SearchVector('owner_role', roles, weight='B', config='english') +
+        SearchVector('description', weight='C', config='english')
+    ))
+
+
+class Migration(migrations.Migration):
+
+    # the index is built concurrently so the projects table isn't locked, which can't be done in a transaction
+    atomic = False
+
+    dependencies = [
+        ('api', '0002_auto_20210428_2028'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(populate_search_vectors, migrations.RunPython.noop),
+        AddIndexConcurrently(
+            model_name='project',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='api_project_search_idx'),
+        ),
+    ]
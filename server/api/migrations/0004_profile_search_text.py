@@ -0,0 +1,43 @@
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import AddIndexConcurrently, TrigramExtension
+from django.db import migrations, models
+
+
+def populate_search_text(apps, schema_editor):
+    """
+    Builds the search text of every existing profile.
+    Matches api.models.profile_search_text.
+    """
+    Profile = apps.get_model('api', 'Profile')
+
+    profiles = []
+    for profile in Profile.objects.select_related('account').iterator():
+        account = profile.account
+        profile.search_text = ' '.join([account.first_name, account.last_name, profile.programme, *profile.roles])
+        profiles.append(profile)
+
+    Profile.objects.bulk_update(profiles, ['search_text'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    # the index is built concurrently so the profiles table isn't locked, which can't be done in a transaction
+    atomic = False
+
+    dependencies = [
+        ('api', '0003_project_search_vector'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddField(
+            model_name='profile',
+            name='search_text',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        migrations.RunPython(populate_search_text, migrations.RunPython.noop),
+        AddIndexConcurrently(
+            model_name='profile',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_text'], name='api_profile_search_trgm_idx', opclasses=['gin_trgm_ops']),
+        ),
+    ]
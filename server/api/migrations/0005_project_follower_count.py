@@ -0,0 +1,37 @@
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+
+
+def populate_follower_counts(apps, schema_editor):
+    """
+    Counts the followers of every existing project.
+    """
+    Project = apps.get_model('api', 'Project')
+    Follow = apps.get_model('api', 'Follow')
+
+    follower_counts = Follow.objects.filter(project=models.OuterRef('pk')).order_by().values('project').annotate(count=models.Count('pk')).values('count')
+    Project.objects.update(follower_count=Coalesce(models.Subquery(follower_counts), 0))
+
+
+class Migration(migrations.Migration):
+
+    # the index is built concurrently so the projects table isn't locked, which can't be done in a transaction
+    atomic = False
+
+    dependencies = [
+        ('api', '0004_profile_search_text'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='follower_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(populate_follower_counts, migrations.RunPython.noop),
+        AddIndexConcurrently(
+            model_name='project',
+            index=models.Index(fields=['follower_count', 'date_created', 'id'], name='api_project_popularity_idx'),
+        ),
+    ]
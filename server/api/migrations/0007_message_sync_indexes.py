@@ -0,0 +1,23 @@
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    # the indexes are built concurrently so the message tables aren't locked, which can't be done in a transaction
+    atomic = False
+
+    dependencies = [
+        ('api', '0006_date_updated'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='privatemessage',
+            index=models.Index(fields=['project', 'date_created', 'id'], name='api_private_message_sync_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='publicmessage',
+            index=models.Index(fields=['project', 'date_created', 'id'], name='api_public_message_sync_idx'),
+        ),
+    ]
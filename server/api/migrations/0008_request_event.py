@@ -0,0 +1,23 @@
+# Generated by Django 3.1.5 on 2026-10-16 21:06
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0007_message_sync_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RequestEvent',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('event_type', models.CharField(choices=[('created', 'Created'), ('accepted', 'Accepted'), ('declined', 'Declined'), ('cancelled', 'Cancelled')], max_length=9)),
+                ('date_created', models.DateTimeField(auto_now_add=True)),
+                ('request', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='events', to='api.request')),
+            ],
+        ),
+    ]
@@ -0,0 +1,38 @@
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+
+
+def remove_duplicates(apps, schema_editor):
+    """
+    Deletes all but the first follow of a user for a project, and all but the first membership of a user in a project,
+    then recounts the followers of every project.
+    """
+    Project = apps.get_model('api', 'Project')
+    Follow = apps.get_model('api', 'Follow')
+    Membership = apps.get_model('api', 'Membership')
+
+    for model in (Follow, Membership):
+        first_ids = model.objects.order_by().values('user', 'project').annotate(first_id=models.Min('id')).values('first_id')
+        model.objects.exclude(id__in=first_ids).delete()
+
+    follower_counts = Follow.objects.filter(project=models.OuterRef('pk')).order_by().values('project').annotate(count=models.Count('pk')).values('count')
+    Project.objects.update(follower_count=Coalesce(models.Subquery(follower_counts), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0008_request_event'),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicates, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='follow',
+            constraint=models.UniqueConstraint(fields=('user', 'project'), name='api_follow_user_project_uniq'),
+        ),
+        migrations.AddConstraint(
+            model_name='membership',
+            constraint=models.UniqueConstraint(fields=('project', 'user'), name='api_membership_project_user_uniq'),
+        ),
+    ]
@@ -0,0 +1,27 @@
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    # the indexes are built concurrently so the requests table isn't locked, which can't be done in a transaction
+    atomic = False
+
+    dependencies = [
+        ('api', '0009_follow_membership_unique'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='request',
+            index=models.Index(condition=models.Q(is_active=True), fields=['requester', 'date_created', 'id'], name='api_request_requester_act_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='request',
+            index=models.Index(condition=models.Q(is_active=True), fields=['requestee', 'date_created', 'id'], name='api_request_requestee_act_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='request',
+            index=models.Index(condition=models.Q(is_active=True), fields=['project', 'requester', 'requestee'], name='api_request_pair_act_idx'),
+        ),
+    ]
@@ -0,0 +1,43 @@
+from django.db import migrations, models
+
+
+def cancel_duplicate_active_requests(apps, schema_editor):
+    """
+    Cancels all but the first active request between two users for a project, in either direction.
+    """
+    Request = apps.get_model('api', 'Request')
+
+    seen = set()
+    duplicate_ids = []
+    active_requests = Request.objects.filter(is_active=True).order_by('id').values_list('id', 'project_id', 'requester_id', 'requestee_id')
+
+    for request_id, project_id, requester_id, requestee_id in active_requests.iterator():
+        pair = (project_id, min(requester_id, requestee_id), max(requester_id, requestee_id))
+        if pair in seen:
+            duplicate_ids.append(request_id)
+        else:
+            seen.add(pair)
+
+    Request.objects.filter(id__in=duplicate_ids).update(status='CNL', is_active=False)
+
+
+class Migration(migrations.Migration):
+
+    # the index is built concurrently so the requests table isn't locked, which can't be done in a transaction
+    atomic = False
+
+    dependencies = [
+        ('api', '0010_request_active_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(cancel_duplicate_active_requests, migrations.RunPython.noop, atomic=True),
+        # only one active request between two users for a project, whichever of them sent it.
+        # Unique indexes on expressions can't be declared on models in Django 3.1, so it's only created here
+        migrations.RunSQL(
+            'CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS api_request_active_pair_uniq '
+            'ON api_request (project_id, LEAST(requester_id, requestee_id), GREATEST(requester_id, requestee_id)) '
+            'WHERE is_active',
+            'DROP INDEX CONCURRENTLY IF EXISTS api_request_active_pair_uniq',
+        ),
+    ]
@@ -0,0 +1,98 @@
+from collections import Counter
+
+from django.db import migrations
+
+# number of rows updated per query
+BATCH_SIZE = 1000
+
+
+def normalize_role(role):
+    return ' '.join(role.split()).casefold()
+
+
+def canonicalize_roles(apps, schema_editor):
+    """
+    Creates a role for each distinct role name used (compared case-insensitively), named after its most used spelling,
+    then replaces every role name with its canonical name and links it to its role.
+    Blank and duplicate roles are left out of the profile roles and desired roles.
+    """
+    Role = apps.get_model('api', 'Role')
+    Profile = apps.get_model('api', 'Profile')
+    Project = apps.get_model('api', 'Project')
+    Membership = apps.get_model('api', 'Membership')
+    Request = apps.get_model('api', 'Request')
+
+    spellings = {}  # role key -> Counter of spellings
+
+    def count(names):
+        for name in names:
+            if name and name.strip():
+                spellings.setdefault(normalize_role(name), Counter())[' '.join(name.split())] += 1
+
+    for roles in Profile.objects.values_list('roles', flat=True).iterator():
+        count(roles)
+    for owner_role, desired_roles in Project.objects.values_list('owner_role', 'desired_roles').iterator():
+        count([owner_role, *desired_roles])
+    for model in (Membership, Request):
+        count(model.objects.values_list('role', flat=True).iterator())
+
+    # ties go to the first spelling in alphabetical order
+    Role.objects.bulk_create([
+        Role(key=key, name=min(counts, key=lambda spelling: (-counts[spelling], spelling)), aliases=[])
+        for key, counts in spellings.items()
+    ], batch_size=BATCH_SIZE)
+    roles = {role.key: role for role in Role.objects.all()}
+
+    def canonical(names):
+        canonical_roles = []
+        for name in names:
+            role = roles.get(normalize_role(name)) if name else None
+            if role is not None and role not in canonical_roles:
+                canonical_roles.append(role)
+        return canonical_roles
+
+    def update_in_batches(model, fields, change):
+        batch = []
+        for instance in model.objects.only('id', *fields).order_by('id').iterator():
+            change(instance)
+            batch.append(instance)
+            if len(batch) == BATCH_SIZE:
+                model.objects.bulk_update(batch, fields)
+                batch = []
+        model.objects.bulk_update(batch, fields)
+
+    def change_profile(profile):
+        profile_roles = canonical(profile.roles)
+        profile.roles = [role.name for role in profile_roles]
+        profile.role_ids = [role.id for role in profile_roles]
+
+    def change_project(project):
+        owner_role = roles.get(normalize_role(project.owner_role))
+        if owner_role is not None:
+            project.owner_role = owner_role.name
+            project.canonical_owner_role = owner_role
+        desired_roles = canonical(project.desired_roles)
+        project.desired_roles = [role.name for role in desired_roles]
+        project.desired_role_ids = [role.id for role in desired_roles]
+
+    def change_role(instance):
+        role = roles.get(normalize_role(instance.role))
+        if role is not None:
+            instance.role = role.name
+            instance.canonical_role = role
+
+    update_in_batches(Profile, ['roles', 'role_ids'], change_profile)
+    update_in_batches(Project, ['owner_role', 'canonical_owner_role', 'desired_roles', 'desired_role_ids'], change_project)
+    update_in_batches(Membership, ['role', 'canonical_role'], change_role)
+    update_in_batches(Request, ['role', 'canonical_role'], change_role)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0012_role'),
+    ]
+
+    operations = [
+        migrations.RunPython(canonicalize_roles, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,24 @@
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    # the indexes are built concurrently so the profiles and projects tables aren't locked, which can't be done in a transaction
+    atomic = False
+
+    dependencies = [
+        ('api', '0013_canonicalize_roles'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='profile',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['role_ids'], name='api_profile_role_ids_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='project',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['desired_role_ids'], name='api_project_role_ids_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    # the indexes are built concurrently so the projects table isn't locked, which can't be done in a transaction
+    atomic = False
+
+    dependencies = [
+        ('api', '0014_role_ids_indexes'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='project',
+            index=models.Index(fields=['category', 'date_created', 'id'], name='api_project_category_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='project',
+            index=models.Index(fields=['date_created', 'id'], name='api_project_created_idx'),
+        ),
+    ]
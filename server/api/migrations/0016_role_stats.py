@@ -0,0 +1,83 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+# The views count the role ids kept up to date on save, which hold no duplicates, so each profile or project is counted once.
+# Concurrent refreshes need a unique index on each view.
+
+CREATE_ROLE_STATS = """
+CREATE MATERIALIZED VIEW api_role_stats AS
+SELECT api_role.id AS role_id,
+       COALESCE(supply.student_count, 0) AS student_count,
+       COALESCE(demand.project_count, 0) AS project_count,
+       now() AS refreshed_at
+FROM api_role
+LEFT JOIN (
+    SELECT unnest(role_ids) AS role_id, count(*) AS student_count FROM api_profile GROUP BY 1
+) supply ON supply.role_id = api_role.id
+LEFT JOIN (
+    SELECT unnest(desired_role_ids) AS role_id, count(*) AS project_count FROM api_project GROUP BY 1
+) demand ON demand.role_id = api_role.id
+WHERE supply.role_id IS NOT NULL OR demand.role_id IS NOT NULL;
+
+CREATE UNIQUE INDEX api_role_stats_role_uniq ON api_role_stats (role_id);
+"""
+
+CREATE_ROLE_CATEGORY_STATS = """
+CREATE MATERIALIZED VIEW api_role_category_stats AS
+SELECT row_number() OVER (ORDER BY demand.role_id, demand.category) AS id,
+       demand.role_id,
+       demand.category,
+       demand.project_count,
+       COALESCE(filled.member_count, 0) AS member_count
+FROM (
+    SELECT unnest(desired_role_ids) AS role_id, category, count(*) AS project_count FROM api_project GROUP BY 1, 2
+) demand
+LEFT JOIN (
+    SELECT membership.canonical_role_id AS role_id, project.category, count(*) AS member_count
+    FROM api_membership membership
+    JOIN api_project project ON project.id = membership.project_id
+    WHERE membership.canonical_role_id IS NOT NULL
+    GROUP BY 1, 2
+) filled ON filled.role_id = demand.role_id AND filled.category = demand.category;
+
+CREATE UNIQUE INDEX api_role_category_stats_uniq ON api_role_category_stats (role_id, category);
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0015_project_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.RunSQL(CREATE_ROLE_STATS, 'DROP MATERIALIZED VIEW api_role_stats;'),
+        migrations.RunSQL(CREATE_ROLE_CATEGORY_STATS, 'DROP MATERIALIZED VIEW api_role_category_stats;'),
+        migrations.CreateModel(
+            name='RoleStats',
+            fields=[
+                ('role', models.OneToOneField(on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='stats', serialize=False, to='api.role')),
+                ('student_count', models.IntegerField()),
+                ('project_count', models.IntegerField()),
+                ('refreshed_at', models.DateTimeField()),
+            ],
+            options={
+                'db_table': 'api_role_stats',
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='RoleCategoryStats',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('category', models.CharField(choices=[('ART', 'Arts'), ('EDN', 'Education'), ('FSN', 'Fashion'), ('FLM', 'Film'), ('FNC', 'Finance'), ('MCN', 'Medicine'), ('SFW', 'Software'), ('SPT', 'Sport'), ('TEC', 'Technology')], max_length=3)),
+                ('project_count', models.IntegerField()),
+                ('member_count', models.IntegerField()),
+                ('role', models.ForeignKey(on_delete=django.db.models.deletion.DO_NOTHING, related_name='category_stats', to='api.role')),
+            ],
+            options={
+                'db_table': 'api_role_category_stats',
+                'managed': False,
+            },
+        ),
+    ]
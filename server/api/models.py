@@ -1,10 +1,170 @@
+import re
+
 from django.conf import settings
 from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import (SearchQuery, SearchRank,
+                                            SearchVector, SearchVectorField)
 from django.core.exceptions import ValidationError
-from django.db import models
-from django.db.models.signals import post_save
+from django.db import models, transaction
+from django.db.models.functions import Cast, Now
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 
+from .lookups import TrigramWordSimilar  # registers the trigram_word_similar lookup
+
+
+def normalize_role(role):
+    """
+    Returns the key a role is matched by: lowercase, with its whitespace collapsed.
+    """
+    return ' '.join(role.split()).casefold()
+
+
+def _roles_changed(update_fields, *fields):
+    """
+    Returns whether a save with the given update_fields saves any of the given role fields.
+    """
+    return update_fields is None or not set(fields).isdisjoint(update_fields)
+
+
+class RoleQuerySet(models.QuerySet):
+    """
+    Custom queryset for roles.
+    """
+
+    def matching(self, names):
+        """
+        Returns the roles whose canonical name or one of whose aliases matches any of the given names, case-insensitively.
+        Uses the unique index on the role keys and the GIN index on the aliases.
+        """
+        keys = list({normalize_role(name) for name in names} - {''})
+
+        return self.filter(models.Q(key__in=keys) | models.Q(aliases__overlap=keys))
+
+    def resolve(self, names):
+        """
+        Returns a dict from the key of each of the given (non-blank) role names to its role.
+        Roles that don't exist yet are created, with the name they were first given with as their canonical name.
+
+        Runs at most 3 queries, whatever the number of names.
+        """
+        names = {normalize_role(name): ' '.join(name.split()) for name in reversed(names) if name and name.strip()}
+
+        if not names:
+            return {}
+
+        resolved = {}
+
+        def add_matches(roles):
+            for role in roles:
+                for key in (role.key, *role.aliases):
+                    if key in names:
+                        resolved[key] = role
+
+        add_matches(self.matching(names))
+        missing_keys = [key for key in names if key not in resolved]
+
+        if missing_keys:
+            # roles created by a concurrent save in the meantime are left as they are, and fetched with the new ones
+            self.bulk_create([self.model(name=names[key], key=key) for key in missing_keys], ignore_conflicts=True)
+            add_matches(self.matching(missing_keys))
+
+        return resolved
+
+
+class Role(models.Model):
+    """
+    The taxonomy of roles used in student profiles, projects, team memberships, and project requests.
+
+    Each role has a canonical name, and any number of aliases (e.g. 'ux designer' for 'User Experience Designer').
+    Roles are matched case-insensitively by their key (their normalized canonical name) or by one of their aliases,
+    and are stored by id alongside the role names elsewhere, so roles are looked up with integer index lookups.
+    """
+
+    # The canonical spelling of the role, which the role names elsewhere are replaced with
+    name = models.CharField(max_length=40)
+    # The normalized canonical name, see normalize_role
+    key = models.CharField(max_length=40, unique=True, editable=False)
+    # Normalized alternative names of the role
+    aliases = ArrayField(models.TextField(), default=list, blank=True)
+
+    objects = RoleQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            GinIndex(fields=['aliases'], name='api_role_aliases_idx'),
+        ]
+
+    def __str__(self):
+        return self.name
+
+    def clean(self):
+        self.name = ' '.join(self.name.split())
+        aliases = {normalize_role(alias) for alias in self.aliases} - {normalize_role(self.name), ''}
+
+        taken = Role.objects.exclude(pk=self.pk).matching([self.name, *aliases])
+        if taken.exists():
+            raise ValidationError(f'The name or one of the aliases is already used by the role "{taken.first()}"')
+
+    def save(self, *args, **kwargs):
+        self.name = ' '.join(self.name.split())
+        self.key = normalize_role(self.name)
+        self.aliases = sorted({normalize_role(alias) for alias in self.aliases} - {self.key, ''})
+        super().save(*args, **kwargs)
+
+
+def roles_filter(field, names, match_all=False):
+    """
+    Returns a Q object for filtering by an array of role ids (e.g. 'desired_role_ids') the rows having any of the roles
+    with the given names, or all of them if match_all is set. Names are matched like in RoleQuerySet.matching.
+
+    The roles are looked up by name once, and the rows are filtered with the array overlap (&&)
+    and contains (@>) operators, which use the GIN index of the array.
+    """
+    keys = {normalize_role(name) for name in names} - {''}
+
+    if not keys:
+        return models.Q()
+
+    role_ids = {}
+    for role in Role.objects.matching(keys):
+        for key in (role.key, *role.aliases):
+            if key in keys:
+                role_ids[key] = role.pk
+
+    if match_all:
+        # no row has a role that doesn't exist
+        if len(role_ids) < len(keys):
+            return models.Q(pk__in=[])
+
+        return models.Q(**{f'{field}__contains': sorted(set(role_ids.values()))})
+
+    return models.Q(**{f'{field}__overlap': sorted(set(role_ids.values()))})
+
+
+def _canonical_roles(names, resolved):
+    """
+    Returns the roles of the given names, as resolved by RoleQuerySet.resolve, in order and without blanks or duplicates.
+    """
+    roles = []
+
+    for name in names:
+        role = resolved.get(normalize_role(name)) if name else None
+        if role is not None and role not in roles:
+            roles.append(role)
+
+    return roles
+
+
+def _canonical_role(name):
+    """
+    Returns the canonical name and the role of a single role name, or the name and None if it's blank.
+    """
+    role = Role.objects.resolve([name]).get(normalize_role(name))
+
+    return (role.name, role) if role is not None else (name, None)
+
 
 class Profile(models.Model):
     """
@@ -17,9 +177,42 @@ class Profile(models.Model):
     programme = models.CharField(max_length=150, blank=True)
     about = models.TextField(max_length=1000, blank=True)
     roles = ArrayField(models.CharField(max_length=40, blank=True), size=3, default=list, blank=True)
+    # Ids of the roles, in the same order as their names, kept up to date on save
+    role_ids = ArrayField(models.IntegerField(), default=list, blank=True, editable=False)
+    # Names, programme, and roles of the student in a single trigram indexed field for fuzzy searching
+    search_text = models.TextField(blank=True, default='', editable=False)
+    # Changes whenever the profile or the student's name changes, used for ETags
+    date_updated = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            GinIndex(fields=['search_text'], name='api_profile_search_trgm_idx', opclasses=['gin_trgm_ops']),
+            # matches the lookups of the students with any or all of a set of roles
+            GinIndex(fields=['role_ids'], name='api_profile_role_ids_idx'),
+        ]
 
     def __str__(self):
         return self.account.username
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+
+        if _roles_changed(update_fields, 'roles'):
+            self.canonicalize_roles()
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'roles', 'role_ids'}
+
+        self.search_text = profile_search_text(self.account, self)
+        super().save(*args, **kwargs)
+
+    def canonicalize_roles(self):
+        """
+        Replaces the roles with their canonical names, leaving out blanks and duplicates, and sets their ids.
+        """
+        roles = _canonical_roles(self.roles, Role.objects.resolve(self.roles))
+
+        self.roles = [role.name for role in roles]
+        self.role_ids = [role.pk for role in roles]
     
     def set_programme(self, programme):
         self.programme = programme
@@ -31,6 +224,13 @@ class Profile(models.Model):
         self.roles = roles
 
 
+def profile_search_text(account, profile):
+    """
+    Returns the text that student accounts are fuzzy searched by.
+    """
+    return ' '.join([account.first_name, account.last_name, profile.programme, *profile.roles])
+
+
 @receiver(post_save, sender=settings.AUTH_USER_MODEL)
 def create_account_profile(sender, instance, created, **kwargs):
     """
@@ -40,6 +240,103 @@ def create_account_profile(sender, instance, created, **kwargs):
         Profile.objects.create(account=instance)
 
 
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def update_profile_search_text(sender, instance, created, **kwargs):
+    """
+    Each time an existing student account is saved, the search text of its profile is rebuilt
+    and its update date is changed, in case the student's name has changed.
+    """
+    if not created:
+        try:
+            profile = instance.profile
+        except Profile.DoesNotExist:
+            return
+
+        Profile.objects.filter(pk=profile.pk).update(
+            search_text=profile_search_text(instance, profile),
+            date_updated=Now(),
+        )
+
+
+def project_search_vector():
+    """
+    Returns the expression used to build the full-text search document of a project.
+    Titles weigh the most, followed by the roles and then the description.
+    """
+    roles = models.Func(models.F('desired_roles'), models.Value(' '), function='array_to_string')
+
+    return (
+        SearchVector('title', weight='A', config='english') +
+        SearchVector('owner_role', roles, weight='B', config='english') +
+        SearchVector('description', weight='C', config='english')
+    )
+
+
+class ProjectQuerySet(models.QuerySet):
+    """
+    Custom queryset for projects.
+    """
+
+    def search(self, text):
+        """
+        Returns projects matching all the words in the given text using the full-text search index.
+        Each word is matched as a prefix, so partially typed words still match.
+
+        The projects are annotated with their relevance as 'rank'.
+        """
+        words = re.findall(r'\w+', text)
+
+        if not words:
+            return self
+
+        query = None
+        for word in words:
+            # stemming a partial word can change it (e.g. 'analy' becomes 'anali'),
+            # so the unstemmed prefix is matched too
+            word_query = (
+                SearchQuery(f'{word}:*', search_type='raw', config='english') |
+                SearchQuery(f'{word}:*', search_type='raw', config='simple')
+            )
+            query = word_query if query is None else query & word_query
+
+        # ts_rank returns a real, cast so the rank round-trips exactly when used in pagination cursors
+        return self.filter(search_vector=query).annotate(
+            rank=Cast(SearchRank(models.F('search_vector'), query), models.FloatField())
+        )
+
+    def with_related(self):
+        """
+        Returns projects with their owner and team members (along with the members' accounts)
+        fetched up front, so serializing any number of projects runs a constant number of queries.
+        """
+        return self.select_related('owner').prefetch_related(
+            models.Prefetch('team_members', queryset=Membership.objects.select_related('user'))
+        )
+
+    def with_viewer(self, user):
+        """
+        Returns projects annotated with a given user's relations to them, using subqueries
+        so they are fetched in the same query as the projects:
+
+        - viewer_membership_id - the id of the user's membership, or None
+        - viewer_follow_id - the id of the user's follow, or None
+        - viewer_request_id - the id of an active request to or from the user, or None
+        """
+        memberships = Membership.objects.filter(project=models.OuterRef('pk'), user=user)
+        follows = Follow.objects.filter(project=models.OuterRef('pk'), user=user)
+        requests = Request.objects.filter(
+            models.Q(requester=user) | models.Q(requestee=user),
+            project=models.OuterRef('pk'),
+            is_active=True,
+        )
+
+        return self.annotate(
+            viewer_membership_id=models.Subquery(memberships.values('id')[:1]),
+            viewer_follow_id=models.Subquery(follows.values('id')[:1]),
+            viewer_request_id=models.Subquery(requests.values('id')[:1]),
+        )
+
+
 class Project(models.Model):
     """
     Model for projects.
@@ -67,13 +364,110 @@ class Project(models.Model):
     owner = models.ForeignKey(settings.AUTH_USER_MODEL, related_name='owned_projects', on_delete=models.CASCADE)
     owner_role = models.CharField(max_length=40)
     desired_roles = ArrayField(models.CharField(max_length=40, blank=True), size=10, default=list, blank=True)
+    # The owner role and the ids of the desired roles (in the same order as their names), kept up to date on save
+    canonical_owner_role = models.ForeignKey(Role, related_name='+', null=True, editable=False, on_delete=models.PROTECT)
+    desired_role_ids = ArrayField(models.IntegerField(), default=list, blank=True, editable=False)
     date_created = models.DateTimeField(auto_now_add=True)
+    # Changes whenever the project or its team members change, used for ETags
+    date_updated = models.DateTimeField(auto_now=True)
+    # Full-text search document, kept up to date by update_project_search_vector
+    search_vector = SearchVectorField(null=True, editable=False)
+    # Number of followers, kept up to date by the follow signal receivers
+    follower_count = models.PositiveIntegerField(default=0, editable=False)
+
+    objects = ProjectQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            GinIndex(fields=['search_vector'], name='api_project_search_idx'),
+            # matches the ordering of projects by popularity
+            models.Index(fields=['follower_count', 'date_created', 'id'], name='api_project_popularity_idx'),
+            # matches the lookups of the projects wanting any or all of a set of roles
+            GinIndex(fields=['desired_role_ids'], name='api_project_role_ids_idx'),
+            # match the filtering by category and by creation date, in the order projects are listed in by default
+            models.Index(fields=['category', 'date_created', 'id'], name='api_project_category_idx'),
+            models.Index(fields=['date_created', 'id'], name='api_project_created_idx'),
+        ]
 
     def __str__(self):
         return self.title
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+
+        if _roles_changed(update_fields, 'owner_role', 'desired_roles'):
+            self.canonicalize_roles()
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'owner_role', 'desired_roles', 'canonical_owner_role', 'desired_role_ids'}
+
+        super().save(*args, **kwargs)
+
+    def canonicalize_roles(self):
+        """
+        Replaces the owner role and the desired roles with their canonical names,
+        leaving out blank and duplicate desired roles, and sets their ids.
+        """
+        resolved = Role.objects.resolve([self.owner_role, *self.desired_roles])
+        desired_roles = _canonical_roles(self.desired_roles, resolved)
+
+        self.canonical_owner_role = resolved.get(normalize_role(self.owner_role))
+        if self.canonical_owner_role is not None:
+            self.owner_role = self.canonical_owner_role.name
+        self.desired_roles = [role.name for role in desired_roles]
+        self.desired_role_ids = [role.pk for role in desired_roles]
     
     def is_owner(self, user):
-        return user and user == self.owner
+        # compared by id, so the owner isn't fetched
+        return user is not None and user.pk is not None and user.pk == self.owner_id
+
+    def is_owner_or_member(self, user):
+        return self.is_owner(user) or self.team_members.filter(user=user).exists()
+
+
+@receiver(post_save, sender=Project)
+def update_project_search_vector(sender, instance, **kwargs):
+    """
+    Each time a project is saved, its full-text search document is rebuilt.
+    """
+    Project.objects.filter(pk=instance.pk).update(search_vector=project_search_vector())
+
+
+class RoleStats(models.Model):
+    """
+    The number of students listing each role and of projects wanting it, for the staff dashboards.
+
+    Read-only model of the api_role_stats materialized view (created in migration 0016), which only has
+    the roles used in at least one profile or project. It's refreshed by the refresh_stats command (see api/stats.py).
+    """
+
+    role = models.OneToOneField(Role, primary_key=True, related_name='stats', on_delete=models.DO_NOTHING)
+    student_count = models.IntegerField()
+    project_count = models.IntegerField()
+    # When the materialized view was last refreshed
+    refreshed_at = models.DateTimeField()
+
+    class Meta:
+        managed = False
+        db_table = 'api_role_stats'
+
+
+class RoleCategoryStats(models.Model):
+    """
+    The number of projects of each category wanting each role, and of the team members with the role in them.
+
+    Read-only model of the api_role_category_stats materialized view (created in migration 0016),
+    which is refreshed along with api_role_stats. Its ids are only unique within a refresh.
+    """
+
+    id = models.BigIntegerField(primary_key=True)
+    role = models.ForeignKey(Role, related_name='category_stats', on_delete=models.DO_NOTHING)
+    category = models.CharField(max_length=3, choices=Project.Category.choices)
+    project_count = models.IntegerField()
+    member_count = models.IntegerField()
+
+    class Meta:
+        managed = False
+        db_table = 'api_role_category_stats'
 
 
 class Follow(models.Model):
@@ -84,23 +478,74 @@ class Follow(models.Model):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, related_name='project_follows', on_delete=models.CASCADE)
     project = models.ForeignKey(Project, related_name='followers', on_delete=models.CASCADE)
 
+    class Meta:
+        constraints = [
+            # a user can only follow a project once, its index matches the lookups of a user's follows
+            models.UniqueConstraint(fields=['user', 'project'], name='api_follow_user_project_uniq'),
+        ]
+
     def __str__(self):
         return self.user.username
 
 
+@receiver(post_save, sender=Follow)
+def increment_project_follower_count(sender, instance, created, **kwargs):
+    """
+    Each time a follow is created, the follower count of its project goes up.
+    The count is changed in the database, so concurrent follows can't overwrite each other.
+    """
+    if created:
+        Project.objects.filter(pk=instance.project_id).update(follower_count=models.F('follower_count') + 1)
+
+
+@receiver(post_delete, sender=Follow)
+def decrement_project_follower_count(sender, instance, **kwargs):
+    """
+    Each time a follow is deleted, the follower count of its project goes down.
+    """
+    Project.objects.filter(pk=instance.project_id, follower_count__gt=0).update(follower_count=models.F('follower_count') - 1)
+
+
 class Membership(models.Model):
     """
     Model for team members within projects.
     """
 
     role = models.CharField(max_length=40)
+    # The role, kept up to date on save
+    canonical_role = models.ForeignKey(Role, related_name='memberships', null=True, editable=False, on_delete=models.PROTECT)
     # A project team member must be assigned to a single project, but a project may have many project team members
     project = models.ForeignKey(Project, related_name='team_members', on_delete=models.CASCADE)
     # A project team member must be linked to a single user, but a user may be a team member of many projects
     user = models.ForeignKey(settings.AUTH_USER_MODEL, related_name='project_teams', on_delete=models.CASCADE)
 
+    class Meta:
+        constraints = [
+            # a user can only be a team member of a project once, its index matches the lookups of a project's members
+            models.UniqueConstraint(fields=['project', 'user'], name='api_membership_project_user_uniq'),
+        ]
+
     def __str__(self):
         return self.role
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+
+        if _roles_changed(update_fields, 'role'):
+            self.role, self.canonical_role = _canonical_role(self.role)
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'role', 'canonical_role'}
+
+        super().save(*args, **kwargs)
+
+
+@receiver(post_save, sender=Membership)
+@receiver(post_delete, sender=Membership)
+def update_project_date_updated(sender, instance, **kwargs):
+    """
+    Each time a team member is added, changed, or removed, the update date of their project is changed.
+    """
+    Project.objects.filter(pk=instance.project_id).update(date_updated=Now())
     
 
 class Request(models.Model):
@@ -126,31 +571,52 @@ class Request(models.Model):
     project = models.ForeignKey(Project, related_name='requests', on_delete=models.CASCADE)
     # The role the user will take in the project
     role = models.CharField(max_length=40)
+    # The role, kept up to date on save
+    canonical_role = models.ForeignKey(Role, related_name='requests', null=True, editable=False, on_delete=models.PROTECT)
     status = models.CharField(max_length=3, choices=Status.choices, default=Status.PENDING)
     # inactive requests should not be manipulated
     is_active = models.BooleanField(default=True)
     date_created = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # only active requests are listed and checked, so inactive ones are left out of the indexes.
+            # these two match the listing of a user's requests (sent or received) in the order they're paginated in
+            models.Index(fields=['requester', 'date_created', 'id'], condition=models.Q(is_active=True), name='api_request_requester_act_idx'),
+            models.Index(fields=['requestee', 'date_created', 'id'], condition=models.Q(is_active=True), name='api_request_requestee_act_idx'),
+            # matches the check for an active request between two users for a project
+            models.Index(fields=['project', 'requester', 'requestee'], condition=models.Q(is_active=True), name='api_request_pair_act_idx'),
+        ]
+        # there can only be one active request between two users for a project, whichever of them sent it,
+        # which is enforced by the api_request_active_pair_uniq index on
+        # (project, LEAST(requester, requestee), GREATEST(requester, requestee)) created in migration 0011
+
     def __str__(self):
         return f'{self.requester.first_name} {self.requester.last_name}'
 
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+
+        if _roles_changed(update_fields, 'role'):
+            self.role, self.canonical_role = _canonical_role(self.role)
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'role', 'canonical_role'}
+
+        super().save(*args, **kwargs)
+
     def cancel(self):
         """
         Cancels the project request and makes it inactive
         """
 
-        self.status = self.Status.CANCELLED
-        self.is_active = False
-        self.save()
+        self._close(self.Status.CANCELLED, RequestEvent.Type.CANCELLED)
     
     def decline(self):
         """
         Declines the project request and makes it inactive.
         """
 
-        self.status = self.Status.DECLINED
-        self.is_active = False
-        self.save()
+        self._close(self.Status.DECLINED, RequestEvent.Type.DECLINED)
         
     def accept(self):
         """
@@ -160,18 +626,80 @@ class Request(models.Model):
         """
 
         # The new member to be added is the one that is not the owner of the project
-        new_member = self.requestee if self.project.is_owner(self.requester) else self.requester
+        new_member_id = self.requestee_id if self.project.owner_id == self.requester_id else self.requester_id
 
         # Add the new member to the project
         Membership.objects.create(
             role=self.role,
-            project=self.project,
-            user=new_member
+            project_id=self.project_id,
+            user_id=new_member_id
         )
 
-        self.status = self.Status.ACCEPTED
-        self.is_active = False
-        self.save()
+        self._close(self.Status.ACCEPTED, RequestEvent.Type.ACCEPTED)
+
+    def _close(self, status, event_type):
+        """
+        Sets the final status of the project request, makes it inactive, and records the change.
+
+        The changes are made atomically, and the request should have been fetched with select_for_update
+        in the same transaction (see RequestDetail.put), so concurrent updates can't both close it.
+        """
+
+        with transaction.atomic():
+            self.status = status
+            self.is_active = False
+            self.save(update_fields=['status', 'is_active'])
+            self.events.create(event_type=event_type)
+
+
+class RequestEvent(models.Model):
+    """
+    Model for the changes made to project requests, streamed to the requester and requestee.
+    The id of an event is used to resume the stream from where a client left off.
+    """
+
+    class Type(models.TextChoices):
+        """
+        Represents the changes a project request can go through.
+        """
+        CREATED = ('created', 'Created')
+        ACCEPTED = ('accepted', 'Accepted')
+        DECLINED = ('declined', 'Declined')
+        CANCELLED = ('cancelled', 'Cancelled')
+
+    request = models.ForeignKey(Request, related_name='events', on_delete=models.CASCADE)
+    event_type = models.CharField(max_length=9, choices=Type.choices)
+    date_created = models.DateTimeField(auto_now_add=True)
+
+
+class MessageQuerySet(models.QuerySet):
+    """
+    Custom queryset for private and public messages.
+    """
+
+    def after(self, message_pk):
+        """
+        Returns the messages posted after the given message, in the (date_created, id) order they are listed in.
+
+        If the given message was deleted, the messages with a greater id are returned instead,
+        so a client that last synced up to a deleted message doesn't stop receiving new ones.
+        """
+        date_created = self.model.objects.filter(pk=message_pk).values_list('date_created', flat=True).first()
+
+        if date_created is None:
+            # ids are handed out in the order messages are created
+            return self.filter(id__gt=message_pk)
+
+        return self.filter(
+            models.Q(date_created__gt=date_created) |
+            models.Q(date_created=date_created, id__gt=message_pk)
+        )
+
+    def since(self, date):
+        """
+        Returns the messages posted after the given date.
+        """
+        return self.filter(date_created__gt=date)
 
 
 class PrivateMessage(models.Model):
@@ -183,6 +711,15 @@ class PrivateMessage(models.Model):
     project = models.ForeignKey(Project, related_name='private_messages', on_delete=models.CASCADE)
     message = models.CharField(max_length=1000)
     date_created = models.DateTimeField(auto_now_add=True)
+    date_updated = models.DateTimeField(auto_now=True)
+
+    objects = MessageQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # matches the order messages are listed and synced in
+            models.Index(fields=['project', 'date_created', 'id'], name='api_private_message_sync_idx'),
+        ]
 
 
 class PublicMessage(models.Model):
@@ -194,4 +731,13 @@ class PublicMessage(models.Model):
     project = models.ForeignKey(Project, related_name='public_messages', on_delete=models.CASCADE)
     message = models.CharField(max_length=1000)
     date_created = models.DateTimeField(auto_now_add=True)
+    date_updated = models.DateTimeField(auto_now=True)
+
+    objects = MessageQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # matches the order messages are listed and synced in
+            models.Index(fields=['project', 'date_created', 'id'], name='api_public_message_sync_idx'),
+        ]
 
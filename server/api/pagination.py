@@ -0,0 +1,171 @@
+import base64
+import datetime
+import json
+
+from django.conf import settings
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset (cursor) pagination for the API list views.
+
+    Pages are fetched by filtering on the ordering fields of the last object seen
+    instead of using an offset, so deep pages cost the same as the first.
+    The ordering must end with a unique field (normally 'id') to keep it total.
+
+    The response body is left as a plain list of objects.
+    Links to the next and previous pages are returned in the `Link` header.
+    """
+
+    cursor_query_param = 'cursor'
+    # 'limit' is kept for clients of the project list that used it before pagination existed
+    page_size_query_params = ('page_size', 'limit')
+    invalid_cursor_message = 'Invalid cursor'
+
+    def __init__(self, ordering):
+        self.ordering = tuple(ordering)
+        self.page_size = getattr(settings, 'API_PAGE_SIZE', 50)
+        self.max_page_size = getattr(settings, 'API_MAX_PAGE_SIZE', 100)
+
+    def _get_page_size(self, request):
+        """
+        Helper method for getting the page size requested in the query params.
+        Falls back to the default page size and never exceeds the max page size.
+        """
+        for query_param in self.page_size_query_params:
+            try:
+                page_size = int(request.query_params[query_param])
+            except (KeyError, ValueError):
+                continue
+
+            if page_size > 0:
+                return min(page_size, self.max_page_size)
+
+        return self.page_size
+
+    def _encode_cursor(self, position, reverse):
+        """
+        Helper method for turning a position in the ordering into an opaque cursor string.
+        """
+        values = [value.isoformat() if isinstance(value, datetime.datetime) else value for value in position]
+        data = json.dumps({'p': values, 'r': reverse}, separators=(',', ':'))
+
+        return base64.urlsafe_b64encode(data.encode()).decode()
+
+    def _decode_cursor(self, cursor):
+        """
+        Helper method for turning an opaque cursor string back into a position and direction.
+        Raises NotFound if the cursor is invalid.
+        """
+        try:
+            data = json.loads(base64.urlsafe_b64decode(cursor.encode()).decode())
+            position, reverse = data['p'], bool(data['r'])
+        except (TypeError, ValueError, KeyError):
+            raise NotFound(self.invalid_cursor_message)
+
+        # a cursor only makes sense for the ordering it was created with
+        if not isinstance(position, list) or len(position) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+
+        return position, reverse
+
+    def _keyset_filter(self, ordering, position):
+        """
+        Helper method for building a filter matching every object that comes after
+        the given position in the given ordering.
+
+        For an ordering (a, b, c) this is: a > x OR (a = x AND b > y) OR (a = x AND b = y AND c > z)
+        """
+        keyset_filter = Q()
+        equal_fields = Q()
+
+        for field, value in zip(ordering, position):
+            descending = field.startswith('-')
+            name = field.lstrip('-')
+            lookup = f'{name}__lt' if descending else f'{name}__gt'
+
+            keyset_filter |= equal_fields & Q(**{lookup: value})
+            equal_fields &= Q(**{name: value})
+
+        return keyset_filter
+
+    def _get_position(self, instance):
+        return [getattr(instance, field.lstrip('-')) for field in self.ordering]
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        page_size = self._get_page_size(request)
+        ordering = self.ordering
+        position, reverse = None, False
+
+        cursor = request.query_params.get(self.cursor_query_param)
+        if cursor:
+            position, reverse = self._decode_cursor(cursor)
+
+        # going backwards is done by flipping the ordering and reversing the results afterwards
+        if reverse:
+            ordering = tuple(field[1:] if field.startswith('-') else f'-{field}' for field in ordering)
+
+        queryset = queryset.order_by(*ordering)
+
+        if position is not None:
+            queryset = queryset.filter(self._keyset_filter(ordering, position))
+
+        # fetch an extra object to find out if there are more pages
+        results = list(queryset[:page_size + 1])
+        has_more = len(results) > page_size
+        results = results[:page_size]
+
+        if reverse:
+            results.reverse()
+            self.has_next = position is not None
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = position is not None
+
+        self.page = results
+
+        return results
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+
+        cursor = self._encode_cursor(self._get_position(self.page[-1]), reverse=False)
+
+        return replace_query_param(self.request.build_absolute_uri(), self.cursor_query_param, cursor)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+
+        url = self.request.build_absolute_uri()
+
+        # an empty page has nothing to count back from, so start again from the first page
+        if not self.page:
+            return remove_query_param(url, self.cursor_query_param)
+
+        cursor = self._encode_cursor(self._get_position(self.page[0]), reverse=True)
+
+        return replace_query_param(url, self.cursor_query_param, cursor)
+
+    def get_paginated_response(self, data):
+        links = []
+
+        next_link = self.get_next_link()
+        if next_link:
+            links.append(f'<{next_link}>; rel="next"')
+
+        previous_link = self.get_previous_link()
+        if previous_link:
+            links.append(f'<{previous_link}>; rel="prev"')
+
+        headers = {'Link': ', '.join(links)} if links else None
+
+        return Response(data, headers=headers)
@@ -0,0 +1,179 @@
+"""
+WebSocket push channels for project discussions, served by the ASGI entry point.
+
+Clients connect to /ws/projects/<project_pk>/public-messages/ or /ws/projects/<project_pk>/private-messages/
+with their SimpleJWT access token in the `token` query param, and are sent every message posted to the
+discussion from then on as:
+
+    {"type": "message.created", "message": {...}}
+
+where the message is in the same format as the message list endpoints.
+
+Access is checked again every REALTIME_ACCESS_CHECK_INTERVAL seconds, and the connection is closed
+when the access token expires, so removed team members and expired tokens stop receiving messages.
+"""
+
+import asyncio
+import json
+import re
+import time
+from urllib.parse import parse_qs
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+
+from .broker import get_broker, publish_best_effort
+from .models import Project
+
+_DISCUSSION_PATH = re.compile(r'^/ws/projects/(?P<project_pk>\d+)/(?P<kind>public|private)-messages/$')
+
+# close codes sent when a connection is refused (the 4000-4999 range is for applications)
+_CLOSE_UNAUTHENTICATED = 4401
+_CLOSE_FORBIDDEN = 4403
+_CLOSE_NOT_FOUND = 4404
+
+
+def discussion_channel(project_pk, kind):
+    """
+    Returns the broker channel of a project's 'public' or 'private' discussion.
+    """
+    return f'project.{project_pk}.{kind}-messages'
+
+
+def publish_message(project_pk, kind, message_data):
+    """
+    Pushes a newly posted message to the subscribers of its discussion,
+    once the transaction it was created in has been committed.
+    Outside of a transaction the message is pushed straight away, so broker errors are logged rather than raised.
+    """
+    channel = discussion_channel(project_pk, kind)
+    transaction.on_commit(lambda: publish_best_effort(channel, {'type': 'message.created', 'message': message_data}))
+
+
+def authenticate_token(token):
+    """
+    Returns the user of a SimpleJWT access token along with the time the token expires at (as a timestamp),
+    or (None, None) if the token isn't valid.
+    """
+    if not token:
+        return None, None
+
+    authentication = JWTAuthentication()
+
+    try:
+        validated_token = authentication.get_validated_token(token)
+        return authentication.get_user(validated_token), validated_token['exp']
+    except (InvalidToken, AuthenticationFailed):
+        return None, None
+
+
+def _get_close_code(user, project_pk, kind):
+    """
+    Returns the code to refuse a connection with, or None if the user may subscribe to the discussion.
+    Like the private message list, private discussions are only open to the project owner and members.
+    """
+    try:
+        project = Project.objects.get(pk=project_pk)
+    except Project.DoesNotExist:
+        return _CLOSE_NOT_FOUND
+
+    if kind == 'private' and not project.is_owner_or_member(user):
+        return _CLOSE_FORBIDDEN
+
+    return None
+
+
+def _check_connection(query_string, project_pk, kind):
+    """
+    Helper function for authenticating and authorizing a connection in a single trip to a worker thread.
+
+    Returns a tuple of the close code (None if the connection is allowed), the user, and when their token expires.
+    """
+    close_old_connections()
+
+    try:
+        user, expires_at = authenticate_token(parse_qs(query_string.decode()).get('token', [None])[0])
+
+        if user is None:
+            return _CLOSE_UNAUTHENTICATED, None, None
+
+        return _get_close_code(user, project_pk, kind), user, expires_at
+    finally:
+        close_old_connections()
+
+
+def _recheck_access(user, project_pk, kind):
+    """
+    Helper function for checking again that a connected user may still subscribe to a discussion,
+    e.g. that they're still a team member. Returns the code to close the connection with, or None.
+    """
+    close_old_connections()
+
+    try:
+        return _get_close_code(user, project_pk, kind)
+    finally:
+        close_old_connections()
+
+
+async def discussion_application(scope, receive, send):
+    """
+    ASGI application for the discussion WebSockets.
+    """
+    event = await receive()
+    if event['type'] != 'websocket.connect':
+        return
+
+    match = _DISCUSSION_PATH.match(scope['path'])
+    if not match:
+        await send({'type': 'websocket.close', 'code': _CLOSE_NOT_FOUND})
+        return
+
+    project_pk, kind = int(match['project_pk']), match['kind']
+
+    close_code, user, expires_at = await sync_to_async(_check_connection)(scope.get('query_string', b''), project_pk, kind)
+    if close_code:
+        await send({'type': 'websocket.close', 'code': close_code})
+        return
+
+    subscription = await get_broker().subscribe(discussion_channel(project_pk, kind))
+    await send({'type': 'websocket.accept'})
+
+    check_interval = getattr(settings, 'REALTIME_ACCESS_CHECK_INTERVAL', 60)
+    next_check_at = time.time() + check_interval
+
+    receiving = asyncio.ensure_future(receive())
+    getting = asyncio.ensure_future(subscription.get())
+
+    try:
+        while True:
+            # wake up for the next access check or when the token expires, whichever comes first
+            timeout = max(0, min(next_check_at, expires_at) - time.time())
+            done, _ = await asyncio.wait({receiving, getting}, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+
+            if receiving in done:
+                if receiving.result()['type'] == 'websocket.disconnect':
+                    break
+                # the channel is one way, so anything sent by the client is ignored
+                receiving = asyncio.ensure_future(receive())
+
+            # the token is checked before every message is sent, and access at least every check interval
+            if time.time() >= expires_at:
+                await send({'type': 'websocket.close', 'code': _CLOSE_FORBIDDEN})
+                break
+
+            if time.time() >= next_check_at:
+                if await sync_to_async(_recheck_access)(user, project_pk, kind):
+                    await send({'type': 'websocket.close', 'code': _CLOSE_FORBIDDEN})
+                    break
+                next_check_at = time.time() + check_interval
+
+            if getting in done:
+                await send({'type': 'websocket.send', 'text': json.dumps(getting.result())})
+                getting = asyncio.ensure_future(subscription.get())
+    finally:
+        receiving.cancel()
+        getting.cancel()
+        await subscription.close()
@@ -0,0 +1,560 @@
+import heapq
+import logging
+import math
+import operator
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connections
+from django.db.models import Q
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Follow, Membership, Profile, Project, Request
+
+logger = logging.getLogger(__name__)
+
+# How much each signal adds to the score of a student recommended for a project.
+# Role overlap ranges from 0 to 1, so it always outweighs the others
+_PROGRAMME_WEIGHT = 0.3
+_FOLLOWS_PROJECT_WEIGHT = 0.2
+_SHARED_FOLLOWS_WEIGHT = 0.2
+# Shared follows beyond this many don't add to the score
+_MAX_SHARED_FOLLOWS = 5
+
+# How much each signal adds to the score of a project recommended for a student, both range from 0 to 1
+_ROLE_MATCH_WEIGHT = 0.6
+_SIMILARITY_WEIGHT = 0.4
+# Most projects cached for each student, the most that can be asked for
+MAX_PROJECT_RECOMMENDATIONS = 50
+
+
+def _role_key(role):
+    return role.strip().lower()
+
+
+def _role_keys(roles):
+    """
+    Returns the distinct, non-blank roles in a list, matched case-insensitively.
+    """
+    return frozenset(filter(None, map(_role_key, roles)))
+
+
+class RebuiltIndex:
+    """
+    Base class for the in-memory indexes, which are built from the database on first use
+    and rebuilt every RECOMMENDATION_INDEX_REBUILD_INTERVAL seconds.
+
+    Only the first build happens within a request, by a single thread while the others wait for it.
+    Later rebuilds run in a background thread, and requests keep using the current index until
+    the rebuilt one is swapped in under the lock.
+    Subclasses implement build(), which swaps in the rebuilt index and sets _built_at.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        # held while building, so only one thread builds the index at a time
+        self._build_lock = threading.Lock()
+        self._rebuild_thread = None
+        self._built_at = None
+
+    def _is_stale(self):
+        rebuild_interval = getattr(settings, 'RECOMMENDATION_INDEX_REBUILD_INTERVAL', 300)
+
+        return time.monotonic() - self._built_at > rebuild_interval
+
+    def _ensure_built(self):
+        """
+        Helper method for building the index on first use, or starting a background rebuild when it's stale.
+        """
+        if self._built_at is None:
+            with self._build_lock:
+                # another thread may have built it while this one was waiting
+                if self._built_at is None:
+                    self.build()
+        elif self._is_stale():
+            with self._lock:
+                if self._rebuild_thread is not None and self._rebuild_thread.is_alive():
+                    return
+                self._rebuild_thread = threading.Thread(target=self._rebuild, daemon=True)
+                self._rebuild_thread.start()
+
+    def _rebuild(self):
+        try:
+            with self._build_lock:
+                if self._built_at is not None and self._is_stale():
+                    self.build()
+        except Exception:
+            # the current index keeps being used, and the rebuild is tried again by the next request
+            logger.exception('Could not rebuild the %s', type(self).__name__)
+        finally:
+            # the thread's own database connection isn't closed at the end of a request
+            connections.close_all()
+
+    def build(self):
+        raise NotImplementedError
+
+
+class StudentRoleIndex(RebuiltIndex):
+    """
+    In-memory sparse index of the roles and programmes of student profiles, used to rank students for projects.
+
+    Each student's roles are a sparse binary vector over all the roles in use, stored as the set of their roles,
+    with an inverted index from each role to the students listing it. Ranking students for a set of roles only
+    looks at the students listing at least one of them, and each role is weighted by its inverse document frequency,
+    so rare roles count for more than ones most students list.
+
+    The index is built from the database on first use and kept up to date by the signal receivers below.
+    Changes made by other processes (or bulk queryset updates) are picked up by rebuilding the index
+    in the background every RECOMMENDATION_INDEX_REBUILD_INTERVAL seconds.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._student_roles = {}  # account id -> frozenset of role keys
+        self._programmes = {}  # account id -> lowercase programme
+        self._role_students = {}  # role key -> set of account ids
+        self._programme_students = {}  # lowercase programme -> set of account ids
+
+    def _add(self, account_id, roles, programme):
+        programme = programme.strip().lower()
+
+        self._student_roles[account_id] = roles
+        self._programmes[account_id] = programme
+
+        for role in roles:
+            self._role_students.setdefault(role, set()).add(account_id)
+        if programme:
+            self._programme_students.setdefault(programme, set()).add(account_id)
+
+    def _remove(self, account_id):
+        roles = self._student_roles.pop(account_id, frozenset())
+        programme = self._programmes.pop(account_id, '')
+
+        for key, index in [(role, self._role_students) for role in roles] + [(programme, self._programme_students)]:
+            students = index.get(key)
+            if students is None:
+                continue
+            students.discard(account_id)
+            if not students:
+                del index[key]
+
+    def build(self):
+        """
+        Rebuilds the whole index from the database.
+        """
+        profiles = Profile.objects.values_list('account_id', 'roles', 'programme').iterator()
+
+        index = StudentRoleIndex()
+        for account_id, roles, programme in profiles:
+            index._add(account_id, _role_keys(roles), programme)
+
+        with self._lock:
+            self._student_roles = index._student_roles
+            self._programmes = index._programmes
+            self._role_students = index._role_students
+            self._programme_students = index._programme_students
+            self._built_at = time.monotonic()
+
+    def update(self, account_id, roles, programme):
+        """
+        Replaces the roles and programme of a student, or removes them when roles is None.
+        Does nothing if the index hasn't been built yet, as building it will include the change.
+        """
+        with self._lock:
+            if self._built_at is None:
+                return
+
+            self._remove(account_id)
+            if roles is not None:
+                self._add(account_id, _role_keys(roles), programme)
+
+    def clear(self):
+        """
+        Empties the index, so it's rebuilt from the database the next time it's used.
+        """
+        with self._lock:
+            self._student_roles = {}
+            self._programmes = {}
+            self._role_students = {}
+            self._programme_students = {}
+            self._built_at = None
+
+    def rank(self, roles, programmes=(), follow_scores=None, exclude=(), limit=20):
+        """
+        Returns up to `limit` students listing at least one of the given roles, best match first,
+        as a list of (account id, score, matched role keys) tuples.
+
+        - roles - the roles wanted
+        - programmes - students on any of these programmes score higher
+        - follow_scores - an extra score for some students (account id -> score), from their follows
+        - exclude - account ids of students to leave out
+        """
+        self._ensure_built()
+
+        wanted = _role_keys(roles)
+        programmes = {programme.strip().lower() for programme in programmes if programme.strip()}
+        follow_scores = follow_scores or {}
+
+        with self._lock:
+            student_count = len(self._student_roles)
+            # inverse document frequency of each wanted role, smoothed so roles nobody lists still count
+            weights = {role: math.log((student_count + 1) / (len(self._role_students.get(role, ())) + 1)) + 1 for role in wanted}
+            total_weight = sum(weights.values())
+
+            # the (unnormalized) scores of every student listing one of the roles, accumulated from the inverted indexes.
+            # Only the students with a follow score are scored one at a time, so ranking stays fast with many students
+            scores = {}
+            for role in sorted(wanted, key=lambda role: -len(self._role_students.get(role, ()))):
+                students = self._role_students.get(role, ())
+                if not scores:
+                    scores = dict.fromkeys(students, weights[role])
+                else:
+                    for account_id in students:
+                        scores[account_id] = scores.get(account_id, 0) + weights[role]
+
+            for programme in programmes:
+                for account_id in self._programme_students.get(programme, set()).intersection(scores):
+                    scores[account_id] += _PROGRAMME_WEIGHT * total_weight
+
+            for account_id, follow_score in follow_scores.items():
+                if account_id in scores:
+                    scores[account_id] += follow_score * total_weight
+
+            for account_id in exclude:
+                scores.pop(account_id, None)
+
+            best = heapq.nlargest(limit, scores.items(), key=operator.itemgetter(1))
+
+            return [(account_id, score / total_weight, wanted & self._student_roles[account_id]) for account_id, score in best]
+
+
+student_role_index = StudentRoleIndex()
+
+
+def recommend_students(project, limit=20):
+    """
+    Returns up to `limit` students for a project as a list of (account id, score, matched role keys) tuples, best first.
+
+    Students are scored by how many of the project's desired roles they list (rare roles counting for more),
+    whether they're on the same programme as the project's owner or a team member, whether they follow the project,
+    and how many other projects they follow that the owner or team members follow too.
+    The owner, team members, and students with an active request for the project are left out.
+    """
+    member_ids = set(project.team_members.values_list('user_id', flat=True))
+    team_ids = member_ids | {project.owner_id}
+
+    requests = Request.objects.filter(project=project, is_active=True).values_list('requester_id', 'requestee_id')
+    requested_ids = {user_id for pair in requests for user_id in pair}
+
+    programmes = Profile.objects.filter(account_id__in=team_ids).values_list('programme', flat=True)
+
+    # the projects followed by the team, and the followers of those projects or of this one
+    team_follows = set(Follow.objects.filter(user_id__in=team_ids).exclude(project=project).values_list('project_id', flat=True))
+    follows = Follow.objects.filter(Q(project__in=team_follows) | Q(project=project)).values_list('user_id', 'project_id')
+
+    shared_follows = Counter()
+    follow_scores = {}
+    for user_id, project_id in follows.iterator():
+        if project_id == project.pk:
+            follow_scores[user_id] = follow_scores.get(user_id, 0) + _FOLLOWS_PROJECT_WEIGHT
+        else:
+            shared_follows[user_id] += 1
+
+    for user_id, count in shared_follows.items():
+        follow_scores[user_id] = follow_scores.get(user_id, 0) + _SHARED_FOLLOWS_WEIGHT * min(count, _MAX_SHARED_FOLLOWS) / _MAX_SHARED_FOLLOWS
+
+    return student_role_index.rank(
+        project.desired_roles,
+        programmes=programmes,
+        follow_scores=follow_scores,
+        exclude=team_ids | requested_ids,
+        limit=limit,
+    )
+
+
+class ProjectSimilarityIndex(RebuiltIndex):
+    """
+    In-memory item-item similarity index of projects, used to recommend projects to students.
+
+    Students interact with projects by owning, following, or being team members of them. The index holds the sparse
+    project x project matrix of how many students interacted with both projects, along with the number of students
+    that interacted with each project, from which the cosine similarity of any two projects is worked out:
+
+        similarity(p, q) = students(p and q) / sqrt(students(p) * students(q))
+
+    Projects are similar when the same students follow them or work on them, so co-members of a student
+    (and students with the same follows) lead to the projects they're involved in.
+    The desired roles of the projects are also indexed, from each role to the projects wanting it.
+
+    A new interaction only changes the counts of the projects the student already interacted with, so follows,
+    memberships, and projects are added and removed incrementally by the signal receivers below.
+    The index is built from the database on first use and rebuilt in the background
+    every RECOMMENDATION_INDEX_REBUILD_INTERVAL seconds.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._reset()
+
+    def _reset(self):
+        self._interactions = Counter()  # (account id, project id) -> number of ways they interact (owner, follower, member)
+        self._user_projects = {}  # account id -> set of project ids
+        self._project_users = {}  # project id -> set of account ids
+        self._co_counts = {}  # project id -> Counter of project id -> students interacting with both
+        self._project_owners = {}  # project id -> owner id
+        self._project_roles = {}  # project id -> frozenset of desired role keys
+        self._role_projects = {}  # role key -> set of project ids
+        self._built_at = None
+
+    def _add_interaction(self, account_id, project_id):
+        self._interactions[(account_id, project_id)] += 1
+
+        if self._interactions[(account_id, project_id)] > 1:
+            return
+
+        user_projects = self._user_projects.setdefault(account_id, set())
+        for other_id in user_projects:
+            self._co_counts.setdefault(project_id, Counter())[other_id] += 1
+            self._co_counts.setdefault(other_id, Counter())[project_id] += 1
+
+        user_projects.add(project_id)
+        self._project_users.setdefault(project_id, set()).add(account_id)
+
+    def _remove_interaction(self, account_id, project_id, all_ways=False):
+        key = (account_id, project_id)
+
+        if key not in self._interactions:
+            return
+
+        self._interactions[key] -= 1
+        if self._interactions[key] > 0 and not all_ways:
+            return
+        del self._interactions[key]
+
+        user_projects = self._user_projects[account_id]
+        user_projects.discard(project_id)
+        if not user_projects:
+            del self._user_projects[account_id]
+
+        project_users = self._project_users[project_id]
+        project_users.discard(account_id)
+        if not project_users:
+            del self._project_users[project_id]
+
+        for other_id in user_projects:
+            for row, column in ((project_id, other_id), (other_id, project_id)):
+                self._co_counts[row][column] -= 1
+                if self._co_counts[row][column] <= 0:
+                    del self._co_counts[row][column]
+                if not self._co_counts[row]:
+                    del self._co_counts[row]
+
+    def _set_project(self, project_id, owner_id, roles):
+        self._remove_project_roles(project_id)
+
+        self._project_roles[project_id] = roles
+        for role in roles:
+            self._role_projects.setdefault(role, set()).add(project_id)
+
+        if self._project_owners.get(project_id) != owner_id:
+            if project_id in self._project_owners:
+                self._remove_interaction(self._project_owners[project_id], project_id)
+            self._project_owners[project_id] = owner_id
+            self._add_interaction(owner_id, project_id)
+
+    def _remove_project_roles(self, project_id):
+        for role in self._project_roles.pop(project_id, frozenset()):
+            projects = self._role_projects[role]
+            projects.discard(project_id)
+            if not projects:
+                del self._role_projects[role]
+
+    def build(self):
+        """
+        Rebuilds the whole index from the database.
+        """
+        index = ProjectSimilarityIndex()
+
+        for project_id, owner_id, roles in Project.objects.values_list('id', 'owner_id', 'desired_roles').iterator():
+            index._set_project(project_id, owner_id, _role_keys(roles))
+        for model in (Follow, Membership):
+            for account_id, project_id in model.objects.values_list('user_id', 'project_id').iterator():
+                index._add_interaction(account_id, project_id)
+
+        with self._lock:
+            self._interactions = index._interactions
+            self._user_projects = index._user_projects
+            self._project_users = index._project_users
+            self._co_counts = index._co_counts
+            self._project_owners = index._project_owners
+            self._project_roles = index._project_roles
+            self._role_projects = index._role_projects
+            self._built_at = time.monotonic()
+
+    def add_interaction(self, account_id, project_id):
+        """
+        Records that a student follows or became a team member of a project.
+        Does nothing if the index hasn't been built yet, as building it will include the change (the same goes below).
+        """
+        with self._lock:
+            if self._built_at is not None:
+                self._add_interaction(account_id, project_id)
+
+    def remove_interaction(self, account_id, project_id):
+        """
+        Records that a student no longer follows or is no longer a team member of a project.
+        """
+        with self._lock:
+            if self._built_at is not None:
+                self._remove_interaction(account_id, project_id)
+
+    def update_project(self, project_id, owner_id, roles):
+        """
+        Adds a project or replaces its owner and desired roles.
+        """
+        with self._lock:
+            if self._built_at is not None:
+                self._set_project(project_id, owner_id, _role_keys(roles))
+
+    def remove_project(self, project_id):
+        """
+        Removes a project along with all the interactions with it.
+        """
+        with self._lock:
+            if self._built_at is None:
+                return
+
+            self._remove_project_roles(project_id)
+            self._project_owners.pop(project_id, None)
+            for account_id in list(self._project_users.get(project_id, ())):
+                self._remove_interaction(account_id, project_id, all_ways=True)
+
+    def clear(self):
+        """
+        Empties the index, so it's rebuilt from the database the next time it's used.
+        """
+        with self._lock:
+            self._reset()
+
+    def rank(self, account_id, roles, limit=20):
+        """
+        Returns up to `limit` projects for a student, best match first, as a list of (project id, score) tuples.
+
+        Projects are scored by the share of their desired roles the student lists, and by their average similarity
+        to the projects the student owns, follows, or is a team member of, which are left out.
+        """
+        self._ensure_built()
+
+        wanted = _role_keys(roles)
+
+        with self._lock:
+            seeds = self._user_projects.get(account_id, set())
+
+            similarities = Counter()
+            for seed_id in seeds:
+                seed_users = len(self._project_users[seed_id])
+                for project_id, co_count in self._co_counts.get(seed_id, {}).items():
+                    similarities[project_id] += co_count / math.sqrt(seed_users * len(self._project_users[project_id]))
+
+            role_matches = Counter()
+            for role in wanted:
+                for project_id in self._role_projects.get(role, ()):
+                    role_matches[project_id] += 1
+
+            def score(project_id):
+                role_match = role_matches[project_id] / len(self._project_roles[project_id]) if role_matches[project_id] else 0
+                similarity = similarities[project_id] / len(seeds) if seeds else 0
+
+                return _ROLE_MATCH_WEIGHT * role_match + _SIMILARITY_WEIGHT * similarity
+
+            candidates = (project_id for project_id in similarities.keys() | role_matches.keys() if project_id not in seeds)
+            best = heapq.nlargest(limit, ((score(project_id), -project_id) for project_id in candidates))
+
+        return [(-negative_id, score) for score, negative_id in best]
+
+
+project_similarity_index = ProjectSimilarityIndex()
+
+
+def _project_recommendations_key(account_id):
+    return f'api:recommended-projects:{account_id}'
+
+
+def recommend_projects(user):
+    """
+    Returns up to MAX_PROJECT_RECOMMENDATIONS projects for a student as a list of (project id, score) tuples, best first.
+
+    The recommendations are cached in the 'api' cache for RECOMMENDATION_CACHE_TIMEOUT seconds,
+    and dropped as soon as the student changes their profile, or follows or joins a project.
+    """
+    cache = caches['api']
+    key = _project_recommendations_key(user.pk)
+
+    recommendations = cache.get(key)
+
+    if recommendations is None:
+        recommendations = project_similarity_index.rank(user.pk, user.profile.roles, limit=MAX_PROJECT_RECOMMENDATIONS)
+        cache.set(key, recommendations, getattr(settings, 'RECOMMENDATION_CACHE_TIMEOUT', 300))
+
+    return recommendations
+
+
+@receiver(post_save, sender=Profile)
+def update_student_role_index(sender, instance, **kwargs):
+    """
+    Each time a profile is saved, its roles and programme are updated in the student index,
+    and the student's cached project recommendations are dropped, as they're mostly based on their roles.
+    """
+    student_role_index.update(instance.account_id, instance.roles, instance.programme)
+    caches['api'].delete(_project_recommendations_key(instance.account_id))
+
+
+@receiver(post_delete, sender=Profile)
+def remove_from_student_role_index(sender, instance, **kwargs):
+    """
+    Each time a profile is deleted, it's removed from the student index.
+    """
+    student_role_index.update(instance.account_id, None, '')
+
+
+@receiver(post_save, sender=Project)
+def update_project_similarity_index(sender, instance, **kwargs):
+    """
+    Each time a project is saved, its owner and desired roles are updated in the project index.
+    """
+    project_similarity_index.update_project(instance.pk, instance.owner_id, instance.desired_roles)
+
+
+@receiver(post_delete, sender=Project)
+def remove_from_project_similarity_index(sender, instance, **kwargs):
+    """
+    Each time a project is deleted, it's removed from the project index.
+    """
+    project_similarity_index.remove_project(instance.pk)
+
+
+@receiver(post_save, sender=Follow)
+@receiver(post_save, sender=Membership)
+def add_project_interaction(sender, instance, created, **kwargs):
+    """
+    Each time a student follows or joins a project, the project index is updated incrementally
+    and their cached project recommendations are dropped, as they no longer apply.
+    """
+    if created:
+        project_similarity_index.add_interaction(instance.user_id, instance.project_id)
+        caches['api'].delete(_project_recommendations_key(instance.user_id))
+
+
+@receiver(post_delete, sender=Follow)
+@receiver(post_delete, sender=Membership)
+def remove_project_interaction(sender, instance, **kwargs):
+    """
+    Each time a student unfollows or leaves a project, it's removed from the project index
+    and their cached project recommendations are dropped.
+    """
+    project_similarity_index.remove_interaction(instance.user_id, instance.project_id)
+    caches['api'].delete(_project_recommendations_key(instance.user_id))
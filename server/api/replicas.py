@@ -0,0 +1,125 @@
+"""
+Routing of read queries to the read replicas of the database (the DATABASE_REPLICAS setting).
+
+ReplicaRoutingMiddleware marks the GET, HEAD and OPTIONS requests whose reads can go to a replica,
+and ReplicaRouter sends those reads to a random replica. Everything else (writes, reads made by
+other requests, and reads in a transaction) goes to the 'default' primary database.
+
+Replicas lag behind the primary, so after a client makes a POST, PUT, PATCH or DELETE request,
+all of its requests read from the primary for DATABASE_REPLICA_STICKY_SECONDS, and it sees its own writes.
+Responses that are about to be cached are also read from the primary (see read_from_primary).
+"""
+
+import contextvars
+import hashlib
+import random
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS, connections
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+# whether the reads of the current request can go to a replica
+_read_from_replica = contextvars.ContextVar('read_from_replica', default=False)
+
+
+def _client_key(request):
+    """
+    Returns the key that the requests of a client are pinned to the primary under, or None for anonymous clients.
+
+    Clients are told apart by the user of their access token, which is read without querying the database,
+    or else by their session cookie.
+    """
+    authentication = JWTAuthentication()
+    header = authentication.get_header(request)
+
+    if header:
+        try:
+            raw_token = authentication.get_raw_token(header)
+            if raw_token is None:
+                return None
+            token = authentication.get_validated_token(raw_token)
+            return f'api:primary-pin:user:{token[jwt_settings.USER_ID_CLAIM]}'
+        except (AuthenticationFailed, KeyError):
+            return None
+
+    session_key = request.COOKIES.get(settings.SESSION_COOKIE_NAME)
+    if session_key:
+        return f'api:primary-pin:session:{hashlib.sha1(session_key.encode()).hexdigest()}'
+
+    return None
+
+
+def read_from_primary():
+    """
+    Sends the rest of the reads of the current request to the primary.
+
+    Used by the response cache before building a response to cache, as a response read from a lagging replica
+    could otherwise be cached under the namespace version bumped by a newer write, and served until the next one.
+    """
+    _read_from_replica.set(False)
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Lets the reads of safe requests go to the replicas, unless their client has written recently.
+    The pins are kept in the 'api' cache, so they're shared between the workers when it's Redis.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.DATABASE_REPLICAS:
+            return self.get_response(request)
+
+        key = _client_key(request)
+        cache = caches['api']
+
+        if request.method in SAFE_METHODS:
+            read_from_replica = key is None or not cache.get(key)
+        else:
+            read_from_replica = False
+
+        token = _read_from_replica.set(read_from_replica)
+        try:
+            response = self.get_response(request)
+        finally:
+            _read_from_replica.reset(token)
+
+        if request.method not in SAFE_METHODS and key is not None:
+            cache.set(key, True, settings.DATABASE_REPLICA_STICKY_SECONDS)
+
+        return response
+
+
+class ReplicaRouter:
+    """
+    Sends the reads of the requests marked by ReplicaRoutingMiddleware to a random replica,
+    and all other queries to the primary. Migrations only run on the primary, as the replicas copy its schema.
+    """
+
+    def db_for_read(self, model, **hints):
+        replicas = settings.DATABASE_REPLICAS
+
+        if not replicas or not _read_from_replica.get():
+            return DEFAULT_DB_ALIAS
+
+        # reads in a transaction must see its writes
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # the replicas hold the same data as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
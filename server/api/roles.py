@@ -0,0 +1,177 @@
+import bisect
+import threading
+import time
+
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .models import Profile, Project
+
+
+# The fields of each model that roles are indexed from
+_ROLE_FIELDS = {
+    Profile: ('roles',),
+    Project: ('owner_role', 'desired_roles'),
+}
+
+
+def _roles_of(instance):
+    """
+    Returns the non-blank roles used by a profile or project.
+    """
+    if isinstance(instance, Profile):
+        roles = instance.roles
+    else:
+        roles = [instance.owner_role, *instance.desired_roles]
+
+    return [role for role in roles if role]
+
+
+class RoleIndex:
+    """
+    In-memory prefix index of every distinct role used in student profiles and projects,
+    along with the number of times each role is used.
+
+    Roles are kept in a sorted list so all the roles starting with a prefix can be found with a binary search.
+    Roles are matched case-insensitively and are shown with the spelling they were last used with,
+    which is their canonical name as roles are canonicalized when saved (see Role).
+
+    The index is built from the database on first use and kept up to date by the signal receivers below.
+    Changes made by other processes (or bulk queryset updates) are picked up by rebuilding the index
+    every ROLE_INDEX_REBUILD_INTERVAL seconds.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._keys = []  # sorted lowercase roles
+        self._roles = {}  # lowercase role -> [role, count]
+        self._built_at = None
+
+    def _add(self, role):
+        key = role.lower()
+
+        if key in self._roles:
+            self._roles[key][0] = role
+            self._roles[key][1] += 1
+        else:
+            self._roles[key] = [role, 1]
+            bisect.insort(self._keys, key)
+
+    def _remove(self, role):
+        key = role.lower()
+
+        if key not in self._roles:
+            return
+
+        self._roles[key][1] -= 1
+
+        if self._roles[key][1] <= 0:
+            del self._roles[key]
+            del self._keys[bisect.bisect_left(self._keys, key)]
+
+    def _is_stale(self):
+        rebuild_interval = getattr(settings, 'ROLE_INDEX_REBUILD_INTERVAL', 300)
+
+        return self._built_at is None or time.monotonic() - self._built_at > rebuild_interval
+
+    def build(self):
+        """
+        Rebuilds the whole index from the database.
+        """
+        roles = []
+        for profile_roles in Profile.objects.values_list('roles', flat=True).iterator():
+            roles += profile_roles
+        for owner_role, desired_roles in Project.objects.values_list('owner_role', 'desired_roles').iterator():
+            roles += [owner_role, *desired_roles]
+
+        counted_roles = {}
+        for role in filter(None, roles):
+            key = role.lower()
+            count = counted_roles[key][1] if key in counted_roles else 0
+            counted_roles[key] = [role, count + 1]
+
+        with self._lock:
+            self._roles = counted_roles
+            self._keys = sorted(counted_roles)
+            self._built_at = time.monotonic()
+
+    def update(self, old_roles, new_roles):
+        """
+        Replaces one use of each of the old roles with the new roles.
+        Does nothing if the index hasn't been built yet, as building it will include the change.
+        """
+        with self._lock:
+            if self._built_at is None:
+                return
+
+            for role in old_roles:
+                self._remove(role)
+            for role in new_roles:
+                self._add(role)
+
+    def clear(self):
+        """
+        Empties the index, so it's rebuilt from the database the next time it's used.
+        """
+        with self._lock:
+            self._keys = []
+            self._roles = {}
+            self._built_at = None
+
+    def suggest(self, prefix, limit=10):
+        """
+        Returns up to `limit` roles starting with the given prefix, most used first,
+        as a list of (role, count) tuples.
+        """
+        if self._is_stale():
+            self.build()
+
+        prefix = prefix.lower()
+
+        with self._lock:
+            start = bisect.bisect_left(self._keys, prefix)
+            # every role starting with the prefix sorts before the prefix followed by the highest character
+            end = bisect.bisect_left(self._keys, prefix + '\U0010ffff', lo=start)
+            matches = [tuple(self._roles[key]) for key in self._keys[start:end]]
+
+        matches.sort(key=lambda match: (-match[1], match[0].lower()))
+
+        return matches[:limit]
+
+
+role_index = RoleIndex()
+
+
+@receiver(pre_save, sender=Profile)
+@receiver(pre_save, sender=Project)
+def remember_indexed_roles(sender, instance, **kwargs):
+    """
+    Before a profile or project is saved, remember the roles it had so they can be replaced in the role index.
+    """
+    instance._indexed_roles = []
+
+    if instance.pk is None:
+        return
+
+    previous = sender.objects.only(*_ROLE_FIELDS[sender]).filter(pk=instance.pk).first()
+    if previous is not None:
+        instance._indexed_roles = _roles_of(previous)
+
+
+@receiver(post_save, sender=Profile)
+@receiver(post_save, sender=Project)
+def update_role_index(sender, instance, **kwargs):
+    """
+    Each time a profile or project is saved, its roles are updated in the role index.
+    """
+    role_index.update(getattr(instance, '_indexed_roles', []), _roles_of(instance))
+
+
+@receiver(post_delete, sender=Profile)
+@receiver(post_delete, sender=Project)
+def remove_from_role_index(sender, instance, **kwargs):
+    """
+    Each time a profile or project is deleted, its roles are removed from the role index.
+    """
+    role_index.update(_roles_of(instance), [])
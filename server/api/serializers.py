@@ -1,9 +1,16 @@
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.db import IntegrityError, transaction
 from django.db.models import Q
+from django.db.models.functions import Now
+from django.db.models.signals import post_save
 from rest_framework import serializers
+from rest_framework.settings import api_settings
 
+from .cache import response_cache
 from .models import (Follow, Membership, PrivateMessage, Profile, Project,
-                     PublicMessage, Request)
+                     PublicMessage, Request, RequestEvent, Role, normalize_role)
+from .realtime import publish_message
 
 
 class ProfileSerializer(serializers.ModelSerializer):
@@ -81,6 +88,79 @@ class MembershipSerializer(serializers.ModelSerializer):
         )
 
 
+class MembershipRoleSerializer(serializers.Serializer):
+    """
+    Serializer for a single role change of a bulk membership update.
+    """
+
+    id = serializers.IntegerField()
+    role = serializers.CharField(max_length=40)
+
+
+class MembershipBulkUpdateSerializer(serializers.Serializer):
+    """
+    Serializer for changing the roles of and removing many team members of a project at once.
+    The project must be given as the instance, and is serialized as its new team roster.
+
+    The memberships are fetched in one query, their roles are changed with a single bulk update,
+    and the removed memberships are deleted with a single delete, all in one transaction.
+    """
+
+    changes = MembershipRoleSerializer(many=True, required=False, default=list)
+    remove = serializers.ListField(child=serializers.IntegerField(), required=False, default=list)
+
+    def validate(self, data):
+        project = self.instance
+        membership_pks = [membership['id'] for membership in data['changes']] + data['remove']
+
+        if not membership_pks:
+            raise serializers.ValidationError('No memberships to update or remove')
+
+        if len(set(membership_pks)) != len(membership_pks):
+            raise serializers.ValidationError('Each membership can only be updated or removed once')
+
+        memberships = project.team_members.in_bulk(membership_pks)
+        missing_pks = [pk for pk in membership_pks if pk not in memberships]
+
+        if missing_pks:
+            raise serializers.ValidationError(f'No memberships of this project found with the ids {missing_pks}')
+
+        data['memberships'] = memberships
+
+        return data
+
+    def update(self, instance, validated_data):
+        memberships = validated_data['memberships']
+
+        with transaction.atomic():
+            # bulk_update doesn't call save, so the new roles are canonicalized here, all at once
+            roles = Role.objects.resolve([change['role'] for change in validated_data['changes']])
+
+            updated_memberships = []
+            for change in validated_data['changes']:
+                membership = memberships[change['id']]
+                membership.canonical_role = roles[normalize_role(change['role'])]
+                membership.role = membership.canonical_role.name
+                updated_memberships.append(membership)
+
+            # bulk_update doesn't send post_save, so the project's update date is changed
+            # and its cached responses invalidated here, once for all of the memberships
+            if updated_memberships:
+                Membership.objects.bulk_update(updated_memberships, ['role', 'canonical_role'])
+                Project.objects.filter(pk=instance.pk).update(date_updated=Now())
+                response_cache.invalidate('projects', f'project:{instance.pk}')
+
+            if validated_data['remove']:
+                instance.team_members.filter(pk__in=validated_data['remove']).delete()
+
+        return instance
+
+    def to_representation(self, instance):
+        team_members = instance.team_members.select_related('user').order_by('id')
+
+        return MembershipSerializer(team_members, many=True).data
+
+
 class ProjectSerializer(serializers.ModelSerializer):
     """
     Serializer for the Project model.
@@ -105,10 +185,10 @@ class ProjectSerializer(serializers.ModelSerializer):
     class Meta:
         model = Project
         fields = (
-            'id', 'title', 'description', 'category_name', 'category', 'owner', 'owner_first_name', 'owner_last_name', 'owner_role', 'desired_roles', 'date_created', 'team_members'
+            'id', 'title', 'description', 'category_name', 'category', 'owner', 'owner_first_name', 'owner_last_name', 'owner_role', 'desired_roles', 'date_created', 'follower_count', 'team_members'
         )
         read_only_fields = (
-            'id', 'owner', 'owner_first_name', 'owner_last_name', 'date_created', 'category_name'
+            'id', 'owner', 'owner_first_name', 'owner_last_name', 'date_created', 'category_name', 'follower_count'
         )
     
     def create(self, validated_data):
@@ -118,6 +198,31 @@ class ProjectSerializer(serializers.ModelSerializer):
         
         return project
 
+    def update(self, instance, validated_data):
+        for field, value in validated_data.items():
+            setattr(instance, field, value)
+
+        # only save the fields that were given, so the follower count
+        # isn't overwritten if it was changed by a follow in the meantime
+        instance.save(update_fields=[*validated_data, 'date_updated'])
+
+        return instance
+
+
+class ProjectViewerSerializer(serializers.Serializer):
+    """
+    Serializer for the requesting user's relations to a project.
+    The project must be annotated using Project.objects.with_viewer().
+    """
+
+    is_owner = serializers.SerializerMethodField()
+    membership_id = serializers.IntegerField(source='viewer_membership_id', allow_null=True, read_only=True)
+    follow_id = serializers.IntegerField(source='viewer_follow_id', allow_null=True, read_only=True)
+    active_request_id = serializers.IntegerField(source='viewer_request_id', allow_null=True, read_only=True)
+
+    def get_is_owner(self, obj):
+        return obj.owner_id == self.context['request'].user.id
+
 
 class FollowSerializer(serializers.ModelSerializer):
     """
@@ -137,20 +242,16 @@ class FollowSerializer(serializers.ModelSerializer):
             'id', 'user',
         )
     
-    def validate(self, data):
-        user = self.context['request'].user
-
-        # raise error if the requesting user already follows the project
-        follows = Follow.objects.filter(Q(user=user) & Q(project=data['project']))
-        if follows.count() > 0:
-            raise serializers.ValidationError('You are already following this project')
-        
-        return data
-
     def create(self, validated_data):
         user = self.context['request'].user
 
-        follow = Follow.objects.create(user=user, **validated_data)
+        # the unique constraint on follows rejects a second follow of the project by the user,
+        # even when both are created at the same time
+        try:
+            with transaction.atomic():
+                follow = Follow.objects.create(user=user, **validated_data)
+        except IntegrityError:
+            raise serializers.ValidationError({api_settings.NON_FIELD_ERRORS_KEY: ['You are already following this project']})
         
         return follow
 
@@ -181,6 +282,8 @@ class RequestSerializer(serializers.ModelSerializer):
         read_only_fields = (
             'id', 'requester', 'status_name', 'status', 'is_active', 'date_created',
         )
+
+    ACTIVE_REQUEST_ERROR = 'There is already an active request to or from the requestee for this project'
     
     def validate(self, data):
         # We know that the data passed into this method has gone through individual field validation
@@ -188,13 +291,7 @@ class RequestSerializer(serializers.ModelSerializer):
         requestee = data['requestee']
         project = data['project']
 
-        # raise error if there is already an active Request between the requester and requestee for the specified project
-        requests = Request.objects.filter(
-            (Q(requester=requester) & Q(requestee=requestee) & Q(project=project) & Q(is_active=True)) |
-            (Q(requester=requestee) & Q(requestee=requester) & Q(project=project) & Q(is_active=True))
-        )
-        if requests.count() > 0:
-            raise serializers.ValidationError('There is already an active request to or from the requestee for this project')
+        # the checks that need no queries are made first
 
         # raise error if neither the requester nor the requestee are the project owner
         if not project.is_owner(requester) and not project.is_owner(requestee):
@@ -204,9 +301,18 @@ class RequestSerializer(serializers.ModelSerializer):
         if requester == requestee:
             raise serializers.ValidationError('You cannot send a request to yourself')
 
+        # raise error if there is already an active Request between the requester and requestee for the specified project
+        # (the unique index on active requests rejects one created in the meantime, see create())
+        requests = Request.objects.filter(
+            (Q(requester=requester) & Q(requestee=requestee)) | (Q(requester=requestee) & Q(requestee=requester)),
+            project=project,
+            is_active=True,
+        )
+        if requests.exists():
+            raise serializers.ValidationError(self.ACTIVE_REQUEST_ERROR)
+
         # raise error if the requester or requestee are a member of the project (project owners cannot be members)
-        members = project.team_members.filter(Q(user=requester) | Q(user=requestee))
-        if members.count() > 0:
+        if project.team_members.filter(Q(user=requester) | Q(user=requestee)).exists():
             raise serializers.ValidationError('Member already exists')
 
         return data
@@ -214,11 +320,165 @@ class RequestSerializer(serializers.ModelSerializer):
     def create(self, validated_data):
         requester = self.context['request'].user
 
-        request = Request.objects.create(requester=requester, **validated_data)
+        try:
+            with transaction.atomic():
+                request = Request.objects.create(requester=requester, **validated_data)
+                request.events.create(event_type=RequestEvent.Type.CREATED)
+        except IntegrityError:
+            raise serializers.ValidationError({api_settings.NON_FIELD_ERRORS_KEY: [self.ACTIVE_REQUEST_ERROR]})
         
         return request
 
 
+class RequestInvitationSerializer(serializers.Serializer):
+    """
+    Serializer for a single invitation of a bulk request creation.
+    The requestee is only checked when the whole batch is validated, so students aren't fetched one at a time.
+    """
+
+    requestee = serializers.IntegerField()
+    role = serializers.CharField(max_length=40)
+
+
+class RequestBulkCreateSerializer(serializers.Serializer):
+    """
+    Serializer for the project owner inviting many students to a project at once.
+
+    The invitations are validated with a constant number of queries, whatever their number.
+    Invalid invitations are reported individually under 'errors' and the valid ones are still created,
+    including when some of the students are sent a request by someone else in the meantime.
+    """
+
+    CONFLICT_ERROR = 'The students or the project changed while sending the invitations, please try again'
+
+    project = serializers.PrimaryKeyRelatedField(queryset=Project.objects.all())
+    invitations = RequestInvitationSerializer(many=True, allow_empty=False)
+
+    def validate_invitations(self, invitations):
+        max_invitations = settings.API_MAX_BULK_REQUESTS
+
+        if len(invitations) > max_invitations:
+            raise serializers.ValidationError(f'No more than {max_invitations} students can be invited at once')
+
+        return invitations
+
+    def _get_requested_pks(self, owner, project, requestee_pks):
+        """
+        Helper method for getting which of the given students already have an active request
+        with the owner for the project, whichever of them sent it.
+        """
+        active_requests = Request.objects.filter(
+            Q(requester=owner, requestee__in=requestee_pks) | Q(requestee=owner, requester__in=requestee_pks),
+            project=project,
+            is_active=True,
+        )
+
+        return {
+            requestee_pk if requester_pk == owner.pk else requester_pk
+            for requester_pk, requestee_pk in active_requests.values_list('requester', 'requestee')
+        }
+
+    def _create_requests(self, requester, project, invitations):
+        """
+        Helper method for creating the requests of the given invitations and their events, all or nothing.
+
+        Raises IntegrityError if one of the students has an active request for the project.
+        """
+        with transaction.atomic():
+            # bulk_create doesn't call save, so the roles are canonicalized here, all at once
+            roles = Role.objects.resolve([invitation['role'] for invitation in invitations])
+            new_requests = []
+            for invitation in invitations:
+                role = roles[normalize_role(invitation['role'])]
+                new_requests.append(Request(
+                    requester=requester, project=project, requestee=invitation['requestee'], role=role.name, canonical_role=role
+                ))
+
+            Request.objects.bulk_create(new_requests)
+            events = RequestEvent.objects.bulk_create([
+                RequestEvent(request=new_request, event_type=RequestEvent.Type.CREATED) for new_request in new_requests
+            ])
+
+        return new_requests, events
+
+    def validate(self, data):
+        owner = self.context['request'].user
+        project = data['project']
+
+        if not project.is_owner(owner):
+            raise serializers.ValidationError('Only the project owner can invite students in bulk')
+
+        requestee_pks = {invitation['requestee'] for invitation in data['invitations']}
+
+        requestees = get_user_model().objects.in_bulk(requestee_pks)
+        member_pks = set(project.team_members.filter(user__in=requestee_pks).values_list('user', flat=True))
+        requested_pks = self._get_requested_pks(owner, project, requestee_pks)
+
+        valid_invitations = []
+        errors = []
+        invited_pks = set()
+
+        for index, invitation in enumerate(data['invitations']):
+            requestee_pk = invitation['requestee']
+
+            # the same checks as RequestSerializer.validate, in the same order
+            if requestee_pk not in requestees:
+                error = f'Invalid pk "{requestee_pk}" - object does not exist.'
+            elif requestee_pk == owner.pk:
+                error = 'You cannot send a request to yourself'
+            elif requestee_pk in requested_pks or requestee_pk in invited_pks:
+                error = RequestSerializer.ACTIVE_REQUEST_ERROR
+            elif requestee_pk in member_pks:
+                error = 'Member already exists'
+            else:
+                invited_pks.add(requestee_pk)
+                valid_invitations.append({'index': index, 'requestee': requestees[requestee_pk], 'role': invitation['role']})
+                continue
+
+            errors.append({'index': index, 'requestee': requestee_pk, 'errors': [error]})
+
+        return {'project': project, 'invitations': valid_invitations, 'errors': errors}
+
+    def create(self, validated_data):
+        requester = self.context['request'].user
+        project = validated_data['project']
+        invitations = validated_data['invitations']
+        errors = list(validated_data['errors'])
+        new_requests, events = [], []
+
+        while invitations:
+            try:
+                new_requests, events = self._create_requests(requester, project, invitations)
+                break
+            except IntegrityError:
+                # some of the students were sent a request in the meantime, so they're reported and the rest are retried
+                requested_pks = self._get_requested_pks(requester, project, [invitation['requestee'].pk for invitation in invitations])
+
+                # something else changed in the meantime, e.g. one of the students deleted their account
+                if not requested_pks:
+                    raise serializers.ValidationError({api_settings.NON_FIELD_ERRORS_KEY: [self.CONFLICT_ERROR]})
+
+                errors += [
+                    {'index': invitation['index'], 'requestee': invitation['requestee'].pk, 'errors': [RequestSerializer.ACTIVE_REQUEST_ERROR]}
+                    for invitation in invitations if invitation['requestee'].pk in requested_pks
+                ]
+                invitations = [invitation for invitation in invitations if invitation['requestee'].pk not in requested_pks]
+
+        errors.sort(key=lambda error: error['index'])
+
+        # bulk_create doesn't send post_save, which streams the events to the requester and requestee
+        for event in events:
+            post_save.send(sender=RequestEvent, instance=event, created=True, raw=False, using=event._state.db, update_fields=None)
+
+        return {'requests': new_requests, 'errors': errors}
+
+    def to_representation(self, instance):
+        return {
+            'requests': RequestSerializer(instance['requests'], many=True).data,
+            'errors': instance['errors'],
+        }
+
+
 class RequestUpdateSerializer(serializers.ModelSerializer):
     """
     Serializer used specificly for updating project requests.
@@ -242,19 +502,18 @@ class RequestUpdateSerializer(serializers.ModelSerializer):
 
     def validate(self, data):
         # We know that the data passed into this method has gone through individual field validation
-        requesting_user = self.context['request'].user
-        request_pk = self.context['request_pk']
-        project_request = Request.objects.get(pk=request_pk)
-        requester = project_request.requester
-        requestee = project_request.requestee
+        # the project request being updated was already fetched (and locked) by the view
+        requesting_user_pk = self.context['request'].user.pk
+        requester_pk = self.instance.requester_id
+        requestee_pk = self.instance.requestee_id
 
-        if requesting_user == requester and data['status'] == Request.Status.ACCEPTED:
+        if requesting_user_pk == requester_pk and data['status'] == Request.Status.ACCEPTED:
             raise serializers.ValidationError('You cannot accept your own request')
 
-        if requesting_user == requester and data['status'] == Request.Status.DECLINED:
+        if requesting_user_pk == requester_pk and data['status'] == Request.Status.DECLINED:
             raise serializers.ValidationError('You cannot decline your own request')
 
-        if requesting_user == requestee and data['status'] == Request.Status.CANCELLED:
+        if requesting_user_pk == requestee_pk and data['status'] == Request.Status.CANCELLED:
             raise serializers.ValidationError('You cannot cancel another person\'s request')
 
         return data
@@ -264,7 +523,12 @@ class RequestUpdateSerializer(serializers.ModelSerializer):
         instance.status = new_status
 
         if new_status == Request.Status.ACCEPTED:
-            instance.accept()
+            # the unique constraint on memberships rejects the new member if they joined the project in the meantime
+            try:
+                with transaction.atomic():
+                    instance.accept()
+            except IntegrityError:
+                raise serializers.ValidationError({api_settings.NON_FIELD_ERRORS_KEY: ['Member already exists']})
         elif new_status == Request.Status.DECLINED:
             instance.decline()
         elif new_status == Request.Status.CANCELLED:
@@ -296,6 +560,9 @@ class PrivateMessageSerializer(serializers.ModelSerializer):
         project = self.context['project']
 
         private_message = PrivateMessage.objects.create(user=user, project=project, **validated_data)
+
+        # push the new message to the clients connected to the project's private discussion
+        publish_message(project.pk, 'private', PrivateMessageSerializer(private_message).data)
         
         return private_message
 
@@ -322,5 +589,8 @@ class PublicMessageSerializer(serializers.ModelSerializer):
         project = self.context['project']
 
         public_message = PublicMessage.objects.create(user=user, project=project, **validated_data)
+
+        # push the new message to the clients connected to the project's public discussion
+        publish_message(project.pk, 'public', PublicMessageSerializer(public_message).data)
         
         return public_message
@@ -0,0 +1,35 @@
+"""
+Refreshing of the materialized views behind the staff statistics (see RoleStats and RoleCategoryStats).
+
+The views aggregate the roles of every profile, project, and team member, which is too slow to do for each request,
+so they're refreshed on a schedule by the refresh_stats command, every STATS_REFRESH_INTERVAL seconds.
+The refreshes are concurrent, so the views can still be read while they're refreshed.
+"""
+
+from django.db import DEFAULT_DB_ALIAS, connections
+
+# The materialized views, in the order they're refreshed
+STATS_VIEWS = ('api_role_stats', 'api_role_category_stats')
+
+# Key of the advisory lock held while refreshing the views, so refreshes started at the same time don't overlap
+_REFRESH_LOCK_KEY = 250_725
+
+
+def refresh_stats(using=DEFAULT_DB_ALIAS):
+    """
+    Refreshes the materialized views of the statistics, on the primary database by default.
+    Returns False without refreshing them if another process is already refreshing them.
+    """
+    with connections[using].cursor() as cursor:
+        cursor.execute('SELECT pg_try_advisory_lock(%s)', [_REFRESH_LOCK_KEY])
+
+        if not cursor.fetchone()[0]:
+            return False
+
+        try:
+            for view in STATS_VIEWS:
+                cursor.execute(f'REFRESH MATERIALIZED VIEW CONCURRENTLY {view}')
+        finally:
+            cursor.execute('SELECT pg_advisory_unlock(%s)', [_REFRESH_LOCK_KEY])
+
+    return True
@@ -0,0 +1,121 @@
+import socketserver
+import threading
+import time
+
+
+def _encode(value):
+    """
+    Encodes a reply in the Redis serialization protocol.
+    """
+    if value is None:
+        return b'$-1\r\n'
+    if isinstance(value, int):
+        return b':%d\r\n' % value
+    if isinstance(value, list):
+        return b'*%d\r\n' % len(value) + b''.join(_encode(item) for item in value)
+    if value == 'OK':
+        return b'+OK\r\n'
+    return b'$%d\r\n%s\r\n' % (len(value), value)
+
+
+class RedisStandInHandler(socketserver.StreamRequestHandler):
+    """
+    Serves the few Redis commands used by the cache backend and broker from a dict,
+    standing in for a Redis server in tests.
+    """
+
+    def setup(self):
+        super().setup()
+        self._write_lock = threading.Lock()
+
+    def _read_command(self):
+        line = self.rfile.readline()
+        if not line:
+            return None
+
+        args = []
+        for _ in range(int(line[1:])):
+            length = int(self.rfile.readline()[1:])
+            args.append(self.rfile.read(length + 2)[:-2])
+
+        return args
+
+    def _write(self, value):
+        # other connections write published messages to subscribers
+        with self._write_lock:
+            self.wfile.write(_encode(value))
+
+    def _get(self, key):
+        value, expires_at = self.server.data.get(key, (None, None))
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self.server.data[key]
+            return None
+        return value
+
+    def handle(self):
+        data = self.server.data
+
+        while True:
+            args = self._read_command()
+            if args is None:
+                return
+
+            command, args = args[0].upper(), args[1:]
+
+            if command == b'GET':
+                self._write(self._get(args[0]))
+            elif command == b'MGET':
+                self._write([self._get(key) for key in args])
+            elif command == b'SET':
+                key, value, flags = args[0], args[1], [arg.upper() for arg in args[2:]]
+                if b'NX' in flags and self._get(key) is not None:
+                    self._write(None)
+                    continue
+                expires_at = None
+                if b'PX' in flags:
+                    expires_at = time.monotonic() + int(args[2 + flags.index(b'PX') + 1]) / 1000
+                data[key] = (value, expires_at)
+                self._write('OK')
+            elif command == b'DEL':
+                self._write(sum(data.pop(key, None) is not None for key in args))
+            elif command == b'EXISTS':
+                self._write(sum(self._get(key) is not None for key in args))
+            elif command == b'INCRBY':
+                value = int(self._get(args[0]) or 0) + int(args[1])
+                data[args[0]] = (str(value).encode(), data.get(args[0], (None, None))[1])
+                self._write(value)
+            elif command == b'FLUSHDB':
+                data.clear()
+                self._write('OK')
+            elif command == b'SUBSCRIBE':
+                for number, channel in enumerate(args, start=1):
+                    self.server.subscribers.setdefault(channel, []).append(self)
+                    self._write([b'subscribe', channel, number])
+            elif command == b'PUBLISH':
+                channel, message = args
+                subscribers = list(self.server.subscribers.get(channel, []))
+                for subscriber in subscribers:
+                    subscriber._write([b'message', channel, message])
+                self._write(len(subscribers))
+            else:
+                self.wfile.write(b'-ERR unknown command\r\n')
+
+    def finish(self):
+        for subscribers in self.server.subscribers.values():
+            if self in subscribers:
+                subscribers.remove(self)
+        super().finish()
+
+
+def start_redis_stand_in():
+    """
+    Starts a stand-in Redis server on a free local port in a background thread.
+    Call shutdown() and server_close() on the returned server when done.
+    """
+    server = socketserver.ThreadingTCPServer(('localhost', 0), RedisStandInHandler)
+    server.daemon_threads = True
+    server.data = {}
+    server.subscribers = {}
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    return server
@@ -0,0 +1,221 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.test import SimpleTestCase
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APITestCase
+
+from ..cache import response_cache
+from ..cache_backends import RedisCache
+from ..models import Follow, Membership, Project, PublicMessage
+from .redis_stand_in import start_redis_stand_in
+
+USER_MODEL = get_user_model()
+PASS = 'password123!'
+
+
+def create_user(username, email, first_name, last_name, password):
+    try:
+        user = USER_MODEL.objects.create_user(username, email, first_name, last_name, password)
+    except IntegrityError:
+        user = USER_MODEL.objects.get(username=username)
+
+    return user
+
+
+class ResponseCacheViewTest(APITestCase):
+    # this setup is re-run before each test
+    def setUp(self):
+        # the cache lives in memory, so make sure nothing is left over from other tests
+        caches['api'].clear()
+        response_cache.reset_metrics()
+
+        self.user = create_user(
+            username = 'johndoe',
+            email = 'johndoe@fakeuniversity.com',
+            first_name = 'John',
+            last_name = 'Doe',
+            password = PASS,
+        )
+        self.other_user = create_user(
+            username = 'jeffdoe',
+            email = 'jeffdoe@fakeuniversity.com',
+            first_name = 'Jeff',
+            last_name = 'Doe',
+            password = PASS,
+        )
+
+        self.project = Project.objects.create(
+            title = 'Test Project 1',
+            description = 'Test project 1 description.',
+            category = 'SFW',
+            owner = self.other_user,
+            owner_role = 'Software Tester',
+            desired_roles = [
+                'Software Engineer'
+            ]
+        )
+
+        # prepare data for login
+        url = reverse('token_obtain_pair')
+        data = {
+            'username': self.user.username,
+            'password': PASS,
+        }
+        # log in user
+        response = self.client.post(url, data, format='json')
+
+        # add access token to auth header
+        self.client.credentials(HTTP_AUTHORIZATION = 'Bearer ' + response.data['access'])
+
+    def test_get_project_detail_is_cached(self):
+        url = reverse('project-detail', kwargs={'project_pk': self.project.pk})
+        first_response = self.client.get(url)
+
+        # only the requesting user and the ETag are fetched
+        with self.assertNumQueries(2):
+            second_response = self.client.get(url)
+
+        self.assertEqual(second_response.status_code, status.HTTP_200_OK)
+        self.assertEqual(second_response.data, first_response.data)
+        self.assertEqual(response_cache.metrics()['project-detail'], {'hits': 1, 'misses': 1})
+
+    def test_get_project_detail_is_invalidated_when_project_changes(self):
+        url = reverse('project-detail', kwargs={'project_pk': self.project.pk})
+        self.client.get(url)
+
+        self.project.title = 'New Title'
+        self.project.save()
+        response = self.client.get(url)
+
+        self.assertEqual(response.data['title'], 'New Title')
+        self.assertEqual(response_cache.metrics()['project-detail'], {'hits': 0, 'misses': 2})
+
+    def test_get_project_detail_is_invalidated_when_relations_change(self):
+        url = reverse('project-detail', kwargs={'project_pk': self.project.pk})
+        self.client.get(url)
+
+        Follow.objects.create(user=self.user, project=self.project)
+        Membership.objects.create(user=self.user, project=self.project, role='Software Engineer')
+        response = self.client.get(url)
+
+        self.assertEqual(response.data['follower_count'], 1)
+        self.assertEqual(len(response.data['team_members']), 1)
+
+    def test_get_project_detail_with_viewer_from_cache(self):
+        url = reverse('project-detail', kwargs={'project_pk': self.project.pk})
+        # cache the project without a viewer block
+        self.client.get(url)
+
+        # the viewer block isn't cached as it's different for each user, so it's still looked up
+        with self.assertNumQueries(3):
+            response = self.client.get(f'{url}?include=viewer')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(response.data['viewer']['is_owner'])
+        self.assertEqual(response_cache.metrics()['project-detail'], {'hits': 1, 'misses': 1})
+
+    def test_get_project_list_is_invalidated_when_project_is_created(self):
+        url = reverse('project-list')
+        self.client.get(url)
+
+        Project.objects.create(
+            title = 'Test Project 2',
+            description = 'Test project 2 description.',
+            category = 'SFW',
+            owner = self.user,
+            owner_role = 'Software Tester',
+            desired_roles = []
+        )
+        response = self.client.get(url)
+
+        self.assertEqual(len(response.data), 2)
+
+    def test_get_project_list_with_relation_is_cached_per_user(self):
+        Follow.objects.create(user=self.other_user, project=self.project)
+
+        url = f'{reverse("project-list")}?relation=followed'
+        self.client.force_authenticate(user=self.other_user)
+        other_user_response = self.client.get(url)
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get(url)
+
+        self.assertEqual(len(other_user_response.data), 1)
+        self.assertEqual(len(response.data), 0)
+
+    def test_get_public_message_list_is_invalidated_when_message_is_created(self):
+        url = reverse('project-public-messages-list', kwargs={'project_pk': self.project.pk})
+        self.client.get(url)
+        self.client.get(url)
+
+        PublicMessage.objects.create(user=self.user, project=self.project, message='Hi everyone!')
+        response = self.client.get(url)
+
+        self.assertEqual(len(response.data), 1)
+        self.assertEqual(response_cache.metrics()['public-message-list'], {'hits': 1, 'misses': 2})
+
+    def test_get_public_message_list_is_invalidated_when_author_changes_name(self):
+        PublicMessage.objects.create(user=self.user, project=self.project, message='Hi everyone!')
+
+        url = reverse('project-public-messages-list', kwargs={'project_pk': self.project.pk})
+        self.client.get(url)
+
+        self.user.first_name = 'Jonathan'
+        self.user.save()
+        response = self.client.get(url)
+
+        self.assertEqual(response.data[0]['user_first_name'], 'Jonathan')
+
+
+class RedisCacheBackendTest(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = start_redis_stand_in()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    # this setup is re-run before each test
+    def setUp(self):
+        host, port = self.server.server_address
+        self.cache = RedisCache(f'redis://{host}:{port}/0', {'KEY_PREFIX': 'test'})
+        self.cache.clear()
+
+    def test_set_and_get(self):
+        self.cache.set('key', {'data': [1, 2, 3]})
+
+        self.assertEqual(self.cache.get('key'), {'data': [1, 2, 3]})
+        self.assertIsNone(self.cache.get('missing'))
+        self.assertEqual(self.cache.get_many(['key', 'missing']), {'key': {'data': [1, 2, 3]}})
+
+    def test_add_does_not_overwrite(self):
+        self.assertTrue(self.cache.add('key', 1))
+        self.assertFalse(self.cache.add('key', 2))
+
+        self.assertEqual(self.cache.get('key'), 1)
+
+    def test_incr(self):
+        self.cache.set('key', 1)
+
+        self.assertEqual(self.cache.incr('key'), 2)
+        self.assertEqual(self.cache.get('key'), 2)
+        with self.assertRaises(ValueError):
+            self.cache.incr('missing')
+
+    def test_timeout(self):
+        self.cache.set('key', 'value', timeout=0.05)
+        time.sleep(0.1)
+
+        self.assertIsNone(self.cache.get('key'))
+
+    def test_delete(self):
+        self.cache.set('key', 'value')
+
+        self.assertTrue(self.cache.delete('key'))
+        self.assertFalse(self.cache.has_key('key'))
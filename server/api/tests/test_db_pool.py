@@ -0,0 +1,156 @@
+import psycopg2
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import SimpleTestCase
+from rest_framework.reverse import reverse
+from rest_framework.test import APITestCase
+
+from ..db_backends.postgresql.base import DatabaseWrapper
+from ..db_backends.postgresql.pool import ConnectionPool, close_pools
+
+USER_MODEL = get_user_model()
+PASS = 'password123!'
+
+
+def create_user(username, email, first_name, last_name, password):
+    try:
+        user = USER_MODEL.objects.create_user(username, email, first_name, last_name, password)
+    except IntegrityError:
+        user = USER_MODEL.objects.get(username=username)
+
+    return user
+
+
+class ConnectionPoolTest(SimpleTestCase):
+    def setUp(self):
+        conn_params = connection.get_connection_params()
+        self.pools = []
+        self.connect = lambda: psycopg2.connect(**conn_params)
+
+    def tearDown(self):
+        for pool in self.pools:
+            pool.close()
+
+    def create_pool(self, **kwargs):
+        pool = ConnectionPool(self.connect, **kwargs)
+        self.pools.append(pool)
+        return pool
+
+    def test_connection_reused(self):
+        pool = self.create_pool(max_size=2)
+
+        first = pool.acquire()
+        pool.release(first)
+        second = pool.acquire()
+        pool.release(second)
+
+        self.assertIs(first, second)
+        self.assertEqual(pool.metrics()['connections_opened'], 1)
+        self.assertEqual(pool.metrics()['checkouts'], 2)
+
+    def test_overflow_closed_on_release(self):
+        pool = self.create_pool(max_size=1, max_overflow=1)
+
+        first, second = pool.acquire(), pool.acquire()
+        self.assertEqual(pool.metrics()['overflow'], 1)
+
+        pool.release(first)
+        pool.release(second)
+
+        self.assertEqual(pool.size, 1)
+        self.assertEqual(pool.metrics()['connections_discarded'], 1)
+
+    def test_timeout_when_exhausted(self):
+        pool = self.create_pool(max_size=1, timeout=0.1)
+
+        conn = pool.acquire()
+        self.addCleanup(pool.release, conn)
+
+        with self.assertRaises(psycopg2.OperationalError):
+            pool.acquire()
+
+        self.assertEqual(pool.metrics()['timeouts'], 1)
+        self.assertEqual(pool.metrics()['utilization'], 1)
+
+    def test_broken_connection_replaced(self):
+        pool = self.create_pool(max_size=1)
+
+        first = pool.acquire()
+        pool.release(first)
+        # the server ends the connection while it's idle in the pool
+        other = self.connect()
+        with other.cursor() as cursor:
+            cursor.execute('SELECT pg_terminate_backend(%s)', [first.get_backend_pid()])
+        other.close()
+
+        second = pool.acquire()
+        with second.cursor() as cursor:
+            cursor.execute('SELECT 1')
+
+        self.assertIsNot(first, second)
+        self.assertEqual(pool.metrics()['connections_discarded'], 1)
+        pool.release(second)
+
+    def test_open_transaction_rolled_back_on_release(self):
+        pool = self.create_pool(max_size=1)
+
+        conn = pool.acquire()
+        with conn.cursor() as cursor:
+            cursor.execute('SELECT 1')
+        pool.release(conn)
+
+        self.assertEqual(conn.get_transaction_status(), psycopg2.extensions.TRANSACTION_STATUS_IDLE)
+
+    def test_database_wrapper_returns_connection_to_pool(self):
+        wrapper = DatabaseWrapper({**connection.settings_dict, 'POOL': {'MAX_SIZE': 1}}, alias='pool-test')
+        self.addCleanup(close_pools, database=connection.settings_dict['NAME'])
+
+        wrapper.ensure_connection()
+        first = wrapper.connection
+        wrapper.close()
+        wrapper.ensure_connection()
+
+        self.assertIs(wrapper.connection, first)
+        with wrapper.cursor() as cursor:
+            cursor.execute('SELECT 1')
+            self.assertEqual(cursor.fetchone(), (1,))
+        wrapper.close()
+
+
+class MetricsTest(APITestCase):
+    # this setup is re-run before each test
+    def setUp(self):
+        self.user = create_user(
+            username = 'johndoe',
+            email = 'johndoe@fakeuniversity.com',
+            first_name = 'John',
+            last_name = 'Doe',
+            password = PASS,
+        )
+
+        # prepare data for login
+        url = reverse('token_obtain_pair')
+        data = {
+            'username': self.user.username,
+            'password': PASS,
+        }
+        # log in user
+        response = self.client.post(url, data, format='json')
+        self.access_token = response.data['access']
+
+        # add access token to auth header
+        self.client.credentials(HTTP_AUTHORIZATION = 'Bearer ' + self.access_token)
+
+    def test_get_metrics(self):
+        self.user.is_staff = True
+        self.user.save()
+
+        response = self.client.get(reverse('metrics'), format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(set(response.data), {'database_pools', 'response_cache'})
+
+    def test_get_metrics_not_staff(self):
+        response = self.client.get(reverse('metrics'), format='json')
+
+        self.assertEqual(response.status_code, 403)
@@ -0,0 +1,171 @@
+from datetime import timedelta
+
+from asgiref.sync import async_to_sync, sync_to_async
+from asgiref.testing import ApplicationCommunicator
+from django.contrib.auth import get_user_model
+from rest_framework.reverse import reverse
+from rest_framework.test import APITransactionTestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+from .. import broker
+from ..broker import RedisBroker
+from ..events import request_event_application
+from ..models import Project, Request, RequestEvent
+
+USER_MODEL = get_user_model()
+PASS = 'password123!'
+
+
+def create_user(username, email, first_name, last_name, password):
+    try:
+        user = USER_MODEL.objects.create_user(username, email, first_name, last_name, password)
+    except IntegrityError:
+        user = USER_MODEL.objects.get(username=username)
+
+    return user
+
+
+# events are sent once their transaction commits, so these tests run outside of a transaction
+class RequestEventStreamTest(APITransactionTestCase):
+    # this setup is re-run before each test
+    def setUp(self):
+        # create the user to be authenticated and make calls to endpoints
+        self.user = create_user(
+            username = 'johndoe',
+            email = 'johndoe@fakeuniversity.com',
+            first_name = 'John',
+            last_name = 'Doe',
+            password = PASS,
+        )
+        # create the user that owns the project
+        self.other_user = create_user(
+            username = 'jeffdoe',
+            email = 'jeffdoe@fakeuniversity.com',
+            first_name = 'Jeff',
+            last_name = 'Doe',
+            password = PASS,
+        )
+        self.project = Project.objects.create(
+            title = 'Test Project 1',
+            description = 'Test project 1 description.',
+            category = 'ART',
+            owner = self.other_user,
+            owner_role = 'Test Owner Role',
+            desired_roles = ['Test Role']
+        )
+
+        # prepare data for login
+        url = reverse('token_obtain_pair')
+        data = {
+            'username': self.user.username,
+            'password': PASS,
+        }
+        # log in user
+        response = self.client.post(url, data, format='json')
+        self.access_token = response.data['access']
+
+        # add access token to auth header
+        self.client.credentials(HTTP_AUTHORIZATION = 'Bearer ' + self.access_token)
+
+    async def open_stream(self, headers=None):
+        """
+        Opens the event stream and returns the communicator along with the response start event.
+        """
+        communicator = ApplicationCommunicator(request_event_application, {
+            'type': 'http',
+            'method': 'GET',
+            'path': '/api/requests/events/',
+            'query_string': b'',
+            'headers': [(b'authorization', f'Bearer {self.access_token}'.encode()), *(headers or [])],
+        })
+
+        await communicator.send_input({'type': 'http.request', 'body': b'', 'more_body': False})
+
+        return communicator, await communicator.receive_output(timeout=5)
+
+    async def close_stream(self, communicator):
+        await communicator.send_input({'type': 'http.disconnect'})
+        await communicator.wait(timeout=5)
+
+    def test_stream_unauthenticated(self):
+        self.access_token = 'invalid'
+
+        _, start = async_to_sync(self.open_stream)()
+
+        self.assertEqual(start['status'], 401)
+
+    def test_stream_sends_created_request(self):
+        async def create_and_receive():
+            communicator, start = await self.open_stream()
+            response = await sync_to_async(self.client.post)(
+                reverse('request-list'),
+                {'requestee': self.other_user.pk, 'project': self.project.pk, 'role': 'Test Role'},
+                format='json',
+            )
+            body = await communicator.receive_output(timeout=5)
+            await self.close_stream(communicator)
+            return start, response, body
+
+        start, response, body = async_to_sync(create_and_receive)()
+        event = RequestEvent.objects.get(request=response.data['id'])
+
+        self.assertEqual(start['status'], 200)
+        self.assertIn((b'content-type', b'text/event-stream'), start['headers'])
+        self.assertEqual(
+            body['body'].decode().split('\n', 2)[:2],
+            [f'id: {event.id}', 'event: request.created'],
+        )
+
+    def test_stream_resumes_from_last_event_id(self):
+        # only one request between the users can be active at a time, so the first is declined before the second is sent
+        first_request = Request.objects.create(requester=self.other_user, requestee=self.user, project=self.project, role='Test Role')
+        first_event = first_request.events.create(event_type=RequestEvent.Type.CREATED)
+        first_request.decline()
+        second_request = Request.objects.create(requester=self.other_user, requestee=self.user, project=self.project, role='Test Role')
+        second_request.events.create(event_type=RequestEvent.Type.CREATED)
+
+        async def resume():
+            communicator, _ = await self.open_stream(headers=[(b'last-event-id', str(first_event.id).encode())])
+            bodies = [await communicator.receive_output(timeout=5) for _ in range(2)]
+            await self.close_stream(communicator)
+            return bodies
+
+        bodies = async_to_sync(resume)()
+
+        # the missed events are sent oldest first
+        self.assertEqual(
+            [body['body'].decode().split('\n')[1] for body in bodies],
+            ['event: request.declined', 'event: request.created'],
+        )
+
+    def test_stream_ends_when_token_expires(self):
+        token = AccessToken.for_user(self.user)
+        token.set_exp(lifetime=timedelta(seconds=1))
+        self.access_token = str(token)
+
+        async def wait_for_expiry():
+            communicator, start = await self.open_stream()
+            body = await communicator.receive_output(timeout=5)
+            await communicator.wait(timeout=5)
+            return start, body
+
+        start, body = async_to_sync(wait_for_expiry)()
+
+        self.assertEqual(start['status'], 200)
+        self.assertEqual(body['body'], b'event: token.expired\ndata: {}\n\n')
+        self.assertFalse(body['more_body'])
+
+    def test_request_is_created_when_broker_is_down(self):
+        # nothing listens on port 1, so publishing fails to connect
+        broker._broker, working_broker = RedisBroker('redis://127.0.0.1:1'), broker._broker
+        try:
+            response = self.client.post(
+                reverse('request-list'),
+                {'requestee': self.other_user.pk, 'project': self.project.pk, 'role': 'Test Role'},
+                format='json',
+            )
+        finally:
+            broker._broker = working_broker
+
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(RequestEvent.objects.filter(request=response.data['id']).exists())
@@ -1,14 +1,17 @@
 import json
 
 from django.contrib.auth import get_user_model
+from django.db import IntegrityError, connection, transaction
 from django.db.models import Q
+from django.test.utils import CaptureQueriesContext
 from rest_framework import status
 from rest_framework.reverse import reverse
-from rest_framework.test import APITestCase
+from rest_framework.test import APIRequestFactory, APITestCase
 
-from ..models import Membership, Project, Request
+from ..models import Membership, Project, Request, RequestEvent
 from ..serializers import (MembershipSerializer, ProjectSerializer,
-                           RequestSerializer, RequestUpdateSerializer)
+                           RequestBulkCreateSerializer, RequestSerializer,
+                           RequestUpdateSerializer)
 
 USER_MODEL = get_user_model()
 PASS = 'password123!'
@@ -385,6 +388,121 @@ class MembershipDetailViewTest(APITestCase):
         # make sure the membership has been deleted from the database
         self.assertRaises(Membership.DoesNotExist, Membership.objects.get, pk=self.membership_one.pk)
 
+class ProjectMembershipListViewTest(APITestCase):
+    # this setup is re-run before each test
+    def setUp(self):
+        self.user = create_user(
+            username = 'johndoe',
+            email = 'johndoe@fakeuniversity.com',
+            first_name = 'John',
+            last_name = 'Doe',
+            password = PASS,
+        )
+        self.other_user = create_user(
+            username = 'jeffdoe',
+            email = 'jeffdoe@fakeuniversity.com',
+            first_name = 'Jeff',
+            last_name = 'Doe',
+            password = PASS,
+        )
+        self.project_one = Project.objects.create(
+            title = 'Test Project 1',
+            description = 'Test project 1 description.',
+            category = 'ART',
+            owner = self.user,
+            owner_role = 'Test Owner Role',
+            desired_roles = [
+                'Test Role 1',
+                'Test Role 2'
+            ]
+        )
+        self.project_two = Project.objects.create(
+            title = 'Test Project 2',
+            description = 'Test project 2 description.',
+            category = 'ART',
+            owner = self.other_user,
+            owner_role = 'Test Owner Role',
+            desired_roles = [
+                'Test Role 1',
+                'Test Role 2'
+            ]
+        )
+        # a team of students for the requesting user's project
+        self.memberships = [
+            Membership.objects.create(
+                role = 'Test Role',
+                project = self.project_one,
+                user = create_user(f'student{number}', f'student{number}@fakeuniversity.com', 'Student', str(number), PASS)
+            )
+            for number in range(4)
+        ]
+        self.other_membership = Membership.objects.create(
+            role = 'Test Role',
+            project = self.project_two,
+            user = self.user
+        )
+
+        # prepare data for login
+        url = reverse('token_obtain_pair')
+        data = {
+            'username': self.user.username,
+            'password': PASS,
+        }
+        # log in user
+        response = self.client.post(url, data, format='json')
+
+        # add access token to auth header
+        self.client.credentials(HTTP_AUTHORIZATION = 'Bearer ' + response.data['access'])
+
+    def test_patch_project_memberships(self):
+        data = {
+            'changes': [
+                {'id': self.memberships[0].pk, 'role': 'New Role 1'},
+                {'id': self.memberships[1].pk, 'role': 'New Role 2'},
+            ],
+            'remove': [self.memberships[2].pk],
+        }
+
+        url = reverse('project-memberships-list', kwargs={'project_pk': self.project_one.pk})
+        response = self.client.patch(url, data, format='json')
+
+        roster = Membership.objects.filter(project=self.project_one).order_by('id')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, MembershipSerializer(roster, many=True).data)
+        self.assertEqual([membership.role for membership in roster], ['New Role 1', 'New Role 2', 'Test Role'])
+        self.assertFalse(Membership.objects.filter(pk=self.memberships[2].pk).exists())
+
+    def test_patch_project_memberships_not_project_owner(self):
+        data = {'remove': [self.other_membership.pk]}
+
+        url = reverse('project-memberships-list', kwargs={'project_pk': self.project_two.pk})
+        response = self.client.patch(url, data, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertTrue(Membership.objects.filter(pk=self.other_membership.pk).exists())
+
+    def test_patch_project_memberships_of_other_project(self):
+        # none of the changes are made when one of the memberships isn't of the project
+        data = {
+            'changes': [{'id': self.memberships[0].pk, 'role': 'New Role'}],
+            'remove': [self.other_membership.pk],
+        }
+
+        url = reverse('project-memberships-list', kwargs={'project_pk': self.project_one.pk})
+        response = self.client.patch(url, data, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Membership.objects.get(pk=self.memberships[0].pk).role, 'Test Role')
+        self.assertTrue(Membership.objects.filter(pk=self.other_membership.pk).exists())
+
+    def test_patch_project_memberships_invalid_project(self):
+        url = reverse('project-memberships-list', kwargs={'project_pk': 99999})
+        response = self.client.patch(url, {'remove': [self.memberships[0].pk]}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
 class RequestListViewTest(APITestCase):
     # this setup is re-run before each test
     def setUp(self):
@@ -786,6 +904,112 @@ class RequestListViewTest(APITestCase):
         self.assertEqual(response.data['project'], request_data['project'])
         self.assertEqual(response.data['role'], request_data['role'])
 
+    def test_bulk_create_requests(self):
+        invitations = [
+            {'requestee': self.other_user_three.pk, 'role': 'Test Role 1'},
+            # member of project_one
+            {'requestee': self.other_user_one.pk, 'role': 'Test Role 1'},
+            # already has an active request for project_one
+            {'requestee': self.other_user_two.pk, 'role': 'Test Role 1'},
+            {'requestee': self.user.pk, 'role': 'Test Role 1'},
+            {'requestee': 99999, 'role': 'Test Role 1'},
+            # already invited in this call
+            {'requestee': self.other_user_three.pk, 'role': 'Test Role 2'},
+        ]
+
+        url = reverse('request-bulk-create')
+        response = self.client.post(url, {'project': self.project_one.pk, 'invitations': invitations}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        new_request = Request.objects.get(requestee=self.other_user_three, project=self.project_one)
+        self.assertEqual(response.data['requests'], [RequestSerializer(new_request).data])
+        self.assertEqual(new_request.requester, self.user)
+        self.assertEqual(new_request.role, 'Test Role 1')
+        self.assertTrue(RequestEvent.objects.filter(request=new_request, event_type=RequestEvent.Type.CREATED).exists())
+
+        self.assertEqual([error['index'] for error in response.data['errors']], [1, 2, 3, 4, 5])
+        self.assertEqual(response.data['errors'][0]['errors'], ['Member already exists'])
+
+    def test_bulk_create_requests_with_request_sent_in_the_meantime(self):
+        student = create_user('student', 'student@fakeuniversity.com', 'Student', 'Doe', PASS)
+        invitations = [
+            {'requestee': self.other_user_three.pk, 'role': 'Test Role'},
+            {'requestee': student.pk, 'role': 'Test Role'},
+        ]
+
+        request = APIRequestFactory().post(reverse('request-bulk-create'))
+        request.user = self.user
+        serializer = RequestBulkCreateSerializer(
+            data={'project': self.project_one.pk, 'invitations': invitations}, context={'request': request}
+        )
+        self.assertTrue(serializer.is_valid())
+
+        # the second student sends a request to the owner after the invitations were validated
+        Request.objects.create(requester=student, requestee=self.user, project=self.project_one, role='Test Role')
+
+        result = serializer.save()
+
+        self.assertEqual([new_request.requestee for new_request in result['requests']], [self.other_user_three])
+        self.assertEqual(result['errors'], [{'index': 1, 'requestee': student.pk, 'errors': [RequestSerializer.ACTIVE_REQUEST_ERROR]}])
+
+    def test_bulk_create_requests_not_project_owner(self):
+        initial_request_count = Request.objects.count()
+
+        invitations = [{'requestee': self.other_user_three.pk, 'role': 'Test Role'}]
+
+        url = reverse('request-bulk-create')
+        response = self.client.post(url, {'project': self.project_two.pk, 'invitations': invitations}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Request.objects.count(), initial_request_count)
+
+    def test_bulk_create_requests_none_valid(self):
+        invitations = [{'requestee': self.other_user_one.pk, 'role': 'Test Role'}]
+
+        url = reverse('request-bulk-create')
+        response = self.client.post(url, {'project': self.project_one.pk, 'invitations': invitations}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['requests'], [])
+        self.assertEqual(len(response.data['errors']), 1)
+
+    def test_bulk_create_requests_query_count_is_constant(self):
+        students = [
+            create_user(f'student{number}', f'student{number}@fakeuniversity.com', 'Student', str(number), PASS)
+            for number in range(10)
+        ]
+        url = reverse('request-bulk-create')
+
+        def count_queries(invitees):
+            invitations = [{'requestee': student.pk, 'role': 'Test Role'} for student in invitees]
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.post(url, {'project': self.project_one.pk, 'invitations': invitations}, format='json')
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+            return len(queries)
+
+        self.assertEqual(count_queries(students[:1]), count_queries(students[1:]))
+
+    def test_active_request_between_same_users_rejected_by_database(self):
+        # a request in the opposite direction to request_one, as if it was created by a concurrent call
+        with self.assertRaises(IntegrityError):
+            with transaction.atomic():
+                Request.objects.create(
+                    requester = self.other_user_two,
+                    requestee = self.user,
+                    project = self.project_one,
+                    role = 'Test Role'
+                )
+
+        # inactive requests between the same users are still allowed
+        Request.objects.create(
+            requester = self.other_user_two,
+            requestee = self.user,
+            project = self.project_one,
+            role = 'Test Role',
+            is_active = False
+        )
+
 
 class RequestDetailViewTest(APITestCase):
     # this setup is re-run before each test
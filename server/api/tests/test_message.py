@@ -171,6 +171,38 @@ class PrivateMessageListViewTest(APITestCase):
         # data sent in the response should match the data stored in the database
         self.assertEqual(response.data, test_project_three_private_message_data)
 
+    def test_get_private_message_list_after_id(self):
+        new_message = PrivateMessage.objects.create(user=self.user, project=self.test_project_one, message='Test message 2')
+
+        # only the messages posted after the first one are fetched
+        url = reverse('project-private-messages-list', kwargs={'project_pk': self.test_project_one.pk})
+        response = self.client.get(f'{url}?after_id={self.test_project_one_private_message_one.pk}')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([message['id'] for message in response.data], [new_message.pk])
+
+    def test_get_private_message_list_not_modified(self):
+        url = reverse('project-private-messages-list', kwargs={'project_pk': self.test_project_one.pk})
+        etag = self.client.get(url)['ETag']
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        # a new message changes the ETag
+        PrivateMessage.objects.create(user=self.user, project=self.test_project_one, message='Test message 2')
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 2)
+
+    def test_get_private_message_list_unauthorized_has_no_etag(self):
+        url = reverse('project-private-messages-list', kwargs={'project_pk': self.test_project_two.pk})
+        response = self.client.get(url, HTTP_IF_NONE_MATCH='*')
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertFalse(response.has_header('ETag'))
+
     def test_create_private_message_unauthenticated(self):
         # forcefully unauthenticate the requesting user
         self.client.force_authenticate(user=None)
@@ -643,6 +675,67 @@ class PublicMessageListViewTest(APITestCase):
         # data sent in the response should match the data stored in the database
         self.assertEqual(response.data, test_project_two_public_message_data)
 
+    def test_get_public_message_list_after_id(self):
+        new_messages = [
+            PublicMessage.objects.create(user=self.user, project=self.test_project_two, message=f'Test message {number}')
+            for number in (2, 3)
+        ]
+
+        # only the messages posted after the first one are fetched
+        url = reverse('project-public-messages-list', kwargs={'project_pk': self.test_project_two.pk})
+        response = self.client.get(f'{url}?after_id={self.test_project_two_public_message_one.pk}')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([message['id'] for message in response.data], [message.pk for message in new_messages])
+
+        # nothing new after the latest message
+        response = self.client.get(f'{url}?after_id={new_messages[-1].pk}')
+
+        self.assertEqual(response.data, [])
+
+    def test_get_public_message_list_after_deleted_id(self):
+        new_message = PublicMessage.objects.create(user=self.user, project=self.test_project_two, message='Test message 2')
+        deleted_pk = self.test_project_two_public_message_one.pk
+        self.test_project_two_public_message_one.delete()
+
+        # syncing carries on from a message that was deleted since
+        url = reverse('project-public-messages-list', kwargs={'project_pk': self.test_project_two.pk})
+        response = self.client.get(f'{url}?after_id={deleted_pk}')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([message['id'] for message in response.data], [new_message.pk])
+
+    def test_get_public_message_list_since(self):
+        since = self.test_project_two_public_message_one.date_created
+        new_message = PublicMessage.objects.create(user=self.user, project=self.test_project_two, message='Test message 2')
+
+        url = reverse('project-public-messages-list', kwargs={'project_pk': self.test_project_two.pk})
+        response = self.client.get(url, {'since': since.isoformat()})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([message['id'] for message in response.data], [new_message.pk])
+
+    def test_get_public_message_list_with_invalid_sync_query(self):
+        url = reverse('project-public-messages-list', kwargs={'project_pk': self.test_project_two.pk})
+
+        for query in ('after_id=latest', 'since=yesterday'):
+            response = self.client.get(f'{url}?{query}')
+
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_get_public_message_list_not_modified(self):
+        url = reverse('project-public-messages-list', kwargs={'project_pk': self.test_project_two.pk})
+        etag = self.client.get(url)['ETag']
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        # each page has its own ETag
+        response = self.client.get(f'{url}?page_size=1', HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
     def test_create_public_message_unauthenticated(self):
         # forcefully unauthenticate the requesting user
         self.client.force_authenticate(user=None)
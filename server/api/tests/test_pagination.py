@@ -0,0 +1,144 @@
+import re
+
+from django.contrib.auth import get_user_model
+from django.test import override_settings
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APITestCase
+
+from ..models import Project, PublicMessage
+
+USER_MODEL = get_user_model()
+PASS = 'password123!'
+
+
+def create_user(username, email, first_name, last_name, password):
+    try:
+        user = USER_MODEL.objects.create_user(username, email, first_name, last_name, password)
+    except IntegrityError:
+        user = USER_MODEL.objects.get(username=username)
+
+    return user
+
+
+def get_link(response, rel):
+    """
+    Returns the url with the given relation from the Link header of a response, or None.
+    """
+    match = re.search(f'<([^>]+)>; rel="{rel}"', response.get('Link', ''))
+
+    return match.group(1) if match else None
+
+
+class KeysetPaginationTest(APITestCase):
+    # this setup is re-run before each test
+    def setUp(self):
+        self.user = create_user(
+            username = 'johndoe',
+            email = 'johndoe@fakeuniversity.com',
+            first_name = 'John',
+            last_name = 'Doe',
+            password = PASS,
+        )
+        self.projects = [
+            Project.objects.create(
+                title = f'Test Project {i}',
+                description = f'Test project {i} description.',
+                category = 'ART',
+                owner = self.user,
+                owner_role = 'Test Owner Role',
+                desired_roles = []
+            )
+            for i in range(5)
+        ]
+
+        # prepare data for login
+        url = reverse('token_obtain_pair')
+        data = {
+            'username': self.user.username,
+            'password': PASS,
+        }
+        # log in user
+        response = self.client.post(url, data, format='json')
+
+        # add access token to auth header
+        self.client.credentials(HTTP_AUTHORIZATION = 'Bearer ' + response.data['access'])
+
+    def test_get_project_list_first_page(self):
+        url = f'{reverse("project-list")}?page_size=2'
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([project['id'] for project in response.data], [project.id for project in self.projects[:2]])
+        self.assertIsNotNone(get_link(response, 'next'))
+        self.assertIsNone(get_link(response, 'prev'))
+
+    def test_get_project_list_following_next_links(self):
+        url = f'{reverse("project-list")}?page_size=2'
+        project_ids = []
+
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            project_ids += [project['id'] for project in response.data]
+            url = get_link(response, 'next')
+
+        self.assertEqual(project_ids, [project.id for project in self.projects])
+
+    def test_get_project_list_following_prev_link(self):
+        # go to the second page, then back to the first
+        response = self.client.get(f'{reverse("project-list")}?page_size=2')
+        response = self.client.get(get_link(response, 'next'))
+
+        self.assertEqual([project['id'] for project in response.data], [project.id for project in self.projects[2:4]])
+
+        response = self.client.get(get_link(response, 'prev'))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([project['id'] for project in response.data], [project.id for project in self.projects[:2]])
+
+    def test_get_project_list_descending_pages(self):
+        url = f'{reverse("project-list")}?order=descending&page_size=3'
+        response = self.client.get(url)
+        response = self.client.get(get_link(response, 'next'))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([project['id'] for project in response.data], [self.projects[1].id, self.projects[0].id])
+        self.assertIsNone(get_link(response, 'next'))
+
+    @override_settings(API_PAGE_SIZE=2)
+    def test_get_project_list_without_page_params_uses_default_page_size(self):
+        response = self.client.get(reverse('project-list'))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([project['id'] for project in response.data], [project.id for project in self.projects[:2]])
+        self.assertIsNotNone(get_link(response, 'next'))
+
+    def test_get_project_list_with_invalid_cursor(self):
+        url = f'{reverse("project-list")}?cursor=invalid'
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    @override_settings(API_MAX_PAGE_SIZE=3)
+    def test_get_project_list_page_size_is_capped(self):
+        url = f'{reverse("project-list")}?page_size=100'
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 3)
+
+    def test_get_public_message_list_pages(self):
+        project = self.projects[0]
+        messages = [
+            PublicMessage.objects.create(user=self.user, project=project, message=f'Message {i}')
+            for i in range(3)
+        ]
+
+        url = f'{reverse("project-public-messages-list", args=[project.id])}?page_size=2'
+        response = self.client.get(url)
+        next_response = self.client.get(get_link(response, 'next'))
+
+        self.assertEqual([message['id'] for message in response.data], [message.id for message in messages[:2]])
+        self.assertEqual([message['id'] for message in next_response.data], [messages[2].id])
+        self.assertIsNone(get_link(next_response, 'next'))
@@ -102,7 +102,68 @@ class AccountListViewTest(APITestCase):
         self.assertEqual(len(response.data), 1)
         self.assertEqual(response.data[0]['username'], self.user.username)
 
-    
+    def test_get_account_list_with_roles_query(self):
+        jane = USER_MODEL.objects.get(username='janedoe')
+        jane.profile.set_roles(['Software Engineer'])
+        jane.profile.save()
+        self.user.profile.set_roles(['Software Engineer', 'Project Manager'])
+        self.user.profile.save()
+
+        url = f'{reverse("account-list")}?roles_any=software%20engineer,Designer'
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([account['username'] for account in response.data], ['janedoe', self.user.username])
+
+        url = f'{reverse("account-list")}?roles_all=Software%20Engineer,Project%20Manager'
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([account['username'] for account in response.data], [self.user.username])
+
+    def test_get_account_list_with_misspelled_search_query(self):
+        # update user profile with new roles
+        new_data = {
+            'profile': {
+                'programme': 'BSc Economics',
+                'roles': [
+                    'Software Engineer',
+                ]
+            }
+        }
+
+        url = reverse('account-detail', kwargs={'pk': self.user.pk})
+        self.client.patch(url, new_data, format='json')
+
+        # search for accounts by a misspelled role and a misspelled programme
+        for query in ('enginer', 'economiks'):
+            url = f'{reverse("account-list")}?search={query}'
+            response = self.client.get(url)
+
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(len(response.data), 1)
+            self.assertEqual(response.data[0]['username'], self.user.username)
+
+    def test_get_account_list_with_name_search_query_ordered_by_similarity(self):
+        # 'jeff' is an exact match for Jeff, so Jeff comes first
+        url = f'{reverse("account-list")}?search=jeff'
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data[0]['username'], 'jeffdoe')
+
+    def test_get_account_list_search_text_is_updated_when_name_changes(self):
+        self.user.first_name = 'Jonathan'
+        self.user.save()
+
+        url = f'{reverse("account-list")}?search=jonathan'
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 1)
+        self.assertEqual(response.data[0]['username'], self.user.username)
+
+
 class AccountDetailViewTest(APITestCase):
     # this setup is re-run before each test
     def setUp(self):
@@ -169,6 +230,25 @@ class AccountDetailViewTest(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data, other_user_data)
 
+    def test_get_account_detail_not_modified(self):
+        url = reverse('account-detail', kwargs={'pk': self.other_user.pk})
+        etag = self.client.get(url)['ETag']
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_get_account_detail_etag_changes_when_name_changes(self):
+        url = reverse('account-detail', kwargs={'pk': self.other_user.pk})
+        etag = self.client.get(url)['ETag']
+
+        self.other_user.first_name = 'Jeffrey'
+        self.other_user.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['first_name'], 'Jeffrey')
+
     def test_update_account_detail_unauthenticated(self):
         # forcefully unauthenticate the user
         self.client.force_authenticate(user=None)
@@ -1,13 +1,15 @@
 import json
 import time
+from io import StringIO
 
 from django.contrib.auth import get_user_model
+from django.core.management import call_command
 from django.db.models import Q
 from rest_framework import status
 from rest_framework.reverse import reverse
 from rest_framework.test import APITestCase
 
-from ..models import Project, Follow, Membership
+from ..models import Project, Follow, Membership, Request, Role
 from ..serializers import ProjectSerializer, FollowSerializer
 
 USER_MODEL = get_user_model()
@@ -99,6 +101,33 @@ class ProjectListViewTest(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data, projects_data)
 
+    def test_get_project_list_query_count_is_constant(self):
+        # create more projects, each with a team member, to check the number of queries doesn't grow with them
+        for i in range(10):
+            project = Project.objects.create(
+                title = f'Extra Project {i}',
+                description = 'Extra project description.',
+                category = 'ART',
+                owner = self.other_user,
+                owner_role = 'Test Owner Role',
+                desired_roles = []
+            )
+            Membership.objects.create(
+                role = 'Test Role',
+                project = project,
+                user = self.user
+            )
+
+        url = reverse('project-list')
+
+        # 1 query for authenticating the user, 1 for the projects and their owners, 1 for the team members
+        with self.assertNumQueries(3):
+            response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 12)
+        self.assertEqual(response.data[-1]['team_members'][0]['user_first_name'], self.user.first_name)
+
     def test_get_project_list_with_search_query(self):
         # get a list of projects that have an 'engineer' substring in their desired roles
         url = f'{reverse("project-list")}?search=engineer'
@@ -108,6 +137,45 @@ class ProjectListViewTest(APITestCase):
         self.assertEqual(len(response.data), 1)
         self.assertEqual(response.data[0]['title'], self.test_project_one.title)
 
+    def test_get_project_list_with_partial_word_search_query(self):
+        # partially typed words are matched as prefixes
+        url = f'{reverse("project-list")}?search=analy'
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 1)
+        self.assertEqual(response.data[0]['title'], self.test_project_one.title)
+
+    def test_get_project_list_with_search_query_ordered_by_relevance(self):
+        # a project with the search term in its title, which weighs more than the roles
+        test_project_three = Project.objects.create(
+            title = 'Director Wanted',
+            description = 'Test project 3 description.',
+            category = 'FLM',
+            owner = self.other_user,
+            owner_role = 'Test Owner Role',
+            desired_roles = []
+        )
+
+        url = f'{reverse("project-list")}?search=director'
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 2)
+        self.assertEqual(response.data[0]['title'], test_project_three.title)
+        self.assertEqual(response.data[1]['title'], self.test_project_two.title)
+
+    def test_get_project_list_search_vector_is_updated(self):
+        self.test_project_one.title = 'Renamed Project'
+        self.test_project_one.save()
+
+        url = f'{reverse("project-list")}?search=renamed'
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 1)
+        self.assertEqual(response.data[0]['id'], self.test_project_one.id)
+
     def test_get_project_list_with_relation_is_active_query(self):
         # create another project not owned by authenticated user
         test_project_three = Project.objects.create(
@@ -221,6 +289,72 @@ class ProjectListViewTest(APITestCase):
         self.assertEqual(len(response.data), 1)
         self.assertEqual(response.data[0]['title'], self.test_project_one.title)
 
+    def test_get_project_list_with_roles_any_query(self):
+        # roles are matched case-insensitively, and roles that don't exist match nothing
+        url = f'{reverse("project-list")}?roles_any=director,Data%20Analyst,Unknown%20Role'
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 2)
+
+    def test_get_project_list_with_roles_all_query(self):
+        url = f'{reverse("project-list")}?roles_all=Software%20Engineer,data%20analyst'
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 1)
+        self.assertEqual(response.data[0]['title'], self.test_project_one.title)
+
+        # no project wants a role that doesn't exist
+        url = f'{reverse("project-list")}?roles_all=Software%20Engineer,Unknown%20Role'
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 0)
+
+    def test_get_project_list_with_role_alias_query(self):
+        Role.objects.filter(key='director').update(aliases=['film director'])
+
+        url = f'{reverse("project-list")}?roles_any=Film%20Director'
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 1)
+        self.assertEqual(response.data[0]['title'], self.test_project_two.title)
+
+    def test_get_project_list_with_category_owner_and_created_after_query(self):
+        test_project_three = Project.objects.create(
+            title = 'Test Project 3',
+            description = 'Test project 3 description.',
+            category = 'SFW',
+            owner = self.other_user,
+            owner_role = 'Test Owner Role',
+            desired_roles = ['Software Engineer']
+        )
+        created_after = self.test_project_one.date_created.strftime('%Y-%m-%dT%H:%M:%S.%fZ')
+
+        url = f'{reverse("project-list")}?category=ART,SFW&owner={self.other_user.pk}&created_after={created_after}'
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [project['title'] for project in response.data],
+            [self.test_project_two.title, test_project_three.title]
+        )
+
+        url = f'{reverse("project-list")}?category=SFW&roles_any=Software%20Engineer'
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([project['title'] for project in response.data], [test_project_three.title])
+
+    def test_get_project_list_with_invalid_filter_query(self):
+        for query in ('category=XYZ', 'owner=me', 'created_after=yesterday'):
+            url = f'{reverse("project-list")}?{query}'
+            response = self.client.get(url)
+
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
     def test_create_project_unauthenticated(self):
         # forcefully unauthenticate the requesting user
         self.client.force_authenticate(user=None)
@@ -394,6 +528,85 @@ class ProjectDetailViewTest(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data, project_data)
 
+    def test_get_project_detail_with_viewer_as_project_owner(self):
+        url = f'{reverse("project-detail", kwargs={"project_pk": self.project_one.pk})}?include=viewer'
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['viewer'], {
+            'is_owner': True,
+            'membership_id': None,
+            'follow_id': None,
+            'active_request_id': None,
+        })
+
+    def test_get_project_detail_with_viewer_as_member_and_follower(self):
+        membership = Membership.objects.create(role='Test Role', project=self.project_two, user=self.user)
+        follow = Follow.objects.create(user=self.user, project=self.project_two)
+        # inactive requests are not included
+        Request.objects.create(
+            requester=self.user, requestee=self.other_user, project=self.project_two, role='Test Role', is_active=False
+        )
+
+        url = f'{reverse("project-detail", kwargs={"project_pk": self.project_two.pk})}?include=viewer'
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['viewer'], {
+            'is_owner': False,
+            'membership_id': membership.id,
+            'follow_id': follow.id,
+            'active_request_id': None,
+        })
+
+    def test_get_project_detail_with_viewer_with_active_request(self):
+        project_request = Request.objects.create(
+            requester=self.other_user, requestee=self.user, project=self.project_two, role='Test Role'
+        )
+
+        url = f'{reverse("project-detail", kwargs={"project_pk": self.project_two.pk})}?include=viewer'
+
+        # 1 query for authenticating the user, 1 for the ETag,
+        # 1 for the project and the viewer's relations, 1 for the team members
+        with self.assertNumQueries(4):
+            response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['viewer']['active_request_id'], project_request.id)
+
+    def test_get_project_detail_not_modified(self):
+        url = reverse('project-detail', kwargs={'project_pk': self.project_one.pk})
+        response = self.client.get(url)
+        etag = response['ETag']
+
+        # 1 query for authenticating the user, 1 for the ETag, and the project isn't fetched
+        with self.assertNumQueries(2):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response['ETag'], etag)
+
+    def test_get_project_detail_etag_changes_when_project_changes(self):
+        url = reverse('project-detail', kwargs={'project_pk': self.project_one.pk})
+        etag = self.client.get(url)['ETag']
+
+        Membership.objects.create(role='Test Role', project=self.project_one, user=self.other_user)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(len(response.data['team_members']), 1)
+
+    def test_get_project_detail_etag_changes_with_viewer_relations(self):
+        url = f'{reverse("project-detail", kwargs={"project_pk": self.project_two.pk})}?include=viewer'
+        etag = self.client.get(url)['ETag']
+
+        Request.objects.create(requester=self.other_user, requestee=self.user, project=self.project_two, role='Test Role')
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIsNotNone(response.data['viewer']['active_request_id'])
+
     def test_update_project_detail_unauthenticated(self):
         # forcefully unauthenticate the user
         self.client.force_authenticate(user=None)
@@ -717,6 +930,26 @@ class FollowListViewTest(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
         self.assertEqual(Follow.objects.filter(Q(user=self.user)).count(), initial_follow_count + 1)
 
+    def test_create_follow_increments_project_follower_count(self):
+        initial_follower_count = Project.objects.get(pk=self.project_five.pk).follower_count
+
+        url = reverse('follow-list')
+        response = self.client.post(url, {'project': self.project_five.pk}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Project.objects.get(pk=self.project_five.pk).follower_count, initial_follower_count + 1)
+
+    def test_create_follow_already_following(self):
+        initial_follower_count = Project.objects.get(pk=self.project_two.pk).follower_count
+
+        url = reverse('follow-list')
+        response = self.client.post(url, {'project': self.project_two.pk}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('non_field_errors', response.data)
+        self.assertEqual(Follow.objects.filter(Q(user=self.user) & Q(project=self.project_two)).count(), 1)
+        self.assertEqual(Project.objects.get(pk=self.project_two.pk).follower_count, initial_follower_count)
+
 class FollowDetailViewTest(APITestCase):
     # this setup is re-run before each test
     def setUp(self):
@@ -893,4 +1126,42 @@ class FollowDetailViewTest(APITestCase):
         # make sure the follow instance has been deleted from the database
         self.assertRaises(Follow.DoesNotExist, Follow.objects.get, pk=self.follow_one.pk)
 
+    def test_delete_follow_detail_decrements_project_follower_count(self):
+        project = self.follow_one.project
+        initial_follower_count = Project.objects.get(pk=project.pk).follower_count
+
+        url = reverse('follow-detail', kwargs={'follow_pk': self.follow_one.pk})
+        response = self.client.delete(url)
+
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(Project.objects.get(pk=project.pk).follower_count, initial_follower_count - 1)
+
+
+class ReconcileFollowerCountsCommandTest(APITestCase):
+    def setUp(self):
+        self.user = create_user(
+            username = 'johndoe',
+            email = 'johndoe@fakeuniversity.com',
+            first_name = 'John',
+            last_name = 'Doe',
+            password = PASS,
+        )
+        self.project = Project.objects.create(
+            title = 'Test Project 1',
+            description = 'Test project 1 description.',
+            category = 'ART',
+            owner = self.user,
+            owner_role = 'Test Owner Role',
+            desired_roles = []
+        )
+        Follow.objects.create(user=self.user, project=self.project)
+
+    def test_reconcile_follower_counts(self):
+        # make the follower count drift, as bulk updates don't send signals
+        Project.objects.filter(pk=self.project.pk).update(follower_count=7)
+
+        call_command('reconcile_follower_counts', stdout=StringIO())
+
+        self.assertEqual(Project.objects.get(pk=self.project.pk).follower_count, 1)
+
 
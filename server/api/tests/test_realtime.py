@@ -0,0 +1,215 @@
+import asyncio
+from datetime import timedelta
+
+from asgiref.sync import async_to_sync, sync_to_async
+from asgiref.testing import ApplicationCommunicator
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, override_settings
+from rest_framework.reverse import reverse
+from rest_framework.test import APITransactionTestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+from .. import broker
+from ..broker import RedisBroker
+from ..models import Membership, Project
+from ..realtime import discussion_application
+from .redis_stand_in import start_redis_stand_in
+
+USER_MODEL = get_user_model()
+PASS = 'password123!'
+
+
+def create_user(username, email, first_name, last_name, password):
+    try:
+        user = USER_MODEL.objects.create_user(username, email, first_name, last_name, password)
+    except IntegrityError:
+        user = USER_MODEL.objects.get(username=username)
+
+    return user
+
+
+# messages are pushed once their transaction commits, so these tests run outside of a transaction
+class DiscussionSocketTest(APITransactionTestCase):
+    # this setup is re-run before each test
+    def setUp(self):
+        self.user = create_user(
+            username = 'johndoe',
+            email = 'johndoe@fakeuniversity.com',
+            first_name = 'John',
+            last_name = 'Doe',
+            password = PASS,
+        )
+        self.other_user = create_user(
+            username = 'jeffdoe',
+            email = 'jeffdoe@fakeuniversity.com',
+            first_name = 'Jeff',
+            last_name = 'Doe',
+            password = PASS,
+        )
+
+        # a project owned by the other user, which the authenticated user is a member of
+        self.project = Project.objects.create(
+            title = 'Test Project 1',
+            description = 'Test project 1 description.',
+            category = 'ART',
+            owner = self.other_user,
+            owner_role = 'Test Owner Role',
+            desired_roles = []
+        )
+        Membership.objects.create(role='Test Role', project=self.project, user=self.user)
+
+        # a project the authenticated user has nothing to do with
+        self.other_project = Project.objects.create(
+            title = 'Test Project 2',
+            description = 'Test project 2 description.',
+            category = 'ART',
+            owner = self.other_user,
+            owner_role = 'Test Owner Role',
+            desired_roles = []
+        )
+
+        # prepare data for login
+        url = reverse('token_obtain_pair')
+        data = {
+            'username': self.user.username,
+            'password': PASS,
+        }
+        # log in user
+        response = self.client.post(url, data, format='json')
+        self.access_token = response.data['access']
+
+        # add access token to auth header
+        self.client.credentials(HTTP_AUTHORIZATION = 'Bearer ' + self.access_token)
+
+    async def connect(self, path, token=None):
+        """
+        Opens a WebSocket connection to the discussion application and returns the communicator
+        along with the first event sent back (accept or close).
+        """
+        token = self.access_token if token is None else token
+        communicator = ApplicationCommunicator(discussion_application, {
+            'type': 'websocket',
+            'path': path,
+            'query_string': f'token={token}'.encode(),
+        })
+
+        await communicator.send_input({'type': 'websocket.connect'})
+
+        return communicator, await communicator.receive_output(timeout=5)
+
+    async def post_and_receive(self, path, url, message):
+        """
+        Connects to a discussion, posts a message through the API, and returns the API response
+        along with the events sent to the WebSocket.
+        """
+        communicator, accept = await self.connect(path)
+        response = await sync_to_async(self.client.post)(url, {'message': message}, format='json')
+        pushed = await communicator.receive_output(timeout=5)
+
+        await communicator.send_input({'type': 'websocket.disconnect', 'code': 1000})
+        await communicator.wait(timeout=5)
+
+        return response, accept, pushed
+
+    def test_connect_unauthenticated(self):
+        _, event = async_to_sync(self.connect)(f'/ws/projects/{self.project.pk}/public-messages/', token='invalid')
+
+        self.assertEqual(event, {'type': 'websocket.close', 'code': 4401})
+
+    def test_connect_with_invalid_project_pk(self):
+        _, event = async_to_sync(self.connect)('/ws/projects/2500/public-messages/')
+
+        self.assertEqual(event, {'type': 'websocket.close', 'code': 4404})
+
+    def test_connect_to_private_discussion_unauthorized(self):
+        _, event = async_to_sync(self.connect)(f'/ws/projects/{self.other_project.pk}/private-messages/')
+
+        self.assertEqual(event, {'type': 'websocket.close', 'code': 4403})
+
+    def test_public_message_is_pushed(self):
+        response, accept, pushed = async_to_sync(self.post_and_receive)(
+            f'/ws/projects/{self.other_project.pk}/public-messages/',
+            reverse('project-public-messages-list', kwargs={'project_pk': self.other_project.pk}),
+            'Hi everyone!',
+        )
+
+        self.assertEqual(accept, {'type': 'websocket.accept'})
+        self.assertEqual(pushed['type'], 'websocket.send')
+        self.assertJSONEqual(pushed['text'], {'type': 'message.created', 'message': response.data})
+
+    def test_private_message_is_pushed_to_members(self):
+        response, accept, pushed = async_to_sync(self.post_and_receive)(
+            f'/ws/projects/{self.project.pk}/private-messages/',
+            reverse('project-private-messages-list', kwargs={'project_pk': self.project.pk}),
+            'Hi team!',
+        )
+
+        self.assertEqual(accept, {'type': 'websocket.accept'})
+        self.assertJSONEqual(pushed['text'], {'type': 'message.created', 'message': response.data})
+
+    @override_settings(REALTIME_ACCESS_CHECK_INTERVAL=1)
+    def test_removed_member_is_disconnected(self):
+        async def connect_and_remove():
+            communicator, accept = await self.connect(f'/ws/projects/{self.project.pk}/private-messages/')
+            await sync_to_async(Membership.objects.filter(project=self.project, user=self.user).delete)()
+            closed = await communicator.receive_output(timeout=5)
+            await communicator.wait(timeout=5)
+            return accept, closed
+
+        accept, closed = async_to_sync(connect_and_remove)()
+
+        self.assertEqual(accept, {'type': 'websocket.accept'})
+        self.assertEqual(closed, {'type': 'websocket.close', 'code': 4403})
+
+    def test_expired_token_is_disconnected(self):
+        token = AccessToken.for_user(self.user)
+        token.set_exp(lifetime=timedelta(seconds=1))
+
+        async def connect_and_wait():
+            communicator, accept = await self.connect(f'/ws/projects/{self.project.pk}/public-messages/', token=str(token))
+            closed = await communicator.receive_output(timeout=5)
+            await communicator.wait(timeout=5)
+            return accept, closed
+
+        accept, closed = async_to_sync(connect_and_wait)()
+
+        self.assertEqual(accept, {'type': 'websocket.accept'})
+        self.assertEqual(closed, {'type': 'websocket.close', 'code': 4403})
+
+    def test_message_is_saved_when_broker_is_down(self):
+        # nothing listens on port 1, so publishing fails to connect
+        broker._broker, working_broker = RedisBroker('redis://127.0.0.1:1'), broker._broker
+        try:
+            url = reverse('project-public-messages-list', kwargs={'project_pk': self.project.pk})
+            response = self.client.post(url, {'message': 'Hi everyone!'}, format='json')
+        finally:
+            broker._broker = working_broker
+
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(self.project.public_messages.filter(message='Hi everyone!').exists())
+
+
+class RedisBrokerTest(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = start_redis_stand_in()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def test_publish_and_subscribe(self):
+        host, port = self.server.server_address
+        broker = RedisBroker(f'redis://{host}:{port}')
+
+        async def subscribe_and_receive():
+            subscription = await broker.subscribe('project.1.public-messages')
+            await sync_to_async(broker.publish)('project.1.public-messages', {'type': 'message.created'})
+            message = await asyncio.wait_for(subscription.get(), timeout=5)
+            await subscription.close()
+            return message
+
+        self.assertEqual(async_to_sync(subscribe_and_receive)(), {'type': 'message.created'})
@@ -0,0 +1,308 @@
+import threading
+
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APITestCase
+
+from ..models import Follow, Membership, Project, Request
+from ..recommendations import (ProjectSimilarityIndex, StudentRoleIndex,
+                               project_similarity_index, student_role_index)
+
+USER_MODEL = get_user_model()
+PASS = 'password123!'
+
+
+def create_user(username, email, first_name, last_name, password):
+    try:
+        user = USER_MODEL.objects.create_user(username, email, first_name, last_name, password)
+    except IntegrityError:
+        user = USER_MODEL.objects.get(username=username)
+
+    return user
+
+
+def create_student(username, roles, programme=''):
+    student = create_user(username, f'{username}@fakeuniversity.com', username.capitalize(), 'Doe', PASS)
+    student.profile.set_roles(roles)
+    student.profile.set_programme(programme)
+    student.profile.save()
+
+    return student
+
+
+class ProjectStudentRecommendationsViewTest(APITestCase):
+    # this setup is re-run before each test
+    def setUp(self):
+        # the index lives in memory, so make sure nothing is left over from other tests
+        student_role_index.clear()
+
+        self.user = create_student('johndoe', ['Project Manager'], 'BSc Computer Science')
+        self.other_user = create_student('jeffdoe', [], '')
+
+        self.project = Project.objects.create(
+            title = 'Test Project 1',
+            description = 'Test project 1 description.',
+            category = 'SFW',
+            owner = self.user,
+            owner_role = 'Project Manager',
+            desired_roles = [
+                'Software Engineer',
+                'Designer'
+            ]
+        )
+
+        # lists both desired roles
+        self.both_roles = create_student('alice', ['software engineer', 'Designer'])
+        # lists one of them and is on the owner's programme
+        self.same_programme = create_student('bob', ['Designer'], 'BSc Computer Science')
+        # lists one of them
+        self.one_role = create_student('carol', ['Software Engineer'])
+        # lists none of them
+        self.no_roles = create_student('dave', ['Accountant'])
+        # already a member
+        self.member = create_student('erin', ['Software Engineer', 'Designer'])
+        Membership.objects.create(role='Designer', project=self.project, user=self.member)
+        # already invited
+        self.invited = create_student('frank', ['Software Engineer', 'Designer'])
+        Request.objects.create(requester=self.user, requestee=self.invited, project=self.project, role='Designer')
+
+        # prepare data for login
+        url = reverse('token_obtain_pair')
+        data = {
+            'username': self.user.username,
+            'password': PASS,
+        }
+        # log in user
+        response = self.client.post(url, data, format='json')
+
+        # add access token to auth header
+        self.client.credentials(HTTP_AUTHORIZATION = 'Bearer ' + response.data['access'])
+
+    def test_get_recommended_students_unauthenticated(self):
+        # forcefully unauthenticate the requesting user
+        self.client.force_authenticate(user=None)
+
+        url = reverse('project-recommended-students', kwargs={'project_pk': self.project.pk})
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_get_recommended_students_not_owner_or_member(self):
+        self.client.force_authenticate(user=self.other_user)
+
+        url = reverse('project-recommended-students', kwargs={'project_pk': self.project.pk})
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_get_recommended_students(self):
+        url = reverse('project-recommended-students', kwargs={'project_pk': self.project.pk})
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [result['account']['id'] for result in response.data],
+            [self.both_roles.pk, self.same_programme.pk, self.one_role.pk]
+        )
+        self.assertEqual(response.data[0]['matched_roles'], ['Software Engineer', 'Designer'])
+
+    def test_get_recommended_students_following_project_scores_higher(self):
+        Follow.objects.create(user=self.one_role, project=self.project)
+
+        url = reverse('project-recommended-students', kwargs={'project_pk': self.project.pk})
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        # all roles, half the roles and the same programme, half the roles and following the project
+        self.assertEqual([result['score'] for result in response.data], [1.0, 0.8, 0.7])
+
+    def test_get_recommended_students_after_profile_change(self):
+        # build the index, then change a profile
+        self.client.get(reverse('project-recommended-students', kwargs={'project_pk': self.project.pk}))
+        self.no_roles.profile.set_roles(['Designer', 'Software Engineer'])
+        self.no_roles.profile.save()
+
+        url = f'{reverse("project-recommended-students", kwargs={"project_pk": self.project.pk})}?limit=2'
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            {result['account']['id'] for result in response.data},
+            {self.both_roles.pk, self.no_roles.pk}
+        )
+
+    def test_stale_student_index_is_rebuilt_in_background(self):
+        index = StudentRoleIndex()
+        index.build()
+        expected = index.rank(self.project.desired_roles)
+
+        # make the index stale, and record the threads rebuilding it
+        index._built_at -= 3600
+        rebuilding = threading.Event()
+        release = threading.Event()
+        builders = []
+
+        def build():
+            builders.append(threading.current_thread())
+            rebuilding.set()
+            release.wait(5)
+
+        index.build = build
+
+        # the stale index is still used while it's rebuilt, by a single background thread
+        results = [index.rank(self.project.desired_roles) for _ in range(3)]
+        self.assertTrue(rebuilding.wait(5))
+        release.set()
+        index._rebuild_thread.join(5)
+
+        self.assertEqual(results, [expected] * 3)
+        self.assertEqual(len(builders), 1)
+        self.assertIsNot(builders[0], threading.current_thread())
+
+
+def create_project(title, owner, desired_roles):
+    return Project.objects.create(
+        title = title,
+        description = f'{title} description.',
+        category = 'SFW',
+        owner = owner,
+        owner_role = 'Project Manager',
+        desired_roles = desired_roles
+    )
+
+
+class ProjectRecommendationsViewTest(APITestCase):
+    # this setup is re-run before each test
+    def setUp(self):
+        # the index and the cached recommendations live outside the database,
+        # so make sure nothing is left over from other tests
+        project_similarity_index.clear()
+        caches['api'].clear()
+
+        self.user = create_student('johndoe', ['Designer'])
+        self.other_user = create_student('alice', ['Accountant'])
+
+        # wants all of the user's roles
+        self.all_roles = create_project('All Roles', create_student('owner1', []), ['designer'])
+        # wants the user's role and another
+        self.half_roles = create_project('Half Roles', create_student('owner2', []), ['Designer', 'Accountant'])
+        # wants none of the user's roles, but is followed by another student following the same project as the user
+        self.similar = create_project('Similar', create_student('owner3', []), ['Accountant'])
+        # wants none of the user's roles, and shares no students with the user's projects
+        self.unrelated = create_project('Unrelated', create_student('owner4', []), ['Accountant'])
+        # already followed by the user
+        self.followed = create_project('Followed', create_student('owner5', []), ['Designer'])
+        # owned by the user
+        self.owned = create_project('Owned', self.user, ['Designer'])
+
+        Follow.objects.create(user=self.user, project=self.followed)
+        Follow.objects.create(user=self.other_user, project=self.followed)
+        Follow.objects.create(user=self.other_user, project=self.similar)
+
+        # prepare data for login
+        url = reverse('token_obtain_pair')
+        data = {
+            'username': self.user.username,
+            'password': PASS,
+        }
+        # log in user
+        response = self.client.post(url, data, format='json')
+
+        # add access token to auth header
+        self.client.credentials(HTTP_AUTHORIZATION = 'Bearer ' + response.data['access'])
+
+    def test_get_recommended_projects_unauthenticated(self):
+        # forcefully unauthenticate the requesting user
+        self.client.force_authenticate(user=None)
+
+        url = reverse('project-recommended')
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_get_recommended_projects(self):
+        url = reverse('project-recommended')
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [result['project']['id'] for result in response.data],
+            [self.all_roles.pk, self.half_roles.pk, self.similar.pk]
+        )
+        self.assertEqual(response.data[0]['project']['title'], 'All Roles')
+
+    def test_get_recommended_projects_limit(self):
+        url = f'{reverse("project-recommended")}?limit=1'
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([result['project']['id'] for result in response.data], [self.all_roles.pk])
+
+    def test_get_recommended_projects_after_follow(self):
+        # cache the recommendations, then follow one of them
+        self.client.get(reverse('project-recommended'))
+        Follow.objects.create(user=self.user, project=self.all_roles)
+
+        url = reverse('project-recommended')
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn(self.all_roles.pk, [result['project']['id'] for result in response.data])
+
+    def test_get_recommended_projects_after_project_deleted(self):
+        # cache the recommendations, then delete one of them
+        self.client.get(reverse('project-recommended'))
+        self.half_roles.delete()
+
+        url = reverse('project-recommended')
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [result['project']['id'] for result in response.data],
+            [self.all_roles.pk, self.similar.pk]
+        )
+
+    def test_stale_project_index_is_rebuilt_in_background(self):
+        index = ProjectSimilarityIndex()
+        index.build()
+        expected = index.rank(self.user.pk, self.user.profile.roles)
+
+        # make the index stale, and record the threads rebuilding it
+        index._built_at -= 3600
+        rebuilding = threading.Event()
+        release = threading.Event()
+        builders = []
+
+        def build():
+            builders.append(threading.current_thread())
+            rebuilding.set()
+            release.wait(5)
+
+        index.build = build
+
+        # the stale index is still used while it's rebuilt, by a single background thread
+        results = [index.rank(self.user.pk, self.user.profile.roles) for _ in range(3)]
+        self.assertTrue(rebuilding.wait(5))
+        release.set()
+        index._rebuild_thread.join(5)
+
+        self.assertEqual(results, [expected] * 3)
+        self.assertEqual(len(builders), 1)
+        self.assertIsNot(builders[0], threading.current_thread())
+
+    def test_get_recommended_projects_after_profile_change(self):
+        # cache the recommendations, then change the user's roles
+        self.client.get(reverse('project-recommended'))
+        self.user.profile.set_roles(['Accountant'])
+        self.user.profile.save()
+
+        url = reverse('project-recommended')
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        project_ids = [result['project']['id'] for result in response.data]
+        self.assertIn(self.unrelated.pk, project_ids)
+        self.assertNotIn(self.all_roles.pk, project_ids)
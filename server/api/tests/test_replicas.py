@@ -0,0 +1,201 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db import IntegrityError, connections
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APITransactionTestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+from ..cache import response_cache
+from ..models import Project
+from ..replicas import ReplicaRouter, ReplicaRoutingMiddleware
+
+USER_MODEL = get_user_model()
+PASS = 'password123!'
+
+
+def create_user(username, email, first_name, last_name, password):
+    try:
+        user = USER_MODEL.objects.create_user(username, email, first_name, last_name, password)
+    except IntegrityError:
+        user = USER_MODEL.objects.get(username=username)
+
+    return user
+
+
+def create_token(user_id):
+    token = AccessToken()
+    token['user_id'] = user_id
+
+    return str(token)
+
+
+@override_settings(DATABASE_REPLICAS=['replica1'], DATABASE_REPLICA_STICKY_SECONDS=60)
+class ReplicaRoutingTest(SimpleTestCase):
+    # this setup is re-run before each test
+    def setUp(self):
+        # the pins live in the 'api' cache, so make sure nothing is left over from other tests
+        caches['api'].clear()
+
+        self.factory = RequestFactory()
+        self.router = ReplicaRouter()
+        self.middleware = ReplicaRoutingMiddleware(self.get_response)
+        self.auth_header = 'Bearer ' + create_token(1)
+
+    def get_response(self, request):
+        # records where the reads and writes of the request would go
+        self.read_db = self.router.db_for_read(Project)
+        self.write_db = self.router.db_for_write(Project)
+
+        return HttpResponse()
+
+    def send(self, method, auth_header=None):
+        headers = {'HTTP_AUTHORIZATION': auth_header} if auth_header else {}
+        request = getattr(self.factory, method)('/api/projects/', **headers)
+
+        return self.middleware(request)
+
+    def test_get_reads_from_replica(self):
+        self.send('get', self.auth_header)
+
+        self.assertEqual(self.read_db, 'replica1')
+        self.assertEqual(self.write_db, 'default')
+
+    def test_post_reads_from_primary(self):
+        self.send('post', self.auth_header)
+
+        self.assertEqual(self.read_db, 'default')
+        self.assertEqual(self.write_db, 'default')
+
+    def test_get_after_write_reads_from_primary(self):
+        self.send('patch', self.auth_header)
+        self.send('get', self.auth_header)
+
+        self.assertEqual(self.read_db, 'default')
+
+    def test_get_after_write_of_other_user_reads_from_replica(self):
+        self.send('delete', 'Bearer ' + create_token(2))
+        self.send('get', self.auth_header)
+
+        self.assertEqual(self.read_db, 'replica1')
+
+    @override_settings(DATABASE_REPLICA_STICKY_SECONDS=0)
+    def test_get_after_sticky_window_reads_from_replica(self):
+        self.send('put', self.auth_header)
+        self.send('get', self.auth_header)
+
+        self.assertEqual(self.read_db, 'replica1')
+
+    def test_get_filling_response_cache_reads_from_primary(self):
+        def get_response(request):
+            cache_key = response_cache.make_key('project-list', ['projects'], request.get_full_path())
+            if response_cache.get(cache_key) is None:
+                self.read_db = self.router.db_for_read(Project)
+
+            return HttpResponse()
+
+        request = self.factory.get('/api/projects/', HTTP_AUTHORIZATION=self.auth_header)
+        ReplicaRoutingMiddleware(get_response)(request)
+
+        self.assertEqual(self.read_db, 'default')
+
+    def test_anonymous_get_reads_from_replica(self):
+        self.send('get')
+
+        self.assertEqual(self.read_db, 'replica1')
+
+    def test_reads_outside_requests_go_to_primary(self):
+        self.assertEqual(self.router.db_for_read(Project), 'default')
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_get_without_replicas_reads_from_primary(self):
+        self.send('get', self.auth_header)
+
+        self.assertEqual(self.read_db, 'default')
+
+    def test_migrations_only_on_primary(self):
+        self.assertTrue(self.router.allow_migrate('default', 'api'))
+        self.assertFalse(self.router.allow_migrate('replica1', 'api'))
+
+
+# the replica is a test mirror of the default database, which only sees committed writes,
+# so these tests run outside of a transaction
+@override_settings(DATABASE_REPLICAS=['replica'], DATABASE_REPLICA_STICKY_SECONDS=60)
+class ReplicaRoutingRequestTest(APITransactionTestCase):
+    databases = {'default', 'replica'}
+
+    @classmethod
+    def setUpClass(cls):
+        # add the replica as a mirror of the test database, as the test runner does for aliases with a TEST MIRROR,
+        # so no replica has to be configured in the settings
+        connections.databases['replica'] = {**connections['default'].settings_dict, 'TEST': {'MIRROR': 'default'}}
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        connections['replica'].close()
+        delattr(connections._connections, 'replica')
+        del connections.databases['replica']
+
+    # this setup is re-run before each test
+    def setUp(self):
+        # the pins live in the 'api' cache, so make sure nothing is left over from other tests
+        caches['api'].clear()
+
+        self.user = create_user(
+            username = 'johndoe',
+            email = 'johndoe@fakeuniversity.com',
+            first_name = 'John',
+            last_name = 'Doe',
+            password = PASS,
+        )
+        self.other_user = create_user(
+            username = 'jeffdoe',
+            email = 'jeffdoe@fakeuniversity.com',
+            first_name = 'Jeff',
+            last_name = 'Doe',
+            password = PASS,
+        )
+        self.project = Project.objects.create(
+            title = 'Test Project 1',
+            description = 'Test project 1 description.',
+            category = 'ART',
+            owner = self.other_user,
+            owner_role = 'Test Owner Role',
+            desired_roles = []
+        )
+
+        # the access token is made directly, as logging in is a POST request
+        self.client.credentials(HTTP_AUTHORIZATION = 'Bearer ' + str(AccessToken.for_user(self.user)))
+
+    def get_follows(self):
+        """
+        Lists the user's follows and returns the response along with the queries run on each database.
+        """
+        with CaptureQueriesContext(connections['default']) as default_queries:
+            with CaptureQueriesContext(connections['replica']) as replica_queries:
+                response = self.client.get(reverse('follow-list'))
+
+        return response, default_queries, replica_queries
+
+    def test_get_reads_from_replica(self):
+        response, default_queries, replica_queries = self.get_follows()
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(default_queries), 0)
+        self.assertGreater(len(replica_queries), 0)
+
+    def test_get_after_write_reads_own_write_from_primary(self):
+        response = self.client.post(reverse('follow-list'), {'project': self.project.id}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        response, default_queries, replica_queries = self.get_follows()
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([follow['project'] for follow in response.data], [self.project.id])
+        self.assertGreater(len(default_queries), 0)
+        self.assertEqual(len(replica_queries), 0)
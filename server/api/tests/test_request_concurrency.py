@@ -0,0 +1,159 @@
+import threading
+import time
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from rest_framework import serializers, status
+from rest_framework.reverse import reverse
+from rest_framework.test import (APIClient, APIRequestFactory,
+                                 APITransactionTestCase)
+from rest_framework_simplejwt.tokens import AccessToken
+
+from ..models import Membership, Project, Request, RequestEvent
+from ..serializers import RequestBulkCreateSerializer
+
+USER_MODEL = get_user_model()
+PASS = 'password123!'
+
+# number of pending requests that are accepted and cancelled at the same time
+REQUEST_COUNT = 10
+
+
+def create_user(username, email, first_name, last_name, password):
+    try:
+        user = USER_MODEL.objects.create_user(username, email, first_name, last_name, password)
+    except IntegrityError:
+        user = USER_MODEL.objects.get(username=username)
+
+    return user
+
+
+# the updates are made from several threads, each with its own database connection,
+# so they must see each other's committed changes
+class RequestUpdateConcurrencyTest(APITransactionTestCase):
+    # this setup is re-run before each test
+    def setUp(self):
+        self.owner = create_user(
+            username = 'johndoe',
+            email = 'johndoe@fakeuniversity.com',
+            first_name = 'John',
+            last_name = 'Doe',
+            password = PASS,
+        )
+        self.project = Project.objects.create(
+            title = 'Test Project 1',
+            description = 'Test project 1 description.',
+            category = 'ART',
+            owner = self.owner,
+            owner_role = 'Test Owner Role',
+            desired_roles = ['Test Role']
+        )
+        self.requests = [
+            Request.objects.create(
+                requester = self.owner,
+                requestee = create_user(f'student{number}', f'student{number}@fakeuniversity.com', 'Student', str(number), PASS),
+                project = self.project,
+                role = 'Test Role'
+            )
+            for number in range(REQUEST_COUNT)
+        ]
+
+    def update_concurrently(self, updates):
+        """
+        Makes the (user, request, status) updates at the same time, each from its own thread,
+        and returns the status codes of the responses along with the time taken.
+        """
+        barrier = threading.Barrier(len(updates))
+        status_codes = [None] * len(updates)
+
+        def update(index, user, project_request, new_status):
+            client = APIClient()
+            client.credentials(HTTP_AUTHORIZATION = 'Bearer ' + str(AccessToken.for_user(user)))
+            url = reverse('request-detail', kwargs={'request_pk': project_request.pk})
+
+            barrier.wait()
+            try:
+                status_codes[index] = client.put(url, {'status': new_status}, format='json').status_code
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=update, args=(index, *args)) for index, args in enumerate(updates)]
+
+        start = time.monotonic()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        return status_codes, time.monotonic() - start
+
+    def test_concurrent_accept_and_cancel(self):
+        # each request is accepted by its requestee and cancelled by its requester at the same time
+        updates = []
+        for project_request in self.requests:
+            updates.append((project_request.requestee, project_request, Request.Status.ACCEPTED))
+            updates.append((self.owner, project_request, Request.Status.CANCELLED))
+
+        status_codes, elapsed = self.update_concurrently(updates)
+
+        # only one update of each request succeeds, the other finds it inactive
+        for accept_status, cancel_status in zip(status_codes[::2], status_codes[1::2]):
+            self.assertEqual(
+                sorted([accept_status, cancel_status]), [status.HTTP_200_OK, status.HTTP_404_NOT_FOUND],
+                f'{len(updates)} updates took {elapsed:.2f}s ({len(updates) / elapsed:.0f}/s)'
+            )
+
+        accepted = Request.objects.filter(project=self.project, status=Request.Status.ACCEPTED)
+        self.assertEqual(Membership.objects.filter(project=self.project).count(), accepted.count())
+        self.assertFalse(Request.objects.filter(project=self.project, is_active=True).exists())
+        # one closing event for each request
+        self.assertEqual(RequestEvent.objects.filter(request__project=self.project).count(), REQUEST_COUNT)
+
+    def test_concurrent_accepts_create_one_membership(self):
+        project_request = self.requests[0]
+        updates = [(project_request.requestee, project_request, Request.Status.ACCEPTED)] * 8
+
+        status_codes, _ = self.update_concurrently(updates)
+
+        self.assertEqual(status_codes.count(status.HTTP_200_OK), 1)
+        self.assertEqual(status_codes.count(status.HTTP_404_NOT_FOUND), len(updates) - 1)
+        self.assertEqual(Membership.objects.filter(project=self.project, user=project_request.requestee).count(), 1)
+
+
+# foreign keys are only checked when the transaction commits, so this test runs outside of a transaction
+class RequestBulkCreateConcurrencyTest(APITransactionTestCase):
+    # this setup is re-run before each test
+    def setUp(self):
+        self.owner = create_user(
+            username = 'johndoe',
+            email = 'johndoe@fakeuniversity.com',
+            first_name = 'John',
+            last_name = 'Doe',
+            password = PASS,
+        )
+        self.project = Project.objects.create(
+            title = 'Test Project 1',
+            description = 'Test project 1 description.',
+            category = 'ART',
+            owner = self.owner,
+            owner_role = 'Test Owner Role',
+            desired_roles = ['Test Role']
+        )
+        self.student = create_user('student', 'student@fakeuniversity.com', 'Student', 'Doe', PASS)
+
+    def test_bulk_create_requests_with_account_deleted_in_the_meantime(self):
+        request = APIRequestFactory().post(reverse('request-bulk-create'))
+        request.user = self.owner
+        serializer = RequestBulkCreateSerializer(
+            data={'project': self.project.pk, 'invitations': [{'requestee': self.student.pk, 'role': 'Test Role'}]},
+            context={'request': request},
+        )
+        self.assertTrue(serializer.is_valid())
+
+        # the student deletes their account after the invitations were validated
+        self.student.delete()
+
+        with self.assertRaises(serializers.ValidationError):
+            serializer.save()
+
+        self.assertFalse(Request.objects.filter(project=self.project).exists())
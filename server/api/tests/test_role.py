@@ -0,0 +1,225 @@
+from django.contrib.auth import get_user_model
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APITestCase
+
+from ..models import Membership, Profile, Project, Request, Role
+from ..roles import role_index
+
+USER_MODEL = get_user_model()
+PASS = 'password123!'
+
+
+def create_user(username, email, first_name, last_name, password):
+    try:
+        user = USER_MODEL.objects.create_user(username, email, first_name, last_name, password)
+    except IntegrityError:
+        user = USER_MODEL.objects.get(username=username)
+
+    return user
+
+
+class RoleSuggestViewTest(APITestCase):
+    # this setup is re-run before each test
+    def setUp(self):
+        # the index lives in memory, so make sure nothing is left over from other tests
+        role_index.clear()
+
+        self.user = create_user(
+            username = 'johndoe',
+            email = 'johndoe@fakeuniversity.com',
+            first_name = 'John',
+            last_name = 'Doe',
+            password = PASS,
+        )
+        self.user.profile.set_roles(['Software Engineer', 'Data Analyst'])
+        self.user.profile.save()
+
+        self.project = Project.objects.create(
+            title = 'Test Project 1',
+            description = 'Test project 1 description.',
+            category = 'SFW',
+            owner = self.user,
+            owner_role = 'Software Tester',
+            desired_roles = [
+                'Software Engineer',
+                'Designer'
+            ]
+        )
+
+        # prepare data for login
+        url = reverse('token_obtain_pair')
+        data = {
+            'username': self.user.username,
+            'password': PASS,
+        }
+        # log in user
+        response = self.client.post(url, data, format='json')
+
+        # add access token to auth header
+        self.client.credentials(HTTP_AUTHORIZATION = 'Bearer ' + response.data['access'])
+
+    def test_get_role_suggestions_unauthenticated(self):
+        # forcefully unauthenticate the requesting user
+        self.client.force_authenticate(user=None)
+
+        url = f'{reverse("role-suggest")}?q=soft'
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_get_role_suggestions(self):
+        url = f'{reverse("role-suggest")}?q=SOFT'
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        # the most used roles come first
+        self.assertEqual(response.data, [
+            {'role': 'Software Engineer', 'count': 2},
+            {'role': 'Software Tester', 'count': 1},
+        ])
+
+    def test_get_role_suggestions_with_limit(self):
+        url = f'{reverse("role-suggest")}?q=s&limit=1'
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, [{'role': 'Software Engineer', 'count': 2}])
+
+    def test_get_role_suggestions_without_prefix(self):
+        url = reverse('role-suggest')
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, [])
+
+    def test_get_role_suggestions_does_not_query_the_database_once_built(self):
+        url = f'{reverse("role-suggest")}?q=soft'
+        self.client.get(url)
+
+        # the only query is for authenticating the user
+        with self.assertNumQueries(1):
+            response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_get_role_suggestions_are_updated_on_save_and_delete(self):
+        # build the index
+        self.client.get(f'{reverse("role-suggest")}?q=soft')
+
+        profile = self.user.profile
+        profile.set_roles(['Data Scientist'])
+        profile.save()
+
+        response = self.client.get(f'{reverse("role-suggest")}?q=data')
+        self.assertEqual(response.data, [{'role': 'Data Scientist', 'count': 1}])
+
+        self.project.delete()
+
+        response = self.client.get(f'{reverse("role-suggest")}?q=soft')
+        self.assertEqual(response.data, [])
+
+
+class RoleTaxonomyTest(APITestCase):
+    # this setup is re-run before each test
+    def setUp(self):
+        self.software_engineer = Role.objects.create(name='Software Engineer', aliases=['SWE', 'Software Developer'])
+
+        self.user = create_user(
+            username = 'johndoe',
+            email = 'johndoe@fakeuniversity.com',
+            first_name = 'John',
+            last_name = 'Doe',
+            password = PASS,
+        )
+        self.other_user = create_user(
+            username = 'janedoe',
+            email = 'janedoe@fakeuniversity.com',
+            first_name = 'Jane',
+            last_name = 'Doe',
+            password = PASS,
+        )
+
+        self.project = Project.objects.create(
+            title = 'Test Project 1',
+            description = 'Test project 1 description.',
+            category = 'SFW',
+            owner = self.user,
+            owner_role = 'software  developer',
+            desired_roles = [
+                'swe',
+                'Designer',
+                'designer',
+                '',
+            ]
+        )
+
+        # prepare data for login
+        url = reverse('token_obtain_pair')
+        data = {
+            'username': self.user.username,
+            'password': PASS,
+        }
+        # log in user
+        response = self.client.post(url, data, format='json')
+
+        # add access token to auth header
+        self.client.credentials(HTTP_AUTHORIZATION = 'Bearer ' + response.data['access'])
+
+    def test_role_aliases_are_normalized(self):
+        self.assertEqual(self.software_engineer.key, 'software engineer')
+        self.assertEqual(self.software_engineer.aliases, ['software developer', 'swe'])
+
+    def test_project_roles_are_canonicalized(self):
+        designer = Role.objects.get(key='designer')
+
+        self.assertEqual(self.project.owner_role, 'Software Engineer')
+        self.assertEqual(self.project.canonical_owner_role, self.software_engineer)
+        # blank and duplicate roles are left out
+        self.assertEqual(self.project.desired_roles, ['Software Engineer', 'Designer'])
+        self.assertEqual(self.project.desired_role_ids, [self.software_engineer.pk, designer.pk])
+
+    def test_profile_roles_are_canonicalized(self):
+        profile = self.user.profile
+        profile.set_roles(['DESIGNER', 'Software Developer'])
+        profile.save()
+
+        profile = Profile.objects.get(pk=profile.pk)
+        self.assertEqual(profile.roles, ['Designer', 'Software Engineer'])
+        self.assertEqual(profile.role_ids, [Role.objects.get(key='designer').pk, self.software_engineer.pk])
+
+    def test_membership_and_request_roles_are_canonicalized(self):
+        project_request = Request.objects.create(requester=self.user, requestee=self.other_user, project=self.project, role='swe')
+        project_request.accept()
+
+        membership = Membership.objects.get(project=self.project, user=self.other_user)
+        self.assertEqual((project_request.role, project_request.canonical_role), ('Software Engineer', self.software_engineer))
+        self.assertEqual((membership.role, membership.canonical_role), ('Software Engineer', self.software_engineer))
+
+    def test_new_role_is_created_once(self):
+        Project.objects.create(
+            title = 'Test Project 2',
+            description = 'Test project 2 description.',
+            category = 'SFW',
+            owner = self.other_user,
+            owner_role = 'DATA ANALYST',
+            desired_roles = ['Data Analyst']
+        )
+
+        self.assertEqual(Role.objects.filter(key='data analyst').count(), 1)
+        self.assertEqual(Role.objects.get(key='data analyst').name, 'DATA ANALYST')
+
+    def test_projects_are_looked_up_by_role_id(self):
+        url = reverse('project-detail', kwargs={'project_pk': self.project.pk})
+        response = self.client.put(url, {
+            'title': self.project.title,
+            'description': self.project.description,
+            'category': self.project.category,
+            'owner_role': self.project.owner_role,
+            'desired_roles': ['Accountant'],
+        }, format='json')
+        accountant = Role.objects.get(key='accountant')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(Project.objects.filter(desired_role_ids__contains=[accountant.pk]).exists())
+        self.assertFalse(Project.objects.filter(desired_role_ids__overlap=[self.software_engineer.pk]).exists())
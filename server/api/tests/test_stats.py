@@ -0,0 +1,140 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APITestCase
+
+from ..models import Membership, Project
+from ..stats import refresh_stats
+
+USER_MODEL = get_user_model()
+PASS = 'password123!'
+
+
+def create_user(username, email, first_name, last_name, password):
+    try:
+        user = USER_MODEL.objects.create_user(username, email, first_name, last_name, password)
+    except IntegrityError:
+        user = USER_MODEL.objects.get(username=username)
+
+    return user
+
+
+def create_student(username, roles):
+    student = create_user(username, f'{username}@fakeuniversity.com', username.capitalize(), 'Doe', PASS)
+    student.profile.set_roles(roles)
+    student.profile.save()
+
+    return student
+
+
+class StatsViewTest(APITestCase):
+    # this setup is re-run before each test
+    def setUp(self):
+        self.user = create_student('johndoe', ['Project Manager'])
+        create_student('alice', ['Software Engineer', 'Designer'])
+        create_student('bob', ['software engineer'])
+        member = create_student('carol', ['Designer'])
+
+        software_project = Project.objects.create(
+            title = 'Test Project 1',
+            description = 'Test project 1 description.',
+            category = 'SFW',
+            owner = self.user,
+            owner_role = 'Project Manager',
+            desired_roles = ['Software Engineer', 'Designer']
+        )
+        Project.objects.create(
+            title = 'Test Project 2',
+            description = 'Test project 2 description.',
+            category = 'SFW',
+            owner = self.user,
+            owner_role = 'Project Manager',
+            desired_roles = ['Software Engineer']
+        )
+        Project.objects.create(
+            title = 'Test Project 3',
+            description = 'Test project 3 description.',
+            category = 'ART',
+            owner = self.user,
+            owner_role = 'Project Manager',
+            desired_roles = ['Designer', 'Illustrator']
+        )
+        Membership.objects.create(role='Designer', project=software_project, user=member)
+
+        refresh_stats()
+
+        # prepare data for login
+        url = reverse('token_obtain_pair')
+        data = {
+            'username': self.user.username,
+            'password': PASS,
+        }
+        # log in user
+        response = self.client.post(url, data, format='json')
+
+        # add access token to auth header
+        self.client.credentials(HTTP_AUTHORIZATION = 'Bearer ' + response.data['access'])
+
+    def test_get_stats_not_staff(self):
+        response = self.client.get(reverse('stats'))
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_get_stats(self):
+        self.user.is_staff = True
+        self.user.save()
+
+        response = self.client.get(reverse('stats'))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIsNotNone(response.data['refreshed_at'])
+        self.assertEqual(response.data['roles'], [
+            {'role': 'Designer', 'students': 2, 'projects': 2, 'students_per_project': 1.0},
+            {'role': 'Software Engineer', 'students': 2, 'projects': 2, 'students_per_project': 1.0},
+            {'role': 'Illustrator', 'students': 0, 'projects': 1, 'students_per_project': 0.0},
+            {'role': 'Project Manager', 'students': 1, 'projects': 0, 'students_per_project': None},
+        ])
+        self.assertEqual(response.data['categories'], [
+            {'category': 'ART', 'category_name': 'Arts', 'role': 'Designer', 'projects': 1, 'members': 0},
+            {'category': 'ART', 'category_name': 'Arts', 'role': 'Illustrator', 'projects': 1, 'members': 0},
+            {'category': 'SFW', 'category_name': 'Software', 'role': 'Software Engineer', 'projects': 2, 'members': 0},
+            {'category': 'SFW', 'category_name': 'Software', 'role': 'Designer', 'projects': 1, 'members': 1},
+        ])
+
+    def test_get_stats_for_category(self):
+        self.user.is_staff = True
+        self.user.save()
+
+        response = self.client.get(f'{reverse("stats")}?category=SFW&limit=1')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['roles']), 1)
+        self.assertEqual(response.data['categories'], [
+            {'category': 'SFW', 'category_name': 'Software', 'role': 'Software Engineer', 'projects': 2, 'members': 0},
+        ])
+
+    def test_get_stats_with_invalid_category(self):
+        self.user.is_staff = True
+        self.user.save()
+
+        response = self.client.get(f'{reverse("stats")}?category=XYZ')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_stats_are_only_changed_by_refresh(self):
+        self.user.is_staff = True
+        self.user.save()
+        create_student('dave', ['Illustrator'])
+
+        response = self.client.get(reverse('stats'))
+        self.assertEqual(response.data['roles'][2], {'role': 'Illustrator', 'students': 0, 'projects': 1, 'students_per_project': 0.0})
+
+        out = StringIO()
+        call_command('refresh_stats', stdout=out)
+
+        response = self.client.get(reverse('stats'))
+        self.assertIn('Refreshed the statistics', out.getvalue())
+        self.assertEqual(response.data['roles'][2], {'role': 'Illustrator', 'students': 1, 'projects': 1, 'students_per_project': 1.0})
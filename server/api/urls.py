@@ -2,10 +2,12 @@ from django.urls import path
 from rest_framework.documentation import include_docs_urls
 
 from .views import (AccountDetail, AccountList, FollowDetail, FollowList,
-                    MembershipDetail, MembershipList, PrivateMessageDetail,
-                    PrivateMessageList, ProjectDetail, ProjectList,
-                    PublicMessageDetail, PublicMessageList, RequestDetail,
-                    RequestList)
+                    MembershipDetail, MembershipList, Metrics,
+                    PrivateMessageDetail, PrivateMessageList, ProjectDetail,
+                    ProjectList, ProjectMembershipList, ProjectRecommendations,
+                    ProjectStudentRecommendations, PublicMessageDetail,
+                    PublicMessageList, RequestBulkCreate, RequestDetail,
+                    RequestList, RoleSuggest, Stats)
 
 urlpatterns = [
     path('', include_docs_urls(
@@ -18,8 +20,12 @@ urlpatterns = [
     path('accounts/<int:pk>/', AccountDetail.as_view(), name='account-detail'),
 
     path('projects/', ProjectList.as_view(), name='project-list'),
+    path('projects/recommended/', ProjectRecommendations.as_view(), name='project-recommended'),
     path('projects/<int:project_pk>/', ProjectDetail.as_view(), name='project-detail'),
 
+    path('projects/<int:project_pk>/memberships/', ProjectMembershipList.as_view(), name='project-memberships-list'),
+    path('projects/<int:project_pk>/recommended-students/', ProjectStudentRecommendations.as_view(), name='project-recommended-students'),
+
     path('projects/<int:project_pk>/private-messages/', PrivateMessageList.as_view(), name='project-private-messages-list'),
     path('projects/<int:project_pk>/private-messages/<int:message_pk>/', PrivateMessageDetail.as_view(), name='project-private-messages-detail'),
 
@@ -31,8 +37,14 @@ urlpatterns = [
 
     path('requests/', RequestList.as_view(), name='request-list'),
     path('requests/<int:request_pk>/', RequestDetail.as_view(), name='request-detail'),
+    path('requests/bulk/', RequestBulkCreate.as_view(), name='request-bulk-create'),
 
     path('follows/', FollowList.as_view(), name='follow-list'),
     path('follows/<int:follow_pk>/', FollowDetail.as_view(), name='follow-detail'),
+
+    path('roles/suggest/', RoleSuggest.as_view(), name='role-suggest'),
+
+    path('metrics/', Metrics.as_view(), name='metrics'),
+    path('stats/', Stats.as_view(), name='stats'),
 ]
 
@@ -1,14 +1,34 @@
 from django.contrib.auth import get_user_model
-from django.db.models import Count, Q
+from django.db import transaction
+from django.db.models import Exists, FloatField, OuterRef, Q
+from django.db.models.functions import Cast
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import condition
 from rest_framework import status
+from rest_framework.exceptions import ParseError
+from rest_framework.permissions import IsAdminUser
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from .cache import response_cache
+from .db_backends.postgresql.pool import pool_metrics
+from .etags import (account_etag, private_message_list_etag, project_etag,
+                    public_message_list_etag)
+from .lookups import TrigramWordSimilarity
 from .models import (Follow, Membership, PrivateMessage, Project,
-                     PublicMessage, Request)
-from .serializers import (FollowSerializer, MembershipSerializer,
-                          PrivateMessageSerializer, AccountSerializer,
-                          ProjectSerializer, PublicMessageSerializer,
+                     PublicMessage, Request, RoleCategoryStats, RoleStats,
+                     roles_filter)
+from .pagination import KeysetPagination
+from .recommendations import (MAX_PROJECT_RECOMMENDATIONS, recommend_projects,
+                              recommend_students)
+from .roles import role_index
+from .serializers import (FollowSerializer, MembershipBulkUpdateSerializer,
+                          MembershipSerializer, PrivateMessageSerializer,
+                          AccountSerializer,
+                          ProjectSerializer, ProjectViewerSerializer,
+                          PublicMessageSerializer, RequestBulkCreateSerializer,
                           RequestSerializer, RequestUpdateSerializer)
 
 
@@ -19,12 +39,29 @@ class AccountList(APIView):
 
     def _search(self, query_param, queryset):
         """
-        Helper method for filtering a queryset of accounts
-        by a substring in their profile roles.
+        Helper method for fuzzy filtering a queryset of accounts
+        by their names, profile programme, and profile roles.
+
+        Uses trigram word similarity, so small typos still match.
+        The accounts are annotated with their 'similarity' to the query.
         
         Returns queryset.
         """
-        return queryset.filter(Q(profile__roles__icontains=query_param))
+        # word_similarity returns a real, cast so it round-trips exactly when used in pagination cursors
+        similarity = Cast(TrigramWordSimilarity(query_param, 'profile__search_text'), FloatField())
+
+        return queryset.filter(profile__search_text__trigram_word_similar=query_param).annotate(similarity=similarity)
+
+    def _filter_by_roles(self, query_param, queryset, match_all=False):
+        """
+        Helper method for filtering a queryset of accounts
+        by a comma separated list of profile roles, matching any or all of them.
+
+        Roles are looked up by their ids using the GIN index of the profile role ids.
+
+        Returns queryset.
+        """
+        return queryset.filter(roles_filter('profile__role_ids', query_param.split(','), match_all=match_all))
 
     def _apply_filtering(self, request, queryset):
         """
@@ -34,6 +71,8 @@ class AccountList(APIView):
         Available query params:
         
         - search
+        - roles_any
+        - roles_all
         
         Returns queryset.
         """
@@ -42,6 +81,14 @@ class AccountList(APIView):
             query_param = request.query_params['search']
             queryset = self._search(query_param, queryset)
 
+        if 'roles_any' in request.query_params:
+            query_param = request.query_params['roles_any']
+            queryset = self._filter_by_roles(query_param, queryset)
+
+        if 'roles_all' in request.query_params:
+            query_param = request.query_params['roles_all']
+            queryset = self._filter_by_roles(query_param, queryset, match_all=True)
+
         return queryset
 
     def get(self, request, format=None):
@@ -90,12 +137,25 @@ class AccountList(APIView):
         The list of accounts returned may be filtered by providing query parameters:
         
         1. search
-            - a specific substring in the profile roles
+            - fuzzy text matching the name, programme, or roles of the student (most similar first)
+        2. roles_any
+            - comma separated roles, the student must list at least one of them (case-insensitive, aliases match too)
+        3. roles_all
+            - comma separated roles, the student must list all of them (case-insensitive, aliases match too)
         
         **Examples:**
         
         - /api/accounts?search=engineer
+        - /api/accounts?search=enginer
+        - /api/accounts?roles_any=Software Engineer,Data Analyst
+        - /api/accounts?roles_all=Designer,Project Manager
         
+        ### Pagination
+
+        Results are returned in pages, ordered by the date the account was created (or by similarity when searching).
+        The page size may be set with the `page_size` query param (up to a configured maximum).
+        Links to the next and previous pages are returned in the `Link` response header.
+
         ### Response Codes
         
         - 200
@@ -104,14 +164,22 @@ class AccountList(APIView):
             - User not authenticated
         """
 
-        accounts = get_user_model().objects.all()
+        accounts = get_user_model().objects.select_related('profile')
 
         # check for any query params and filter queryset accordingly
         accounts = self._apply_filtering(request, accounts)
 
-        serializer = AccountSerializer(accounts, many=True)
+        if 'similarity' in accounts.query.annotations:
+            ordering = ('-similarity', 'date_joined', 'id')
+        else:
+            ordering = ('date_joined', 'id')
 
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        paginator = KeysetPagination(ordering=ordering)
+        page = paginator.paginate_queryset(accounts, request, view=self)
+
+        serializer = AccountSerializer(page, many=True)
+
+        return paginator.get_paginated_response(serializer.data)
 
 
 class AccountDetail(APIView):
@@ -125,6 +193,7 @@ class AccountDetail(APIView):
     _PROJECT_403_MESSAGE = 'You do not have permission to modify this profile'
     _ACCOUNT_404_MESSAGE = 'No account found with that id'
 
+    @method_decorator(condition(etag_func=account_etag))
     def get(self, request, pk, format=None):
         """
         Return a specific student account
@@ -149,10 +218,17 @@ class AccountDetail(APIView):
                 }
             }
         
+        ### Conditional Requests
+
+        The response includes an `ETag` header. If the `If-None-Match` request header matches it,
+        the account hasn't changed and an empty 304 response is returned instead.
+
         ### Response Codes
         
         - 200
             - Account found and returned
+        - 304
+            - Not modified since the version in `If-None-Match`
         - 401
             - User not authenticated
         - 404
@@ -248,14 +324,18 @@ class ProjectList(APIView):
     Return a list of all projects or create and return a new project
     """
 
+    _CATEGORY_400_MESSAGE = f'category must be one or more of {", ".join(Project.Category.values)}, comma separated'
+    _OWNER_400_MESSAGE = 'owner must be an account id'
+    _CREATED_AFTER_400_MESSAGE = 'created_after must be an ISO 8601 date and time'
+
     def _search(self, query_param, queryset):
         """
         Helper method for filtering a queryset of projects
-        by a substring appearing in the desired roles.
+        by words appearing in the title, description, owner role, or desired roles.
 
         Returns queryset.
         """
-        return queryset.filter(desired_roles__icontains=query_param)
+        return queryset.search(query_param)
 
     def _filter_by_relation(self, user, query_param, queryset):
         """
@@ -270,56 +350,109 @@ class ProjectList(APIView):
         Returns queryset.
         """
         if query_param == 'active':
-            # user is the owner or a member of the project
-            queryset = queryset.filter(Q(owner=user) | Q(team_members__user=user)).distinct()
+            # user is the owner or a member of the project, checked with a subquery
+            # so projects aren't joined to (and duplicated by) their team members
+            memberships = Membership.objects.filter(project=OuterRef('pk'), user=user)
+            queryset = queryset.annotate(is_member=Exists(memberships)).filter(Q(owner=user) | Q(is_member=True))
         elif query_param == 'owned':
             # user is the owner of the project
-            queryset = queryset.filter(Q(owner=user)).distinct()
+            queryset = queryset.filter(Q(owner=user))
         elif query_param == 'followed':
-            # user follows the project
-            queryset = queryset.filter(Q(followers__user=user)).distinct()
+            # user follows the project (at most once, so the join doesn't duplicate projects)
+            queryset = queryset.filter(Q(followers__user=user))
         
         return queryset
 
+    def _filter_by_roles(self, query_param, queryset, match_all=False):
+        """
+        Helper method for filtering a queryset of projects
+        by a comma separated list of desired roles, matching any or all of them.
 
-    def _order(self, query_param, queryset):
+        Roles are looked up by their ids using the GIN index of the desired role ids.
+
+        Returns queryset.
         """
-        Helper method for ordering a queryset of projects
-        by the date they were created or popularity.
+        return queryset.filter(roles_filter('desired_role_ids', query_param.split(','), match_all=match_all))
 
-        Available values:
-        - ascending
-        - descending
-        - popularity
+    def _filter_by_category(self, query_param, queryset):
+        """
+        Helper method for filtering a queryset of projects
+        by a comma separated list of category codes.
+
+        Raises ParseError if a category doesn't exist.
 
         Returns queryset.
         """
-        if query_param == 'ascending':
-            queryset = queryset.order_by('date_created')
-        elif query_param == 'descending':
-            queryset = queryset.order_by('-date_created')
-        elif query_param == 'popularity':
-            # code based on https://docs.djangoproject.com/en/3.1/topics/db/aggregation/#cheat-sheet
-            queryset = queryset.annotate(num_followers=Count('followers')).order_by('-num_followers')
-        
-        return queryset
+        categories = query_param.split(',')
 
-    def _limit(self, query_param, queryset):
+        if not set(categories) <= set(Project.Category.values):
+            raise ParseError(self._CATEGORY_400_MESSAGE)
+
+        return queryset.filter(category__in=categories)
+
+    def _filter_by_owner(self, query_param, queryset):
         """
-        Helper method for limiting the number of projects
-        in a queryset.
+        Helper method for filtering a queryset of projects
+        by the id of their owner.
+
+        Raises ParseError if the id isn't a number.
 
         Returns queryset.
         """
         try:
-            limit = int(query_param)
-        except:
-            return queryset
-        
-        if limit > 0:
-            queryset = queryset[:limit]
+            return queryset.filter(owner_id=int(query_param))
+        except ValueError:
+            raise ParseError(self._OWNER_400_MESSAGE)
+
+    def _filter_by_created_after(self, query_param, queryset):
+        """
+        Helper method for filtering a queryset of projects
+        created after a given date and time.
+
+        Raises ParseError if the date and time aren't valid.
+
+        Returns queryset.
+        """
+        try:
+            created_after = parse_datetime(query_param)
+        except ValueError:
+            created_after = None
+
+        if created_after is None:
+            raise ParseError(self._CREATED_AFTER_400_MESSAGE)
+
+        if timezone.is_naive(created_after):
+            created_after = timezone.make_aware(created_after)
+
+        return queryset.filter(date_created__gt=created_after)
+
+
+    # Orderings used for paginating projects, each ending with the unique id to keep them total
+    _ORDERINGS = {
+        'ascending': ('date_created', 'id'),
+        'descending': ('-date_created', '-id'),
+        'popularity': ('-follower_count', '-date_created', '-id'),
+        'relevance': ('-rank', '-date_created', '-id'),
+    }
+
+    def _order(self, query_param, queryset):
+        """
+        Helper method for preparing a queryset of projects
+        to be ordered by the date they were created, popularity, or search relevance.
+
+        Available values:
+        - ascending
+        - descending
+        - popularity
+        - relevance
+
+        Returns a tuple of the queryset and the ordering.
+        """
+        if query_param == 'relevance' and 'rank' not in queryset.query.annotations:
+            # projects can only be ordered by relevance when searching
+            query_param = 'ascending'
         
-        return queryset
+        return queryset, self._ORDERINGS.get(query_param, self._ORDERINGS['ascending'])
 
     def _apply_filtering(self, request, queryset):
         """
@@ -329,8 +462,17 @@ class ProjectList(APIView):
         Available query params:
         - search
         - relation
-        - order
-        - limit
+        - roles_any
+        - roles_all
+        - category
+        - owner
+        - created_after
+
+        Each filter narrows the projects down with its own index (the full-text search index,
+        the GIN index of the desired role ids, or the B-tree indexes on the category, owner, and creation date),
+        so the database can combine the matches of several filters instead of scanning the projects.
+
+        Raises ParseError if a query param is invalid.
 
         Returns queryset.
         """
@@ -343,13 +485,25 @@ class ProjectList(APIView):
             query_param = request.query_params['relation']
             queryset = self._filter_by_relation(request.user, query_param, queryset)
 
-        if 'order' in request.query_params:
-            query_param = request.query_params['order']
-            queryset = self._order(query_param, queryset)
+        if 'roles_any' in request.query_params:
+            query_param = request.query_params['roles_any']
+            queryset = self._filter_by_roles(query_param, queryset)
+
+        if 'roles_all' in request.query_params:
+            query_param = request.query_params['roles_all']
+            queryset = self._filter_by_roles(query_param, queryset, match_all=True)
+
+        if 'category' in request.query_params:
+            query_param = request.query_params['category']
+            queryset = self._filter_by_category(query_param, queryset)
+
+        if 'owner' in request.query_params:
+            query_param = request.query_params['owner']
+            queryset = self._filter_by_owner(query_param, queryset)
 
-        if 'limit' in request.query_params:
-            query_param = request.query_params['limit']
-            queryset = self._limit(query_param, queryset)
+        if 'created_after' in request.query_params:
+            query_param = request.query_params['created_after']
+            queryset = self._filter_by_created_after(query_param, queryset)
 
         return queryset
     
@@ -377,6 +531,7 @@ class ProjectList(APIView):
                         "Placeholder Role 2"
                     ],
                     "date_created": "2021-03-11T07:54:39.140852Z",
+                    "follower_count": 0,
                     "team_members": []
                 },
                 {
@@ -394,6 +549,7 @@ class ProjectList(APIView):
                         "Placeholder Role 2"
                     ],
                     "date_created": "2021-03-11T07:09:13.993362Z",
+                    "follower_count": 0,
                     "team_members": [
                         {
                             "id": 17,
@@ -412,41 +568,80 @@ class ProjectList(APIView):
         The list of projects returned may be filtered by providing query parameters:
 
         1. search
-            - a specific substring appearing in the desired roles
+            - words appearing in the title, description, owner role, or desired roles (partial words are matched as prefixes)
         2. relation
             - active - requesting user is the owner or a member
             - owned - requesting user is the owner
             - followed - requesting user is a follower
-        3. order
+        3. roles_any
+            - comma separated roles, the project must want at least one of them (case-insensitive, aliases match too)
+        4. roles_all
+            - comma separated roles, the project must want all of them (case-insensitive, aliases match too)
+        5. category
+            - comma separated category codes (e.g. SFW,TEC), the project must be in one of them
+        6. owner
+            - the account id of the project owner
+        7. created_after
+            - an ISO 8601 date and time, the project must have been created after it
+        8. order
             - ascending - ascending order by date created
             - descending - descending order by date created
             - popularity - descending order by popularity (followers)
-        4. limit
-            - the max number of projects returned
+            - relevance - most relevant search results first (default when searching)
+        9. limit
+            - the max number of projects returned (same as `page_size`)
 
         **Examples:**
 
         - /api/projects?search=engineer&order=descending&limit=5
         - /api/projects?search=analyst&order=ascending
         - /api/projects?relation=active
-        - /api/projects?order=popular&limit=10
+        - /api/projects?order=popularity&limit=10
+        - /api/projects?roles_any=Software Engineer,Data Analyst&category=SFW,TEC
+        - /api/projects?roles_all=Designer,Illustrator&created_after=2021-04-01T00:00:00Z
+
+        ### Pagination
+
+        Results are returned in pages, ordered by the `order` query param (ascending by default).
+        The page size may be set with the `page_size` query param (up to a configured maximum).
+        Links to the next and previous pages are returned in the `Link` response header.
 
         ### Response Codes
 
         - 200
             - List of projects returned
+        - 400
+            - Invalid category, owner, or created_after query param
         - 401
             - User not authenticated
         """
 
-        projects = Project.objects.all()
+        # filtering by relation gives a different list for each user
+        user_pk = request.user.pk if 'relation' in request.query_params else None
+        cache_key = response_cache.make_key(
+            'project-list', ['projects', 'accounts'], request.build_absolute_uri(), user_pk
+        )
+        response = response_cache.get(cache_key)
+
+        if response:
+            return response
+
+        projects = Project.objects.with_related()
 
         # check for any query params and filter queryset accordingly
         projects = self._apply_filtering(request, projects)
+        default_order = 'relevance' if 'search' in request.query_params else 'ascending'
+        projects, ordering = self._order(request.query_params.get('order', default_order), projects)
+
+        paginator = KeysetPagination(ordering=ordering)
+        page = paginator.paginate_queryset(projects, request, view=self)
         
-        serializer = ProjectSerializer(projects, many=True)
+        serializer = ProjectSerializer(page, many=True)
 
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        response = paginator.get_paginated_response(serializer.data)
+        response_cache.set(cache_key, response)
+
+        return response
     
     def post(self, request, format=None):
         """
@@ -499,6 +694,7 @@ class ProjectList(APIView):
                     "Placeholder Role 2"
                 ],
                 "date_created": "2021-04-04T10:18:38.123568Z",
+                "follower_count": 0,
                 "team_members": []
             }
 
@@ -531,17 +727,42 @@ class ProjectDetail(APIView):
     _PROJECT_403_MESSAGE = 'You do not have permission to modify this project'
     _PROJECT_204_DELETE_SUCCESS_MESSAGE = 'Project successfully deleted'
 
-    def _get_project(self, pk):
+    def _get_project(self, pk, viewer=None):
         """
         Helper method for fetching a Project object.
+        If a viewer is given, the project is annotated with the viewer's relations to it.
         Return object or None.
         """
 
+        projects = Project.objects.with_related()
+
+        if viewer:
+            projects = projects.with_viewer(viewer)
+
         try:
-            return Project.objects.get(pk=pk)
+            return projects.get(pk=pk)
         except Project.DoesNotExist:
             return None
+
+    def _get_viewer_project(self, pk, viewer):
+        """
+        Helper method for fetching just the viewer's relations to a project,
+        used when the rest of the project comes from the response cache.
+        Return object or None.
+        """
+
+        try:
+            return Project.objects.with_viewer(viewer).only('id', 'owner').get(pk=pk)
+        except Project.DoesNotExist:
+            return None
+
+    def _includes_viewer(self, request):
+        """
+        Helper method for checking if the viewer block was requested in the query params.
+        """
+        return 'viewer' in request.query_params.get('include', '').split(',')
     
+    @method_decorator(condition(etag_func=project_etag))
     def get(self, request, project_pk, format=None):
         """
         Return a specific project
@@ -565,27 +786,74 @@ class ProjectDetail(APIView):
                     "Placeholder Role 2"
                 ],
                 "date_created": "2021-04-04T10:18:38.123568Z",
+                "follower_count": 0,
                 "team_members": []
             }
 
+        ### Optional Includes
+
+        Extra information may be included in the response by providing the `include` query parameter:
+
+        1. viewer
+            - the requesting user's relations to the project, added to the response as:
+
+                    "viewer": {
+                        "is_owner": false,
+                        "membership_id": null,
+                        "follow_id": 51,
+                        "active_request_id": null
+                    }
+
+        **Examples:**
+
+        - /api/projects/32/?include=viewer
+
+        ### Conditional Requests
+
+        The response includes an `ETag` header. If the `If-None-Match` request header matches it,
+        the project hasn't changed and an empty 304 response is returned instead.
+
         ### Response Codes
 
         - 200
             - Project found and returned
+        - 304
+            - Not modified since the version in `If-None-Match`
         - 401
             - User not authenticated
         - 404
             - Project not found
         """
 
-        project = self._get_project(pk=project_pk)
+        include_viewer = self._includes_viewer(request)
+
+        # the project is cached without the viewer block, which is different for each user
+        cache_key = response_cache.make_key('project-detail', [f'project:{project_pk}', 'accounts'], project_pk)
+        response = response_cache.get(cache_key)
+
+        if response:
+            if include_viewer:
+                project = self._get_viewer_project(pk=project_pk, viewer=request.user)
+
+                if not project:
+                    return Response(self._PROJECT_404_MESSAGE, status=status.HTTP_404_NOT_FOUND)
+
+                response.data['viewer'] = ProjectViewerSerializer(project, context={'request': request}).data
+
+            return response
+
+        project = self._get_project(pk=project_pk, viewer=request.user if include_viewer else None)
 
         if not project:
             return Response(self._PROJECT_404_MESSAGE, status=status.HTTP_404_NOT_FOUND)
         
-        serializer = ProjectSerializer(project)
+        data = ProjectSerializer(project).data
+        response_cache.set(cache_key, Response(data, status=status.HTTP_200_OK))
 
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        if include_viewer:
+            data = {**data, 'viewer': ProjectViewerSerializer(project, context={'request': request}).data}
+
+        return Response(data, status=status.HTTP_200_OK)
 
     def put(self, request, project_pk, format=None):
         """
@@ -641,6 +909,7 @@ class ProjectDetail(APIView):
                     "Placeholder Role 2"
                 ],
                 "date_created": "2021-04-04T08:23:43.639554Z",
+                "follower_count": 0,
                 "team_members": []
             }
 
@@ -741,6 +1010,12 @@ class FollowList(APIView):
                 }
             ]
 
+        ### Pagination
+
+        Results are returned in pages, ordered by the order they were created.
+        The page size may be set with the `page_size` query param (up to a configured maximum).
+        Links to the next and previous pages are returned in the `Link` response header.
+
         ### Response Codes
 
         - 200
@@ -750,9 +1025,13 @@ class FollowList(APIView):
         """
 
         follows = Follow.objects.filter(Q(user=request.user))
-        serializer = FollowSerializer(follows, many=True)
 
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        paginator = KeysetPagination(ordering=('id',))
+        page = paginator.paginate_queryset(follows, request, view=self)
+
+        serializer = FollowSerializer(page, many=True)
+
+        return paginator.get_paginated_response(serializer.data)
     
     def post(self, request, format=None):
         """
@@ -916,6 +1195,12 @@ class MembershipList(APIView):
                 }
             ]
 
+        ### Pagination
+
+        Results are returned in pages, ordered by the order they were created.
+        The page size may be set with the `page_size` query param (up to a configured maximum).
+        Links to the next and previous pages are returned in the `Link` response header.
+
         ### Response Codes
 
         - 200
@@ -924,9 +1209,13 @@ class MembershipList(APIView):
             - User not authenticated
         """
         memberships = Membership.objects.filter(user=request.user)
-        serializer = MembershipSerializer(memberships, many=True)
 
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        paginator = KeysetPagination(ordering=('id',))
+        page = paginator.paginate_queryset(memberships, request, view=self)
+
+        serializer = MembershipSerializer(page, many=True)
+
+        return paginator.get_paginated_response(serializer.data)
 
 
 class MembershipDetail(APIView):
@@ -1077,6 +1366,91 @@ class MembershipDetail(APIView):
         return Response(self._MEMBERSHIP_204_DELETE_SUCCESS_MESSAGE, status=status.HTTP_204_NO_CONTENT)
 
 
+class ProjectMembershipList(APIView):
+    """
+    Change the roles of and remove many team members of a project at once
+    """
+
+    _PROJECT_404_MESSAGE = 'No project found with that id'
+    _PROJECT_403_MESSAGE = 'You do not have permission to modify the members of this project'
+
+    def patch(self, request, project_pk, format=None):
+        """
+        Change the roles of and remove the given team members of a project, and return its new team roster.
+        Either all of the changes are made or none are.
+
+        The memberships may be updated only by the project owner
+
+        ### Request Body
+
+        The request body should be a `"application/json"` encoded object in the following format,
+        where `changes` lists the new roles of memberships and `remove` lists the ids of memberships to remove
+        (both are optional):
+
+            {
+                "changes": [
+                    {
+                        "id": 4,
+                        "role": "Test Role"
+                    }
+                ],
+                "remove": [
+                    7,
+                    9
+                ]
+            }
+
+        ### Response Example
+
+        Returns an `"application/json"` encoded list of the project's team members in the following format:
+
+            [
+                {
+                    "id": 4,
+                    "role": "Test Role",
+                    "project": 5,
+                    "project_title": "Calamity",
+                    "user": 3,
+                    "user_first_name": "Jane",
+                    "user_last_name": "Doe"
+                }
+            ]
+
+        ### Response Codes
+
+        - 200
+            - Memberships updated and the team roster returned
+        - 400
+            - Invalid field values, or memberships not of this project
+        - 401
+            - User not authenticated
+        - 403
+            - User does not have permission
+        - 404
+            - Project not found
+        """
+
+        # the project is locked until the changes are committed, so concurrent changes to its team are made one at a time
+        with transaction.atomic():
+            try:
+                project = Project.objects.select_for_update().get(pk=project_pk)
+            except Project.DoesNotExist:
+                return Response(self._PROJECT_404_MESSAGE, status=status.HTTP_404_NOT_FOUND)
+
+            # checked once for all of the memberships
+            if not project.is_owner(request.user):
+                return Response(self._PROJECT_403_MESSAGE, status=status.HTTP_403_FORBIDDEN)
+
+            serializer = MembershipBulkUpdateSerializer(project, data=request.data)
+
+            if serializer.is_valid():
+                serializer.save()
+
+                return Response(serializer.data, status=status.HTTP_200_OK)
+
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
 class RequestList(APIView):
     """
     Return a list of the authenticated user's active project requests or create a new project request
@@ -1125,6 +1499,12 @@ class RequestList(APIView):
                 }
             ]
 
+        ### Pagination
+
+        Results are returned in pages, ordered by the date they were created.
+        The page size may be set with the `page_size` query param (up to a configured maximum).
+        Links to the next and previous pages are returned in the `Link` response header.
+
         ### Response Codes
 
         - 200
@@ -1135,9 +1515,12 @@ class RequestList(APIView):
 
         requests = Request.objects.filter((Q(requester=request.user.id) | Q(requestee=request.user.id)) & Q(is_active=True))
 
-        serializer = RequestSerializer(requests, many=True)
+        paginator = KeysetPagination(ordering=('date_created', 'id'))
+        page = paginator.paginate_queryset(requests, request, view=self)
 
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        serializer = RequestSerializer(page, many=True)
+
+        return paginator.get_paginated_response(serializer.data)
     
     def post(self, request, format=None):
         """
@@ -1194,6 +1577,95 @@ class RequestList(APIView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+class RequestBulkCreate(APIView):
+    """
+    Invite many students to join a project in one call
+    """
+
+    def post(self, request, format=None):
+        """
+        Create project requests from the project owner to each of the given students.
+        User must be the owner of the project.
+
+        The invitations are checked the same way as those created one at a time.
+        The valid invitations are created even if some are invalid, which are returned under `errors`
+        along with their index in the `invitations` list.
+
+        ### Request Body
+
+        The request body should be a `"application/json"` encoded object in the following format:
+
+            {
+                "project": 32,
+                "invitations": [
+                    {
+                        "requestee": 6,
+                        "role": "Placeholder Role"
+                    },
+                    {
+                        "requestee": 7,
+                        "role": "Other Role"
+                    }
+                ]
+            }
+
+        ### Response Example
+
+        Returns an `"application/json"` encoded object in the following format:
+
+            {
+                "requests": [
+                    {
+                        "id": 32,
+                        "requester": 1,
+                        "requester_first_name": "Peyman",
+                        "requester_last_name": "Azami",
+                        "requestee": 6,
+                        "requestee_first_name": "Richard",
+                        "requestee_last_name": "Roe",
+                        "project": 32,
+                        "project_title": "Placeholder Title",
+                        "role": "Placeholder Role",
+                        "status_name": "Pending",
+                        "status": "PND",
+                        "is_active": true,
+                        "date_created": "2021-04-04T13:23:37.907620Z"
+                    }
+                ],
+                "errors": [
+                    {
+                        "index": 1,
+                        "requestee": 7,
+                        "errors": [
+                            "Member already exists"
+                        ]
+                    }
+                ]
+            }
+
+        ### Response Codes
+
+        - 201
+            - At least one project request created, the created requests and any invalid invitations returned
+        - 400
+            - Invalid field values, user is not the project owner, or none of the invitations are valid
+        - 401
+            - User not authenticated
+        """
+
+        serializer = RequestBulkCreateSerializer(data=request.data, context={'request': request})
+
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        result = serializer.save()
+
+        if not result['requests']:
+            return Response(serializer.data, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+
 class RequestDetail(APIView):
     """
     Return or update an active project request of the authenticated user
@@ -1294,28 +1766,77 @@ class RequestDetail(APIView):
             - Project request not found
         """
 
-        try:
-            proj_request = Request.objects.get(pk=request_pk)
-        except Request.DoesNotExist:
-            return Response(self._PROJ_REQ_404_MESSAGE, status=status.HTTP_404_NOT_FOUND)
-        
-        if not proj_request.is_active:
-            return Response(self._PROJ_REQ_404_MESSAGE, status=status.HTTP_404_NOT_FOUND)
-        
-        if request.user != proj_request.requester and request.user != proj_request.requestee:
-            return Response(self._PROJ_REQ_403_MESSAGE, status=status.HTTP_403_FORBIDDEN)
-        
-        serializer = RequestUpdateSerializer(proj_request, data=request.data, context={'request': request, 'request_pk': request_pk})
+        # the project request row is locked until the update is committed, so concurrent updates
+        # of the same request (e.g. an accept and a cancel) are made one after the other,
+        # and the later ones find the request inactive
+        with transaction.atomic():
+            try:
+                proj_request = Request.objects.select_for_update(of=('self',)).select_related('project').get(pk=request_pk)
+            except Request.DoesNotExist:
+                return Response(self._PROJ_REQ_404_MESSAGE, status=status.HTTP_404_NOT_FOUND)
+            
+            if not proj_request.is_active:
+                return Response(self._PROJ_REQ_404_MESSAGE, status=status.HTTP_404_NOT_FOUND)
+            
+            if request.user.pk != proj_request.requester_id and request.user.pk != proj_request.requestee_id:
+                return Response(self._PROJ_REQ_403_MESSAGE, status=status.HTTP_403_FORBIDDEN)
+            
+            serializer = RequestUpdateSerializer(proj_request, data=request.data, context={'request': request})
 
-        if serializer.is_valid():
-            serializer.save()
+            if serializer.is_valid():
+                serializer.save()
 
-            return Response(self._PROJ_REQ_200_SUCCESS, status=status.HTTP_200_OK)
+                return Response(self._PROJ_REQ_200_SUCCESS, status=status.HTTP_200_OK)
 
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
-class PrivateMessageList(APIView):
+class MessageFilteringMixin:
+    """
+    Filtering of the private and public message lists by the query params clients sync with.
+    """
+
+    _AFTER_ID_400_MESSAGE = 'after_id must be a message id'
+    _SINCE_400_MESSAGE = 'since must be an ISO 8601 date and time'
+
+    def _apply_filtering(self, request, queryset):
+        """
+        Helper method for applying queryset filtering
+        as specified in the request's query params.
+
+        Available query params:
+        - after_id
+        - since
+
+        Raises ParseError if a query param is invalid.
+
+        Returns queryset.
+        """
+
+        if 'after_id' in request.query_params:
+            try:
+                queryset = queryset.after(int(request.query_params['after_id']))
+            except ValueError:
+                raise ParseError(self._AFTER_ID_400_MESSAGE)
+
+        if 'since' in request.query_params:
+            try:
+                since = parse_datetime(request.query_params['since'])
+            except ValueError:
+                since = None
+
+            if since is None:
+                raise ParseError(self._SINCE_400_MESSAGE)
+
+            if timezone.is_naive(since):
+                since = timezone.make_aware(since)
+
+            queryset = queryset.since(since)
+
+        return queryset
+
+
+class PrivateMessageList(MessageFilteringMixin, APIView):
     """
     Return a list of the 30 latest private messages for a specific project in ascending order, or create and return a new private message
     """
@@ -1323,6 +1844,7 @@ class PrivateMessageList(APIView):
     _PROJECT_404_MESSAGE = 'A project does not exist with that id'
     _PROJ_MSG_403_MESSAGE = 'You do not have permission to access the private messages for this project'
     
+    @method_decorator(condition(etag_func=private_message_list_etag))
     def get(self, request, project_pk, format=None):
         """
         Return a list of private messages for a particular project in ascending order
@@ -1354,10 +1876,39 @@ class PrivateMessageList(APIView):
                 }
             ]
 
+        ### Optional Filters
+
+        Only the messages posted since the client last synced may be fetched by providing query parameters:
+
+        1. after_id
+            - messages posted after the message with this id (or with a greater id, if that message was deleted)
+        2. since
+            - messages posted after this ISO 8601 date and time
+
+        **Examples:**
+
+        - /api/projects/20/private-messages/?after_id=2
+        - /api/projects/20/private-messages/?since=2021-04-22T09:10:16.266090%2B01:00
+
+        ### Pagination
+
+        Results are returned in pages, ordered by the date they were created.
+        The page size may be set with the `page_size` query param (up to a configured maximum).
+        Links to the next and previous pages are returned in the `Link` response header.
+
+        ### Conditional Requests
+
+        The response includes an `ETag` header. If the `If-None-Match` request header matches it,
+        the page of messages hasn't changed and an empty 304 response is returned instead.
+
         ### Response Codes
 
         - 200
             - All private messages for the project were returned
+        - 304
+            - Not modified since the version in `If-None-Match`
+        - 400
+            - Invalid after_id or since query param
         - 401
             - User not authenticated
         - 403
@@ -1372,14 +1923,20 @@ class PrivateMessageList(APIView):
             return Response(self._PROJECT_404_MESSAGE, status=status.HTTP_404_NOT_FOUND)
         
         # requesting user is NOT the owner or a member of the project
-        if not (project.is_owner(request.user) or project.team_members.filter(user=request.user)):
+        if not project.is_owner_or_member(request.user):
             return Response(self._PROJ_MSG_403_MESSAGE, status=status.HTTP_403_FORBIDDEN)
 
         private_messages = PrivateMessage.objects.filter(project=project)
 
-        serializer = PrivateMessageSerializer(private_messages, many=True)
+        # check for any query params and filter queryset accordingly
+        private_messages = self._apply_filtering(request, private_messages)
 
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        paginator = KeysetPagination(ordering=('date_created', 'id'))
+        page = paginator.paginate_queryset(private_messages, request, view=self)
+
+        serializer = PrivateMessageSerializer(page, many=True)
+
+        return paginator.get_paginated_response(serializer.data)
     
     def post(self, request, project_pk, format=None):
         """
@@ -1428,7 +1985,7 @@ class PrivateMessageList(APIView):
             return Response(self._PROJECT_404_MESSAGE, status=status.HTTP_404_NOT_FOUND)
         
         # requesting user is NOT the owner or a member of the project
-        if not (project.is_owner(request.user) or project.team_members.filter(user=request.user)):
+        if not project.is_owner_or_member(request.user):
             return Response(self._PROJ_MSG_403_MESSAGE, status=status.HTTP_403_FORBIDDEN)
 
         serializer = PrivateMessageSerializer(data=request.data, context={'request': request, 'project': project})
@@ -1487,7 +2044,7 @@ class PrivateMessageDetail(APIView):
             return Response(self._PROJECT_404_MESSAGE, status=status.HTTP_404_NOT_FOUND)
         
         # requesting user is NOT the owner or a member of the project
-        if not (project.is_owner(request.user) or project.team_members.filter(user=request.user)):
+        if not project.is_owner_or_member(request.user):
             return Response(self._PROJ_MSG_403_MESSAGE, status=status.HTTP_403_FORBIDDEN)
 
         try:
@@ -1501,13 +2058,14 @@ class PrivateMessageDetail(APIView):
   
 
 
-class PublicMessageList(APIView):
+class PublicMessageList(MessageFilteringMixin, APIView):
     """
     Return a list of messages for a specific project in ascending order, or create and return a new public message
     """
 
     _PROJECT_404_MESSAGE = 'A project does not exist with that id'
     
+    @method_decorator(condition(etag_func=public_message_list_etag))
     def get(self, request, project_pk, format=None):
         """
         Return a list of public messages for a particular project in ascending order
@@ -1539,16 +2097,55 @@ class PublicMessageList(APIView):
                 }
             ]
 
+        ### Optional Filters
+
+        Only the messages posted since the client last synced may be fetched by providing query parameters:
+
+        1. after_id
+            - messages posted after the message with this id (or with a greater id, if that message was deleted)
+        2. since
+            - messages posted after this ISO 8601 date and time
+
+        **Examples:**
+
+        - /api/projects/20/public-messages/?after_id=2
+        - /api/projects/20/public-messages/?since=2021-04-22T09:10:16.266090%2B01:00
+
+        ### Pagination
+
+        Results are returned in pages, ordered by the date they were created.
+        The page size may be set with the `page_size` query param (up to a configured maximum).
+        Links to the next and previous pages are returned in the `Link` response header.
+
+        ### Conditional Requests
+
+        The response includes an `ETag` header. If the `If-None-Match` request header matches it,
+        the page of messages hasn't changed and an empty 304 response is returned instead.
+
         ### Response Codes
 
         - 200
             - All public messages for the project were returned
+        - 304
+            - Not modified since the version in `If-None-Match`
+        - 400
+            - Invalid after_id or since query param
         - 401
             - User not authenticated
         - 404
             - Project not found
         """
 
+        cache_key = response_cache.make_key(
+            'public-message-list',
+            [f'public-messages:{project_pk}', f'project:{project_pk}', 'accounts'],
+            request.build_absolute_uri(),
+        )
+        response = response_cache.get(cache_key)
+
+        if response:
+            return response
+
         try:
             project = Project.objects.get(pk=project_pk)
         except Project.DoesNotExist:
@@ -1556,9 +2153,18 @@ class PublicMessageList(APIView):
 
         public_messages = PublicMessage.objects.filter(project=project)
 
-        serializer = PublicMessageSerializer(public_messages, many=True)
+        # check for any query params and filter queryset accordingly
+        public_messages = self._apply_filtering(request, public_messages)
 
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        paginator = KeysetPagination(ordering=('date_created', 'id'))
+        page = paginator.paginate_queryset(public_messages, request, view=self)
+
+        serializer = PublicMessageSerializer(page, many=True)
+
+        response = paginator.get_paginated_response(serializer.data)
+        response_cache.set(cache_key, response)
+
+        return response
     
     def post(self, request, project_pk, format=None):
         """
@@ -1664,3 +2270,419 @@ class PublicMessageDetail(APIView):
         serializer = PublicMessageSerializer(message)
 
         return Response(serializer.data, status=status.HTTP_200_OK)
+
+
+class RoleSuggest(APIView):
+    """
+    Return the roles starting with a given prefix, for autocompleting role search boxes
+    """
+
+    _MAX_LIMIT = 50
+
+    def get(self, request, format=None):
+        """
+        Return the roles used in student profiles and projects that start with a given prefix,
+        most used first
+
+        ### Response Example
+
+        Returns an `"application/json"` encoded list of objects in the following format:
+
+            [
+                {
+                    "role": "Software Engineer",
+                    "count": 12
+                },
+                {
+                    "role": "Software Tester",
+                    "count": 3
+                }
+            ]
+
+        ### Query Params
+
+        1. q
+            - the prefix the roles must start with (case-insensitive)
+        2. limit
+            - the max number of roles returned (10 by default, up to 50)
+
+        **Examples:**
+
+        - /api/roles/suggest/?q=soft
+        - /api/roles/suggest/?q=data&limit=5
+
+        ### Response Codes
+
+        - 200
+            - Matching roles returned
+        - 401
+            - User not authenticated
+        """
+
+        prefix = request.query_params.get('q', '').strip()
+
+        try:
+            limit = min(int(request.query_params.get('limit', 10)), self._MAX_LIMIT)
+        except ValueError:
+            limit = 10
+
+        if not prefix or limit < 1:
+            return Response([], status=status.HTTP_200_OK)
+
+        suggestions = [{'role': role, 'count': count} for role, count in role_index.suggest(prefix, limit=limit)]
+
+        return Response(suggestions, status=status.HTTP_200_OK)
+
+
+class ProjectStudentRecommendations(APIView):
+    """
+    Return the students best matching a project's desired roles, for inviting to the project
+    """
+
+    _PROJECT_404_MESSAGE = 'No project found with that id'
+    _PROJECT_403_MESSAGE = 'You do not have permission to view recommendations for this project'
+    _MAX_LIMIT = 100
+
+    def get(self, request, project_pk, format=None):
+        """
+        Return the students best matching a project, best first.
+        Only available to the project owner and team members.
+
+        Students are scored by how many of the project's desired roles they list (rarer roles counting for more),
+        whether they are on the same programme as the owner or a team member, whether they follow the project,
+        and how many other projects they follow along with the owner or team members.
+        Only students listing at least one of the desired roles are returned, and the owner, team members,
+        and students with an active request for the project are left out.
+
+        ### Response Example
+
+        Returns an `"application/json"` encoded list of objects in the following format:
+
+            [
+                {
+                    "score": 1.3,
+                    "matched_roles": [
+                        "Financial Planner"
+                    ],
+                    "account": {
+                        "id": 5,
+                        "username": "janedoe",
+                        "email": "janedoe@fakeuniversity.com",
+                        "first_name": "Jane",
+                        "last_name": "Doe",
+                        "profile": {
+                            "programme": "BSc Economics and Business",
+                            "about": "Justo laoreet sit amet cursus sit amet.",
+                            "roles": [
+                                "Financial Planner",
+                                "Project Manager"
+                            ]
+                        }
+                    }
+                }
+            ]
+
+        ### Query Params
+
+        1. limit
+            - the max number of students returned (20 by default, up to 100)
+
+        ### Response Codes
+
+        - 200
+            - Recommended students returned
+        - 401
+            - User not authenticated
+        - 403
+            - User is not the project owner or a team member
+        - 404
+            - Project not found
+        """
+
+        try:
+            project = Project.objects.get(pk=project_pk)
+        except Project.DoesNotExist:
+            return Response(self._PROJECT_404_MESSAGE, status=status.HTTP_404_NOT_FOUND)
+
+        if not project.is_owner_or_member(request.user):
+            return Response(self._PROJECT_403_MESSAGE, status=status.HTTP_403_FORBIDDEN)
+
+        try:
+            limit = min(int(request.query_params.get('limit', 20)), self._MAX_LIMIT)
+        except ValueError:
+            limit = 20
+
+        if limit < 1:
+            return Response([], status=status.HTTP_200_OK)
+
+        recommendations = recommend_students(project, limit=limit)
+        accounts = get_user_model().objects.select_related('profile').in_bulk([account_id for account_id, _, _ in recommendations])
+
+        results = [
+            {
+                'score': round(score, 4),
+                # shown with the spelling the project uses
+                'matched_roles': [role for role in project.desired_roles if role.strip().lower() in matched_roles],
+                'account': AccountSerializer(accounts[account_id]).data,
+            }
+            for account_id, score, matched_roles in recommendations
+            # skips students deleted since the index was built
+            if account_id in accounts
+        ]
+
+        return Response(results, status=status.HTTP_200_OK)
+
+
+class ProjectRecommendations(APIView):
+    """
+    Return the projects recommended for the authenticated user
+    """
+
+    def get(self, request, format=None):
+        """
+        Return the projects recommended for the authenticated user, best first.
+
+        Projects are scored by how many of their desired roles are in the user's profile, and by how similar they are
+        to the projects the user owns, follows, or is a team member of (projects are similar when the same students
+        follow them or work on them). The projects the user owns, follows, or is a team member of are left out.
+        Recommendations are cached for a few minutes, and refreshed as soon as the user follows or joins a project.
+
+        ### Response Example
+
+        Returns an `"application/json"` encoded list of objects in the following format:
+
+            [
+                {
+                    "score": 0.72,
+                    "project": {
+                        "id": 18,
+                        "title": "Calamity",
+                        "description": "Lorem ipsum dolor sit amet.",
+                        "category_name": "Finance",
+                        "category": "FNC",
+                        "owner": 3,
+                        "owner_first_name": "Jane",
+                        "owner_last_name": "Doe",
+                        "owner_role": "Project Manager",
+                        "desired_roles": [
+                            "Financial Planner"
+                        ],
+                        "date_created": "2021-04-03T12:08:00.607192Z",
+                        "follower_count": 4,
+                        "team_members": []
+                    }
+                }
+            ]
+
+        ### Query Params
+
+        1. limit
+            - the max number of projects returned (20 by default, up to 50)
+
+        ### Response Codes
+
+        - 200
+            - Recommended projects returned
+        - 401
+            - User not authenticated
+        """
+
+        try:
+            limit = min(int(request.query_params.get('limit', 20)), MAX_PROJECT_RECOMMENDATIONS)
+        except ValueError:
+            limit = 20
+
+        if limit < 1:
+            return Response([], status=status.HTTP_200_OK)
+
+        recommendations = recommend_projects(request.user)[:limit]
+        projects = Project.objects.with_related().in_bulk([project_id for project_id, _ in recommendations])
+
+        results = [
+            {
+                'score': round(score, 4),
+                'project': ProjectSerializer(projects[project_id]).data,
+            }
+            for project_id, score in recommendations
+            # skips projects deleted since the recommendations were cached
+            if project_id in projects
+        ]
+
+        return Response(results, status=status.HTTP_200_OK)
+
+
+class Metrics(APIView):
+    """
+    Return the operational metrics of the API, for monitoring dashboards
+    """
+
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, format=None):
+        """
+        Return the utilization of the database connection pools and the hit and miss counts of the response cache.
+        Only available to staff accounts.
+
+        ### Response Example
+
+        Returns an `"application/json"` encoded object in the following format:
+
+            {
+                "database_pools": {
+                    "default:sptb": {
+                        "max_size": 10,
+                        "max_overflow": 10,
+                        "size": 12,
+                        "idle": 3,
+                        "checked_out": 9,
+                        "overflow": 2,
+                        "utilization": 0.9,
+                        "checkouts": 5210,
+                        "waits": 4,
+                        "timeouts": 0,
+                        "connections_opened": 31,
+                        "connections_discarded": 19
+                    }
+                },
+                "response_cache": {
+                    "project-list": {
+                        "hits": 812,
+                        "misses": 97
+                    }
+                }
+            }
+
+        The pools are keyed by database alias and name, and there are none unless pooling is turned on.
+        Counts are since the process started.
+
+        ### Response Codes
+
+        - 200
+            - Metrics returned
+        - 401
+            - User not authenticated
+        - 403
+            - User is not staff
+        """
+
+        metrics = {
+            'database_pools': pool_metrics(),
+            'response_cache': response_cache.metrics(),
+        }
+
+        return Response(metrics, status=status.HTTP_200_OK)
+
+
+class Stats(APIView):
+    """
+    Return the supply of and demand for each role, for staff dashboards
+    """
+
+    permission_classes = [IsAdminUser]
+
+    _CATEGORY_400_MESSAGE = f'category must be one of {", ".join(Project.Category.values)}'
+
+    def get(self, request, format=None):
+        """
+        Return the number of students listing each role and of projects wanting it,
+        along with the projects wanting each role and the team members with the role in each project category.
+        Only available to staff accounts.
+
+        The statistics are served from materialized views, refreshed every few minutes by the refresh_stats command,
+        so they can be slightly out of date (see `refreshed_at`).
+
+        ### Response Example
+
+        Returns an `"application/json"` encoded object in the following format:
+
+            {
+                "refreshed_at": "2021-04-10T09:15:00.120317Z",
+                "roles": [
+                    {
+                        "role": "Software Engineer",
+                        "students": 120,
+                        "projects": 45,
+                        "students_per_project": 2.67
+                    }
+                ],
+                "categories": [
+                    {
+                        "category": "SFW",
+                        "category_name": "Software",
+                        "role": "Software Engineer",
+                        "projects": 30,
+                        "members": 12
+                    }
+                ]
+            }
+
+        Roles are listed most wanted first, and `students_per_project` is null for roles no project wants.
+        Categories are listed by category, then most wanted role first.
+        `refreshed_at` is null if no role is used yet.
+
+        ### Query Params
+
+        1. category
+            - a category code (e.g. SFW), only that category is listed in `categories`
+        2. limit
+            - the max number of roles returned in `roles`, and for each category in `categories` (100 by default, up to 1000)
+
+        ### Response Codes
+
+        - 200
+            - Statistics returned
+        - 400
+            - Invalid category
+        - 401
+            - User not authenticated
+        - 403
+            - User is not staff
+        """
+
+        try:
+            limit = min(int(request.query_params.get('limit', 100)), 1000)
+        except ValueError:
+            limit = 100
+
+        role_stats = list(
+            RoleStats.objects.select_related('role').order_by('-project_count', '-student_count', 'role__name')[:max(limit, 0)]
+        )
+
+        category_stats = RoleCategoryStats.objects.select_related('role').order_by('category', '-project_count', 'role__name')
+
+        if 'category' in request.query_params:
+            if request.query_params['category'] not in Project.Category.values:
+                raise ParseError(self._CATEGORY_400_MESSAGE)
+            category_stats = category_stats.filter(category=request.query_params['category'])
+
+        categories = []
+        listed_per_category = {}
+        for stats in category_stats:
+            listed_per_category[stats.category] = listed_per_category.get(stats.category, 0) + 1
+            if listed_per_category[stats.category] > limit:
+                continue
+
+            categories.append({
+                'category': stats.category,
+                'category_name': stats.get_category_display(),
+                'role': stats.role.name,
+                'projects': stats.project_count,
+                'members': stats.member_count,
+            })
+
+        data = {
+            # all the rows are refreshed at the same time
+            'refreshed_at': role_stats[0].refreshed_at if role_stats else None,
+            'roles': [
+                {
+                    'role': stats.role.name,
+                    'students': stats.student_count,
+                    'projects': stats.project_count,
+                    'students_per_project': round(stats.student_count / stats.project_count, 2) if stats.project_count else None,
+                }
+                for stats in role_stats
+            ],
+            'categories': categories,
+        }
+
+        return Response(data, status=status.HTTP_200_OK)
@@ -13,4 +13,22 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'studentprojectteambuilder.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+# imported once Django has been set up, as they use the models
+from api.events import REQUEST_EVENTS_PATH, request_event_application  # noqa: E402
+from api.realtime import discussion_application  # noqa: E402
+
+
+async def application(scope, receive, send):
+    """
+    Routes WebSocket connections to the project discussion channels, the request event stream
+    to its own long-lived handler, and everything else to Django.
+    """
+    if scope['type'] == 'websocket':
+        return await discussion_application(scope, receive, send)
+
+    if scope['type'] == 'http' and scope['path'] == REQUEST_EVENTS_PATH:
+        return await request_event_application(scope, receive, send)
+
+    return await django_application(scope, receive, send)
@@ -58,6 +58,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'api.replicas.ReplicaRoutingMiddleware',
 ]
 
 ROOT_URLCONF = 'studentprojectteambuilder.urls'
@@ -84,17 +85,54 @@ WSGI_APPLICATION = 'studentprojectteambuilder.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/3.1/ref/settings/#databases
 
+# The PostgreSQL backend in api.db_backends can take connections from an application-side pool
+# (see api/db_backends/postgresql/base.py), which is turned on by setting PG_DB_POOL_SIZE.
+# CONN_MAX_AGE is how long (in seconds) each thread keeps its connection open, instead of
+# closing it (or returning it to the pool) at the end of each request
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.postgresql',
+        'ENGINE': 'api.db_backends.postgresql',
         'NAME': os.getenv('PG_DB_NAME'),
         'USER': os.getenv('PG_DB_USER'),
         'PASSWORD': os.getenv('PG_DB_PASS'),
         'HOST': os.getenv('PG_DB_HOST', 'localhost'),
         'PORT': os.getenv('PG_DB_PORT', '5432'),
+        'CONN_MAX_AGE': int(os.getenv('PG_DB_CONN_MAX_AGE', '0')),
+        'POOL': {
+            'MAX_SIZE': int(os.getenv('PG_DB_POOL_SIZE', '0')),
+            'MAX_OVERFLOW': int(os.getenv('PG_DB_POOL_MAX_OVERFLOW', '10')),
+            'TIMEOUT': float(os.getenv('PG_DB_POOL_TIMEOUT', '30')),
+            'RECYCLE': int(os.getenv('PG_DB_POOL_RECYCLE', '3600')),
+            'PRE_PING': os.getenv('PG_DB_POOL_PRE_PING', 'true').lower() == 'true',
+        },
     }
 }
 
+# Read replicas of the default database, as a comma separated list of host[:port][/name] (e.g.
+# replica1:5432,replica2/sptb), whose name defaults to PG_DB_NAME. They're reached with the same user and password.
+# The reads of GET requests are spread over them (see api/replicas.py), and they mirror the default database in tests
+DATABASE_REPLICAS = []
+
+for index, replica in enumerate(filter(None, os.getenv('PG_DB_REPLICAS', '').split(','))):
+    address, _, name = replica.strip().partition('/')
+    host, _, port = address.partition(':')
+    alias = f'replica{index + 1}'
+
+    DATABASES[alias] = {
+        **DATABASES['default'],
+        'HOST': host,
+        'PORT': port or '5432',
+        'NAME': name or DATABASES['default']['NAME'],
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append(alias)
+
+DATABASE_ROUTERS = ['api.replicas.ReplicaRouter']
+
+# How long (in seconds) all of a client's reads go to the default database after it makes a POST, PUT, PATCH
+# or DELETE request, so it sees its own writes. Should be longer than the replication lag
+DATABASE_REPLICA_STICKY_SECONDS = int(os.getenv('PG_DB_REPLICA_STICKY_SECONDS', '5'))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/3.1/ref/settings/#auth-password-validators
@@ -149,6 +187,54 @@ REST_FRAMEWORK = {
     'DEFAULT_SCHEMA_CLASS': 'rest_framework.schemas.coreapi.AutoSchema',
 }
 
+# Page sizes for the keyset paginated API list endpoints
+API_PAGE_SIZE = int(os.getenv('API_PAGE_SIZE', '50'))
+API_MAX_PAGE_SIZE = int(os.getenv('API_MAX_PAGE_SIZE', '100'))
+
+# Most students a project owner can invite in a single bulk request creation
+API_MAX_BULK_REQUESTS = int(os.getenv('API_MAX_BULK_REQUESTS', '500'))
+
+# How often (in seconds) the in-memory role autocomplete index is fully rebuilt from the database,
+# to pick up changes made by other processes
+ROLE_INDEX_REBUILD_INTERVAL = int(os.getenv('ROLE_INDEX_REBUILD_INTERVAL', '300'))
+
+# How often (in seconds) the in-memory indexes that students and projects are recommended from are fully rebuilt
+# from the database, to pick up changes made by other processes
+RECOMMENDATION_INDEX_REBUILD_INTERVAL = int(os.getenv('RECOMMENDATION_INDEX_REBUILD_INTERVAL', '300'))
+
+# How long (in seconds) each user's project recommendations are cached for
+RECOMMENDATION_CACHE_TIMEOUT = int(os.getenv('RECOMMENDATION_CACHE_TIMEOUT', '300'))
+
+# How often (in seconds) the refresh_stats command refreshes the statistics served by /api/stats/ when run with --schedule
+STATS_REFRESH_INTERVAL = int(os.getenv('STATS_REFRESH_INTERVAL', '900'))
+
+# The 'api' cache holds cached responses of the read-heavy GET endpoints (see api/cache.py).
+# It's kept in local memory unless API_CACHE_URL points to a Redis protocol server (e.g. redis://localhost:6379/0)
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'api': {
+        'BACKEND': 'api.cache_backends.RedisCache',
+        'LOCATION': os.getenv('API_CACHE_URL'),
+    } if os.getenv('API_CACHE_URL') else {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'api',
+    },
+}
+
+# How long (in seconds) API responses are cached for
+API_CACHE_TIMEOUT = int(os.getenv('API_CACHE_TIMEOUT', '300'))
+
+# Broker used to push new discussion messages to WebSocket clients (see api/broker.py).
+# Messages are only fanned out within each process unless REALTIME_BROKER_URL points to a
+# Redis protocol server (e.g. redis://localhost:6379), which is needed when running several workers
+REALTIME_BROKER_URL = os.getenv('REALTIME_BROKER_URL')
+
+# How often (in seconds) the access of the clients connected to a discussion WebSocket is checked again,
+# so e.g. removed team members stop receiving private messages
+REALTIME_ACCESS_CHECK_INTERVAL = int(os.getenv('REALTIME_ACCESS_CHECK_INTERVAL', '60'))
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=10),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=2),
@@ -167,4 +253,9 @@ SIMPLE_JWT = {
 CORS_ALLOWED_ORIGINS = [
     # this is our frontend React application
     'http://localhost:3000',
+]
+
+# response headers the frontend is allowed to read (pagination links are sent in the Link header)
+CORS_EXPOSE_HEADERS = [
+    'Link',
 ]
\ No newline at end of file